@@ -1,3 +1,7 @@
+import os
+import platform
+from functools import lru_cache
+
 from mcp.server.fastmcp import FastMCP
 
 # Create the MCP server
@@ -5,18 +9,34 @@ mcp = FastMCP("hello-world")
 
 
 @mcp.tool()
-def add_numbers(a: int, b: int) -> dict:
+def add_numbers(a: int, b: int, include_message: bool = False) -> dict:
     """Add two numbers together.
 
     Args:
         a: First number to add
         b: Second number to add
+        include_message: Also return a human-readable message (defaults to False)
 
     Returns:
-        Dictionary with the result and a message
+        Dictionary with the result, and a message if requested
     """
     result = a + b
-    return {"result": result, "message": f"{a} + {b} = {result}"}
+    if not include_message:
+        return {"result": result}
+    return {"result": result, "message": "%d + %d = %d" % (a, b, result)}
+
+
+@mcp.tool()
+def add_numbers_batch(pairs: list[tuple[int, int]]) -> list[int]:
+    """Add many pairs of numbers in one call.
+
+    Args:
+        pairs: List of (a, b) pairs to add
+
+    Returns:
+        List of sums, in the same order as the input pairs
+    """
+    return [a + b for a, b in pairs]
 
 
 @mcp.tool()
@@ -39,9 +59,12 @@ def get_system_info() -> dict:
     Returns:
         Dictionary with system information
     """
-    import platform
-    import os
+    return {**_platform_info(), "current_directory": os.getcwd()}
+
 
+@lru_cache(maxsize=1)
+def _platform_info() -> dict:
+    """Platform details, which cannot change while the server runs"""
     return {
         "platform": platform.system(),
         "platform_release": platform.release(),
@@ -49,7 +72,6 @@ def get_system_info() -> dict:
         "architecture": platform.machine(),
         "hostname": platform.node(),
         "python_version": platform.python_version(),
-        "current_directory": os.getcwd(),
     }
 
 
@@ -57,6 +79,7 @@ if __name__ == "__main__":
     print("Starting Hello World MCP Server...")
     print("Available tools:")
     print("  - add_numbers: Add two numbers together")
+    print("  - add_numbers_batch: Add many pairs of numbers in one call")
     print("  - say_hello: Say hello to someone")
     print("  - get_system_info: Get basic system information")
     print("\nServer running...")
@@ -10,8 +10,13 @@ import asyncio
 
 from InquirerPy import inquirer
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 from src.config.questions import BUILT_IN_QUESTIONS, BUILT_IN_QUESTIONS_ZH_CN
-from src.workflow import run_agent_workflow_async
+from src.workflow import configure_logging, run_agent_workflow_async
 
 
 def ask(
@@ -30,7 +35,8 @@ def ask(
         max_step_num: Maximum number of steps in a plan
         enable_background_investigation: If True, performs web search before planning to enhance context
     """
-    asyncio.run(
+    run = uvloop.run if uvloop is not None else asyncio.run
+    run(
         run_agent_workflow_async(
             user_input=question,
             debug=debug,
@@ -126,6 +132,7 @@ if __name__ == "__main__":
     )
 
     args = parser.parse_args()
+    configure_logging()
 
     if args.interactive:
         # Pass command line arguments to main function
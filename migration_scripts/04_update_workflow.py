@@ -26,6 +26,14 @@ from src.auth.billing import (
     create_workflow_execution, 
     update_workflow_execution
 )
+
+# Immutable defaults shared by every run; per-run values are merged in
+_STATE_TEMPLATE = {
+    "plan_iterations": 0,
+    "final_report": "",
+    "current_plan": "",
+    "auto_accepted_plan": True,
+}
 """
 )
 
@@ -68,12 +76,9 @@ async def run_agent_workflow_async(
         
         # 4. Create initial state (existing code)
         state = State({
+            **_STATE_TEMPLATE,
             "messages": [HumanMessage(content=user_input)],
-            "plan_iterations": 0,
-            "final_report": "",
-            "current_plan": "",
-            "observations": [],
-            "auto_accepted_plan": True,
+            "observations": [],  # fresh list per run, never shared
             "enable_background_investigation": enable_background_investigation,
             "research_topic": user_input,
             "locale": locale,
@@ -168,19 +173,23 @@ print(
 print(
     """
 # Add this helper function to track token usage
+import numpy as np
+
 def extract_total_tokens(final_state: State) -> int:
     \"\"\"Extract total token count from workflow execution.\"\"\"
-    total_tokens = 0
-    
-    # Count tokens from messages
-    for message in final_state.get('messages', []):
-        if hasattr(message, 'response_metadata'):
-            usage = message.response_metadata.get('token_usage', {})
-            total_tokens += usage.get('total_tokens', 0)
+    # Collect per-message counts into an int64 array and sum in C
+    counts = np.fromiter(
+        (
+            message.response_metadata.get('token_usage', {}).get('total_tokens', 0)
+            for message in final_state.get('messages', [])
+            if hasattr(message, 'response_metadata')
+        ),
+        dtype=np.int64,
+    )
     
     # Add any other token counting logic specific to your implementation
     
-    return total_tokens
+    return int(counts.sum())
 """
 )
 
@@ -190,7 +199,7 @@ print(
 Summary of Changes:
 ========================================
 
-1. Import billing functions
+1. Import billing functions and define the shared state template
 2. Change user_id parameter to account_id
 3. Add billing check before workflow execution
 4. Create workflow execution record
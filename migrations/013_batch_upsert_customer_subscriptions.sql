@@ -0,0 +1,37 @@
+-- Migration: Batch variant of service_role_upsert_customer_subscription
+-- Accepts a JSONB array of {account_id, customer, subscription} objects so that
+-- several webhook upserts can be applied in a single PostgREST round-trip.
+-- Each item runs in its own subtransaction and the function returns one
+-- {ok, error} status per item, in input order, so a bad item (e.g. a malformed
+-- account_id or a FK violation) does not roll back the rest of the batch.
+
+DROP FUNCTION IF EXISTS public.service_role_upsert_customer_subscriptions(jsonb);
+
+CREATE OR REPLACE FUNCTION public.service_role_upsert_customer_subscriptions(items jsonb)
+    RETURNS jsonb AS
+$$
+DECLARE
+    item jsonb;
+    results jsonb := '[]'::jsonb;
+BEGIN
+    FOR item IN SELECT * FROM jsonb_array_elements(items)
+    LOOP
+        BEGIN
+            PERFORM public.service_role_upsert_customer_subscription(
+                (item ->> 'account_id')::uuid,
+                item -> 'customer',
+                item -> 'subscription'
+            );
+            results := results || jsonb_build_array(jsonb_build_object('ok', true));
+        EXCEPTION WHEN OTHERS THEN
+            results := results || jsonb_build_array(
+                jsonb_build_object('ok', false, 'error', SQLERRM)
+            );
+        END;
+    END LOOP;
+
+    RETURN results;
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION public.service_role_upsert_customer_subscriptions(jsonb) TO service_role;
@@ -0,0 +1,9 @@
+-- Migration: Store user_settings.settings as JSONB with a GIN index
+-- Deployments created before 012 used JSON here; the USING cast is a no-op when
+-- the column is already JSONB. jsonb_path_ops only supports @> but is much
+-- smaller than the default opclass, which is all the settings lookups need.
+
+ALTER TABLE user_settings ALTER COLUMN settings TYPE jsonb USING settings::jsonb;
+
+CREATE INDEX IF NOT EXISTS ix_user_settings_gin
+    ON user_settings USING gin (settings jsonb_path_ops);
@@ -0,0 +1,13 @@
+-- Migration: One settings row per user
+-- The settings upsert relies on INSERT ... ON CONFLICT (user_id), which needs a
+-- unique index on user_id. Keep the most recent row for any duplicated user
+-- before building it; the unique index replaces the plain one from 012.
+
+DELETE FROM user_settings a
+    USING user_settings b
+    WHERE a.user_id = b.user_id
+      AND a.id < b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_user_settings_user_id ON user_settings(user_id);
+
+DROP INDEX IF EXISTS idx_user_settings_user_id;
@@ -0,0 +1,9 @@
+-- Migration: Index mcp_connections by (account_id, qualified_name)
+-- Serves both the per-account listing and the lookup of one connection by its
+-- qualified name. The leading account_id column makes the single-column index
+-- from 010 redundant.
+
+CREATE INDEX IF NOT EXISTS ix_mcp_conn_acct_qn
+    ON mcp_connections (account_id, qualified_name);
+
+DROP INDEX IF EXISTS idx_mcp_connections_account_id;
@@ -0,0 +1,5 @@
+-- Migration: Generate mcp_connections ids in the database
+-- gen_random_uuid() is built in from PostgreSQL 13; the application reads the
+-- id back with RETURNING instead of creating a UUID per row in Python.
+
+ALTER TABLE mcp_connections ALTER COLUMN id SET DEFAULT gen_random_uuid();
@@ -0,0 +1,23 @@
+-- Migration: Store the prebuilt MCP server metadata request per connection
+-- The application fills metadata_request whenever config is written. Existing
+-- rows are backfilled with the same fields MCPConnection.to_metadata_request
+-- used to derive from config on every call.
+
+ALTER TABLE mcp_connections ADD COLUMN IF NOT EXISTS metadata_request JSONB;
+
+UPDATE mcp_connections
+SET metadata_request = jsonb_build_object(
+        'transport', config->'transport',
+        'env', config->'env',
+        'timeout_seconds', config->'timeout_seconds'
+    ) || CASE config->>'transport'
+        WHEN 'stdio' THEN jsonb_build_object(
+            'command', config->'command',
+            'args', config->'args'
+        )
+        WHEN 'sse' THEN jsonb_build_object('url', config->'url')
+        ELSE '{}'::jsonb
+    END
+WHERE metadata_request IS NULL
+    AND config->'transport' IS NOT NULL
+    AND jsonb_typeof(config->'transport') <> 'null';
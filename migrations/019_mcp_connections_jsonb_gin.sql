@@ -0,0 +1,10 @@
+-- Migration: Store MCP connection JSON as JSONB and index enabled_tools
+-- 009 already created these columns as JSONB; the USING casts are no-ops then
+-- and only convert deployments that created them as JSON.
+
+ALTER TABLE mcp_connections ALTER COLUMN config TYPE jsonb USING config::jsonb;
+ALTER TABLE mcp_connections
+    ALTER COLUMN enabled_tools TYPE jsonb USING enabled_tools::jsonb;
+
+CREATE INDEX IF NOT EXISTS ix_mcp_enabled_tools_gin
+    ON mcp_connections USING gin (enabled_tools jsonb_path_ops);
@@ -73,6 +73,9 @@ if __name__ == "__main__":
             port=args.port,
             reload=reload,
             log_level=args.log_level,
+            # uvloop has no Windows build; fail loudly elsewhere if it is missing
+            loop="asyncio" if sys.platform == "win32" else "uvloop",
+            http="httptools",
         )
     except Exception as e:
         logger.error(f"Failed to start server: {str(e)}")
@@ -1,12 +1,66 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+from functools import lru_cache
 from typing import Optional, Dict
-from langgraph.prebuilt import create_react_agent
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.prebuilt import ToolNode, create_react_agent
 
 from src.prompts import apply_prompt_template
 from src.llms.llm import get_llm_by_type
 from src.config.agents import AGENT_LLM_MAP
+from src.config.configuration import Configuration
+
+
+class _ToolSet(tuple):
+    """Tuple of tools compared by identity so it can key the agent cache.
+
+    Holding the tools in the key keeps them alive, so their ids cannot be
+    reused by other objects while the cached agent exists.
+    """
+
+    def __hash__(self):
+        return hash(tuple(id(tool) for tool in self))
+
+    def __eq__(self, other):
+        return len(self) == len(other) and all(a is b for a, b in zip(self, other))
+
+
+def _compile_agent(
+    agent_name: str,
+    tools: list,
+    prompt_template: str,
+    llm_type: str,
+    model_id: Optional[str],
+):
+    """Build and compile a react agent."""
+
+    def prompt(state, config: RunnableConfig):
+        # Per-request settings come from the run config, not a closure
+        configurable = Configuration.from_runnable_config(config)
+        return apply_prompt_template(prompt_template, state, configurable)
+
+    # ToolNode runs all tool calls from one model turn concurrently
+    # (asyncio.gather under ainvoke), so independent MCP/tool round-trips overlap
+    return create_react_agent(
+        name=agent_name,
+        model=get_llm_by_type(llm_type, model_id),
+        tools=ToolNode(list(tools)),
+        prompt=prompt,
+    )
+
+
+@lru_cache(maxsize=64)
+def _build_agent(
+    agent_name: str,
+    tools: _ToolSet,
+    prompt_template: str,
+    llm_type: str,
+    model_id: Optional[str],
+):
+    """Compiled agent cached per name, tool instances, prompt and model."""
+    return _compile_agent(agent_name, list(tools), prompt_template, llm_type, model_id)
 
 
 # Create agents using configured LLM types
@@ -17,8 +71,17 @@ def create_agent(
     prompt_template: str,
     configurable=None,
     selected_models: Optional[Dict[str, str]] = None,
+    cache: bool = False,
 ):
-    """Factory function to create agents with consistent configuration."""
+    """Factory function to create agents with consistent configuration.
+
+    Per-request settings (custom prompts, etc.) are read from the run config
+    when the prompt is rendered, so ``configurable`` is not baked into the
+    agent. Pass ``cache=True`` only when every tool is a long-lived shared
+    instance; the compiled agent is then reused across calls with the same
+    tools and model. Agents built from per-request tools (MCP, retrievers)
+    would never hit the cache and would only pin those tools in memory.
+    """
 
     # Get the LLM type for this agent
     llm_type = AGENT_LLM_MAP.get(agent_type)
@@ -30,14 +93,8 @@ def create_agent(
     if selected_models and llm_type in selected_models:
         model_id = selected_models[llm_type]
 
-    # Get the LLM instance with optional model selection
-    model = get_llm_by_type(llm_type, model_id)
-
-    return create_react_agent(
-        name=agent_name,
-        model=model,
-        tools=tools,
-        prompt=lambda state: apply_prompt_template(
-            prompt_template, state, configurable
-        ),
-    )
+    if cache:
+        return _build_agent(
+            agent_name, _ToolSet(tools), prompt_template, llm_type, model_id
+        )
+    return _compile_agent(agent_name, tools, prompt_template, llm_type, model_id)
@@ -2,16 +2,86 @@
 Billing functionality for deer-flow using Stripe
 """
 
+import asyncio
 import os
-import json
+import httpx
+import orjson
 import stripe
-from typing import Dict, Optional, Any, cast
+from typing import Dict, List, Optional, Any, Tuple, cast
 from datetime import datetime
 from src.auth.database import get_supabase_client
+from src.auth.http import get_http_transport
 
 # Initialize Stripe with secret key
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "")  # Default to empty string
 
+# Retries (with the SDK's backoff) for 409/429/5xx and connection errors
+STRIPE_MAX_NETWORK_RETRIES = 2
+
+
+class HTTP2StripeClient(stripe.HTTPXClient):
+    """Stripe HTTP client whose async requests multiplex over HTTP/2.
+
+    Requests go through the process-wide transport from src.auth.http, so
+    concurrent webhook handlers share connections with each other and with
+    the Supabase client; the SDK still handles ID quoting, API versioning and
+    retries.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # The shared transport verifies certificates against the default CA
+        # store and does not use a proxy, so keep the SDK's own client when
+        # either setting asks for something else.
+        if not self._verify_ssl_certs or self._proxy:
+            return
+        # stripe has no hook for a custom transport; this swaps the private
+        # async client that HTTPXClient.__init__ builds (checked against the
+        # SDK range pinned in pyproject.toml). The replaced client has never
+        # opened a connection, so dropping it releases nothing.
+        self._client_async = httpx.AsyncClient(transport=get_http_transport())
+
+
+_stripe_http_client: Optional[HTTP2StripeClient] = None
+_stripe_client: Optional[stripe.StripeClient] = None
+
+
+def get_stripe_client() -> stripe.StripeClient:
+    """Get or create the async Stripe client."""
+    global _stripe_client, _stripe_http_client
+
+    if _stripe_client is None:
+        _stripe_http_client = HTTP2StripeClient()
+        _stripe_client = stripe.StripeClient(
+            stripe.api_key or "",
+            http_client=_stripe_http_client,
+            max_network_retries=STRIPE_MAX_NETWORK_RETRIES,
+        )
+
+    return _stripe_client
+
+
+def reset_stripe_client():
+    """Drop the Stripe client; its connections belong to the shared transport."""
+    global _stripe_client, _stripe_http_client
+
+    _stripe_client = None
+    _stripe_http_client = None
+
+
+def _current_period(
+    subscription: Dict[str, Any], item: Dict[str, Any]
+) -> Tuple[datetime, datetime]:
+    """Return the current billing period of a subscription.
+
+    API versions from 2025-03-31.basil report the period on the subscription
+    item rather than on the subscription itself.
+    """
+    start = item.get("current_period_start") or subscription.get("current_period_start")
+    end = item.get("current_period_end") or subscription.get("current_period_end")
+    return datetime.fromtimestamp(start), datetime.fromtimestamp(end)
+
+
 # Price IDs for different tiers
 PRICE_IDS = {
     "free": os.getenv("STRIPE_PRICE_FREE", ""),
@@ -21,17 +91,113 @@ PRICE_IDS = {
 }
 
 
+# Window during which checkout upserts are coalesced into one RPC call
+UPSERT_BATCH_INTERVAL_SECONDS = 0.05
+
+_upsert_queue: Optional[asyncio.Queue] = None
+_upsert_worker: Optional[asyncio.Task] = None
+
+
+async def _drain_subscription_upserts(queue: asyncio.Queue):
+    """Flush queued customer/subscription upserts in batches."""
+    while True:
+        batch: List[Tuple[Dict[str, Any], asyncio.Future]] = [await queue.get()]
+        await asyncio.sleep(UPSERT_BATCH_INTERVAL_SECONDS)
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+
+        try:
+            await _write_subscription_upserts(batch)
+        finally:
+            # Lets close_subscription_upserts() wait for in-flight batches
+            for _ in batch:
+                queue.task_done()
+
+
+async def _write_subscription_upserts(
+    batch: List[Tuple[Dict[str, Any], asyncio.Future]],
+):
+    """Write one batch with a single RPC call and resolve each caller's future."""
+    try:
+        client = await get_supabase_client()
+        response = await client.rpc(
+            "service_role_upsert_customer_subscriptions",
+            {"items": [item for item, _ in batch]},
+        ).execute()
+        results = response.data or []
+        if len(results) != len(batch):
+            raise RuntimeError(
+                f"Expected {len(batch)} upsert results, got {len(results)}"
+            )
+    except Exception as e:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+        return
+
+    # Each item is applied in its own savepoint, so one bad item only fails
+    # its own webhook
+    for (_, future), result in zip(batch, results):
+        if future.done():
+            continue
+        if result.get("ok"):
+            future.set_result(None)
+        else:
+            future.set_exception(Exception(result.get("error")))
+
+
+async def queue_subscription_upsert(item: Dict[str, Any]):
+    """Queue an upsert for the next batch and wait until it has been written."""
+    global _upsert_queue, _upsert_worker
+
+    loop = asyncio.get_running_loop()
+    if (
+        _upsert_worker is None
+        or _upsert_worker.done()
+        or _upsert_worker.get_loop() is not loop
+    ):
+        # A worker left behind by another event loop can never run again
+        _upsert_queue = asyncio.Queue()
+        _upsert_worker = loop.create_task(_drain_subscription_upserts(_upsert_queue))
+
+    future = loop.create_future()
+    await _upsert_queue.put((item, future))
+    await future
+
+
+async def close_subscription_upserts():
+    """Wait for queued upserts to be written, then stop the batch worker."""
+    global _upsert_queue, _upsert_worker
+
+    queue, worker = _upsert_queue, _upsert_worker
+    _upsert_queue = _upsert_worker = None
+    if worker is None or worker.get_loop() is not asyncio.get_running_loop():
+        # A worker left behind by another event loop can never run again
+        return
+
+    if worker.done():
+        return
+    await queue.join()
+    worker.cancel()
+    try:
+        await worker
+    except asyncio.CancelledError:
+        pass
+
+
 class BillingService:
     @staticmethod
     async def create_checkout_session(user_email: str, price_id: str) -> Dict[str, Any]:
         """Create a Stripe checkout session for subscription."""
         try:
-            session = stripe.checkout.Session.create(
-                customer_email=user_email,
-                line_items=[{"price": price_id, "quantity": 1}],
-                mode="subscription",
-                success_url="http://localhost:3000/settings?success=true",
-                cancel_url="http://localhost:3000/settings?canceled=true",
+            session = await get_stripe_client().checkout.sessions.create_async(
+                params={
+                    "customer_email": user_email,
+                    "line_items": [{"price": price_id, "quantity": 1}],
+                    "mode": "subscription",
+                    "success_url": "http://localhost:3000/settings?success=true",
+                    "cancel_url": "http://localhost:3000/settings?canceled=true",
+                }
             )
             return {"sessionId": session.id}
         except Exception as e:
@@ -41,9 +207,11 @@ class BillingService:
     async def create_billing_portal_session(customer_id: str) -> Dict[str, str]:
         """Create a Stripe billing portal session."""
         try:
-            session = stripe.billing_portal.Session.create(
-                customer=customer_id,
-                return_url="http://localhost:3000/settings",
+            session = await get_stripe_client().billing_portal.sessions.create_async(
+                params={
+                    "customer": customer_id,
+                    "return_url": "http://localhost:3000/settings",
+                }
             )
             return {"url": session.url}
         except Exception as e:
@@ -54,7 +222,7 @@ class BillingService:
         """Handle Stripe webhook events."""
         try:
             # For local development, we don't verify signatures
-            event_dict = json.loads(payload)
+            event_dict = orjson.loads(payload)
             event = stripe.Event.construct_from(event_dict, stripe.api_key)
 
             if event.type == "checkout.session.completed":
@@ -80,8 +248,6 @@ class BillingService:
     async def handle_successful_payment(session: Dict[str, Any]):
         """Handle successful checkout session completion."""
         try:
-            client = await get_supabase_client()
-
             # Get subscription and customer details
             subscription_id = session.get("subscription")
             customer_id = session.get("customer")
@@ -89,47 +255,48 @@ class BillingService:
             if not subscription_id or not customer_id:
                 raise ValueError("Missing subscription or customer ID")
 
-            subscription = stripe.Subscription.retrieve(str(subscription_id))
-            customer = stripe.Customer.retrieve(str(customer_id))
+            # Fetch both objects concurrently
+            stripe_client = get_stripe_client()
+            subscription, customer = await asyncio.gather(
+                stripe_client.subscriptions.retrieve_async(str(subscription_id)),
+                stripe_client.customers.retrieve_async(str(customer_id)),
+            )
+            item = subscription["items"]["data"][0]
+            period_start, period_end = _current_period(subscription, item)
 
             # Update billing_customers table
             customer_data = {
-                "id": customer.id,
-                "email": customer.email,
+                "id": customer["id"],
+                "email": customer.get("email"),
                 "provider": "stripe",
             }
 
             # Update billing_subscriptions table
             subscription_data = {
-                "id": subscription.id,
-                "billing_customer_id": customer.id,
-                "status": subscription.status,
-                "price_id": subscription.items.data[0].price.id,
-                "quantity": subscription.items.data[0].quantity,
-                "cancel_at_period_end": subscription.cancel_at_period_end,
-                "current_period_start": datetime.fromtimestamp(
-                    subscription.current_period_start
-                ),
-                "current_period_end": datetime.fromtimestamp(
-                    subscription.current_period_end
-                ),
-                "created": datetime.fromtimestamp(subscription.created),
-                "metadata": subscription.metadata,
+                "id": subscription["id"],
+                "billing_customer_id": customer["id"],
+                "status": subscription["status"],
+                "price_id": item["price"]["id"],
+                "quantity": item.get("quantity"),
+                "cancel_at_period_end": subscription["cancel_at_period_end"],
+                "current_period_start": period_start,
+                "current_period_end": period_end,
+                "created": datetime.fromtimestamp(subscription["created"]),
+                "metadata": subscription.get("metadata"),
             }
 
-            # Use the service_role_upsert_customer_subscription RPC function
+            # Batched through the service_role_upsert_customer_subscriptions RPC
             client_ref_id = session.get("client_reference_id")
             if not client_ref_id:
                 raise ValueError("Missing client reference ID")
 
-            await client.rpc(
-                "service_role_upsert_customer_subscription",
+            await queue_subscription_upsert(
                 {
                     "account_id": client_ref_id,
                     "customer": customer_data,
                     "subscription": subscription_data,
-                },
-            ).execute()
+                }
+            )
 
         except Exception as e:
             raise Exception(f"Error handling successful payment: {str(e)}")
@@ -144,26 +311,26 @@ class BillingService:
             if not sub_id:
                 raise ValueError("Missing subscription ID")
 
-            subscription = stripe.Subscription.retrieve(str(sub_id))
+            subscription = await get_stripe_client().subscriptions.retrieve_async(
+                str(sub_id)
+            )
+            item = subscription["items"]["data"][0]
+            period_start, period_end = _current_period(subscription, item)
 
             subscription_update = {
-                "id": subscription.id,
-                "status": subscription.status,
-                "price_id": subscription.items.data[0].price.id,
-                "quantity": subscription.items.data[0].quantity,
-                "cancel_at_period_end": subscription.cancel_at_period_end,
-                "current_period_start": datetime.fromtimestamp(
-                    subscription.current_period_start
-                ),
-                "current_period_end": datetime.fromtimestamp(
-                    subscription.current_period_end
-                ),
-                "metadata": subscription.metadata,
+                "id": subscription["id"],
+                "status": subscription["status"],
+                "price_id": item["price"]["id"],
+                "quantity": item.get("quantity"),
+                "cancel_at_period_end": subscription["cancel_at_period_end"],
+                "current_period_start": period_start,
+                "current_period_end": period_end,
+                "metadata": subscription.get("metadata"),
             }
 
             # Update subscription in database
             await client.from_("billing_subscriptions").update(subscription_update).eq(
-                "id", subscription.id
+                "id", subscription["id"]
             ).execute()
 
         except Exception as e:
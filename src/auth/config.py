@@ -14,6 +14,7 @@ Usage:
     env_mode = config.ENV_MODE
 """
 
+import functools
 import os
 from enum import Enum
 from typing import Dict, Any, Optional, get_type_hints, Union
@@ -62,55 +63,6 @@ class Configuration:
     STRIPE_TIER_125_800_ID_STAGING: str = "price_1RIKNrG6l1KZGqIrjKT0yGvI"
     STRIPE_TIER_200_1000_ID_STAGING: str = "price_1RIKQ2G6l1KZGqIrum9n8SI7"
 
-    # Computed subscription tier IDs based on environment
-    @property
-    def STRIPE_FREE_TIER_ID(self) -> str:
-        if self.ENV_MODE == EnvMode.STAGING:
-            return self.STRIPE_FREE_TIER_ID_STAGING
-        return self.STRIPE_FREE_TIER_ID_PROD
-
-    @property
-    def STRIPE_TIER_2_20_ID(self) -> str:
-        if self.ENV_MODE == EnvMode.STAGING:
-            return self.STRIPE_TIER_2_20_ID_STAGING
-        return self.STRIPE_TIER_2_20_ID_PROD
-
-    @property
-    def STRIPE_TIER_6_50_ID(self) -> str:
-        if self.ENV_MODE == EnvMode.STAGING:
-            return self.STRIPE_TIER_6_50_ID_STAGING
-        return self.STRIPE_TIER_6_50_ID_PROD
-
-    @property
-    def STRIPE_TIER_12_100_ID(self) -> str:
-        if self.ENV_MODE == EnvMode.STAGING:
-            return self.STRIPE_TIER_12_100_ID_STAGING
-        return self.STRIPE_TIER_12_100_ID_PROD
-
-    @property
-    def STRIPE_TIER_25_200_ID(self) -> str:
-        if self.ENV_MODE == EnvMode.STAGING:
-            return self.STRIPE_TIER_25_200_ID_STAGING
-        return self.STRIPE_TIER_25_200_ID_PROD
-
-    @property
-    def STRIPE_TIER_50_400_ID(self) -> str:
-        if self.ENV_MODE == EnvMode.STAGING:
-            return self.STRIPE_TIER_50_400_ID_STAGING
-        return self.STRIPE_TIER_50_400_ID_PROD
-
-    @property
-    def STRIPE_TIER_125_800_ID(self) -> str:
-        if self.ENV_MODE == EnvMode.STAGING:
-            return self.STRIPE_TIER_125_800_ID_STAGING
-        return self.STRIPE_TIER_125_800_ID_PROD
-
-    @property
-    def STRIPE_TIER_200_1000_ID(self) -> str:
-        if self.ENV_MODE == EnvMode.STAGING:
-            return self.STRIPE_TIER_200_1000_ID_STAGING
-        return self.STRIPE_TIER_200_1000_ID_PROD
-
     # Stripe configuration
     STRIPE_SECRET_KEY: Optional[str] = None
     STRIPE_WEBHOOK_SECRET: Optional[str] = None
@@ -121,11 +73,29 @@ class Configuration:
     STRIPE_PRODUCT_ID_PROD: str = "prod_SCl7AQ2C8kK1CD"
     STRIPE_PRODUCT_ID_STAGING: str = "prod_SduuIP4pVCzDJG"
 
-    @property
-    def STRIPE_PRODUCT_ID(self) -> str:
-        if self.ENV_MODE == EnvMode.STAGING:
-            return self.STRIPE_PRODUCT_ID_STAGING
-        return self.STRIPE_PRODUCT_ID_PROD
+    # Active IDs for the current ENV_MODE, resolved in __init__
+    STRIPE_FREE_TIER_ID: str
+    STRIPE_TIER_2_20_ID: str
+    STRIPE_TIER_6_50_ID: str
+    STRIPE_TIER_12_100_ID: str
+    STRIPE_TIER_25_200_ID: str
+    STRIPE_TIER_50_400_ID: str
+    STRIPE_TIER_125_800_ID: str
+    STRIPE_TIER_200_1000_ID: str
+    STRIPE_PRODUCT_ID: str
+
+    # Environment-specific IDs resolved from their _PROD/_STAGING variants
+    _ENV_SPECIFIC_IDS = (
+        "STRIPE_FREE_TIER_ID",
+        "STRIPE_TIER_2_20_ID",
+        "STRIPE_TIER_6_50_ID",
+        "STRIPE_TIER_12_100_ID",
+        "STRIPE_TIER_25_200_ID",
+        "STRIPE_TIER_50_400_ID",
+        "STRIPE_TIER_125_800_ID",
+        "STRIPE_TIER_200_1000_ID",
+        "STRIPE_PRODUCT_ID",
+    )
 
     def __init__(self):
         """Initialize configuration by loading from environment variables."""
@@ -145,12 +115,28 @@ class Configuration:
         # Load configuration from environment variables
         self._load_from_env()
 
+        # Resolve environment-specific IDs once; ENV_MODE is fixed after boot
+        suffix = "_STAGING" if self.ENV_MODE == EnvMode.STAGING else "_PROD"
+        for name in self._ENV_SPECIFIC_IDS:
+            setattr(self, name, getattr(self, name + suffix))
+
         # Perform validation
         self._validate()
 
+        # Snapshot the public values; configuration is not mutated after boot
+        self._as_dict = {
+            key: getattr(self, key)
+            for key in self._type_hints()
+            if not key.startswith("_")
+        }
+
     def _load_from_env(self):
         """Load configuration values from environment variables."""
-        for key, expected_type in get_type_hints(self.__class__).items():
+        for key, expected_type in self._type_hints().items():
+            if key in self._ENV_SPECIFIC_IDS:
+                # Derived from the _PROD/_STAGING variants, not read directly
+                continue
+
             env_val = os.getenv(key)
 
             if env_val is not None:
@@ -177,12 +163,9 @@ class Configuration:
 
     def _validate(self):
         """Validate configuration based on type hints."""
-        # Get all configuration fields and their type hints
-        type_hints = get_type_hints(self.__class__)
-
         # Find missing required fields
         missing_fields = []
-        for field, field_type in type_hints.items():
+        for field, field_type in self._type_hints().items():
             # Check if the field is Optional
             is_optional = (
                 hasattr(field_type, "__origin__")
@@ -201,17 +184,19 @@ class Configuration:
             logger.error(error_msg)
             raise ValueError(error_msg)
 
+    @classmethod
+    @functools.cache
+    def _type_hints(cls) -> Dict[str, Any]:
+        """Resolve the class annotations once per class."""
+        return get_type_hints(cls)
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get a configuration value with an optional default."""
         return getattr(self, key, default)
 
     def as_dict(self) -> Dict[str, Any]:
         """Return configuration as a dictionary."""
-        return {
-            key: getattr(self, key)
-            for key in get_type_hints(self.__class__).keys()
-            if not key.startswith("_")
-        }
+        return self._as_dict.copy()
 
 
 # Create a singleton instance
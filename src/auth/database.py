@@ -2,32 +2,66 @@
 Database connection utilities for deer-flow Supabase integration
 """
 
+import asyncio
 import os
-from supabase import create_async_client, AsyncClient
+import httpx
+from dotenv import load_dotenv
+from supabase import create_async_client, AsyncClient, AsyncClientOptions
 from typing import Optional
 import logging
 
+from src.auth.http import get_http_transport
+
 logger = logging.getLogger(__name__)
 
+load_dotenv()
+
+# Connection settings are fixed for the lifetime of the process
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+
+# Matches the supabase client's own PostgREST default
+SUPABASE_HTTP_TIMEOUT_SECONDS = 120
+
 _client: Optional[AsyncClient] = None
+_client_lock = asyncio.Lock()
 
 
 async def get_supabase_client() -> AsyncClient:
-    """Get or create the Supabase client."""
+    """Get or create the shared Supabase client."""
     global _client
 
-    if _client is None:
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv(
-            "SUPABASE_ANON_KEY"
-        )
+    if _client is not None:
+        return _client
+
+    async with _client_lock:
+        if _client is not None:
+            return _client
 
-        if not supabase_url or not supabase_key:
+        if not SUPABASE_URL or not SUPABASE_KEY:
             raise RuntimeError(
                 "SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables must be set"
             )
 
-        _client = await create_async_client(supabase_url, supabase_key)
+        # PostgREST and Auth share one httpx client on the process-wide
+        # transport, so they reuse the same connections as the Stripe client
+        http_client = httpx.AsyncClient(
+            transport=get_http_transport(),
+            timeout=SUPABASE_HTTP_TIMEOUT_SECONDS,
+            follow_redirects=True,
+        )
+        _client = await create_async_client(
+            SUPABASE_URL,
+            SUPABASE_KEY,
+            options=AsyncClientOptions(httpx_client=http_client),
+        )
         logger.info("Supabase client initialized")
 
     return _client
+
+
+def reset_supabase_client():
+    """Drop the Supabase client; its connections belong to the shared transport."""
+    global _client
+
+    _client = None
@@ -0,0 +1,43 @@
+"""
+Shared HTTP connection pool for outbound API clients (Stripe, Supabase)
+"""
+
+from typing import Optional
+
+import httpx
+
+# Limits for the pool shared by every upstream API client in the process
+HTTP_MAX_CONNECTIONS = 200
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+
+_transport: Optional[httpx.AsyncHTTPTransport] = None
+
+
+def get_http_transport() -> httpx.AsyncHTTPTransport:
+    """Get or create the shared HTTP/2 transport.
+
+    Clients built on it share one connection pool, so TLS sessions and
+    connections to each upstream are reused across Stripe and Supabase calls.
+    Each client keeps its own base URL, headers and timeouts.
+    """
+    global _transport
+
+    if _transport is None:
+        _transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+
+    return _transport
+
+
+async def close_http_transport():
+    """Close the shared transport and every connection in its pool."""
+    global _transport
+
+    if _transport is not None:
+        await _transport.aclose()
+        _transport = None
@@ -4,87 +4,192 @@ Authentication middleware for extracting user context from requests
 
 import logging
 import os
-from typing import Optional, Callable, Awaitable
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+import jwt
+
+from fastapi import Request
 from starlette.types import ASGIApp, Receive, Scope, Send
-from supabase import create_async_client, AsyncClient
+
+from supabase import AuthApiError
+
+from src.auth.database import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
-# Cache for Supabase client
-_supabase_client: Optional[AsyncClient] = None
+# Legacy (HS256) secret used to verify Supabase JWTs locally; tokens signed
+# with asymmetric signing keys are still verified by Supabase Auth
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
 
+TOKEN_CACHE_MAX_SIZE = 10_000
+TOKEN_CACHE_TTL_SECONDS = 300
+# Rejected tokens are remembered briefly so repeated bad tokens skip Supabase
+REJECTED_TOKEN_TTL_SECONDS = 30
 
-async def get_auth_client() -> AsyncClient:
-    """Get or create the Supabase auth client"""
-    global _supabase_client
 
-    if _supabase_client is None:
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv(
-            "SUPABASE_ANON_KEY"
-        )
+class TokenCache:
+    """Bounded LRU token -> user ID cache whose entries expire at a given time"""
 
-        if not supabase_url or not supabase_key:
-            raise RuntimeError(
-                "SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables must be set"
-            )
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, Tuple[Optional[str], float]] = OrderedDict()
 
-        _supabase_client = await create_async_client(supabase_url, supabase_key)
-        logger.info("Supabase auth client initialized")
+    def get(self, token: str) -> Tuple[bool, Optional[str]]:
+        """Return (hit, user_id) for a token"""
+        entry = self._entries.get(token)
+        if entry is None:
+            return False, None
+        user_id, expires_at = entry
+        if expires_at <= time.time():
+            self._entries.pop(token, None)
+            return False, None
+        self._entries.move_to_end(token)
+        return True, user_id
 
-    return _supabase_client
+    def set(self, token: str, user_id: Optional[str], expires_at: float):
+        """Cache a token until expires_at (epoch seconds)"""
+        if token in self._entries:
+            self._entries.move_to_end(token)
+        elif len(self._entries) >= self.max_size:
+            # Evict the least recently used entry
+            self._entries.popitem(last=False)
+        self._entries[token] = (user_id, expires_at)
 
+    def clear(self):
+        """Remove all cached tokens"""
+        self._entries.clear()
 
-async def extract_token(request: Request) -> Optional[str]:
-    """Extract authentication token from request"""
-    auth_header = request.headers.get("Authorization")
 
+_verified_tokens = TokenCache(TOKEN_CACHE_MAX_SIZE)
+_rejected_tokens = TokenCache(TOKEN_CACHE_MAX_SIZE)
+
+
+def _parse_bearer(auth_header: Optional[str]) -> Optional[str]:
+    """Extract the bearer token from an Authorization header value"""
     if not auth_header:
         return None
 
-    parts = auth_header.split()
+    # Scheme and token may be separated by any whitespace; anything after the
+    # token invalidates the header. maxsplit bounds the work on long headers.
+    parts = auth_header.split(maxsplit=2)
     if len(parts) != 2 or parts[0].lower() != "bearer":
         return None
 
     return parts[1]
 
 
+async def extract_token(request: Request) -> Optional[str]:
+    """Extract authentication token from request"""
+    return _parse_bearer(request.headers.get("Authorization"))
+
+
+def _authorization_header(scope: Scope) -> Optional[str]:
+    """Read the Authorization header straight from the ASGI scope"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            return value.decode("latin-1")
+    return None
+
+
+async def _verify_token_remote(token: str) -> Optional[str]:
+    """Verify token against Supabase Auth and return user ID if valid"""
+    client = await get_supabase_client()
+    user = await client.auth.get_user(token)
+    return user.user.id if user and user.user else None
+
+
+def _is_rejection(error: Exception) -> bool:
+    """Whether an error means the token itself is invalid (not an outage)"""
+    if isinstance(error, jwt.InvalidTokenError):
+        return True
+    # Supabase Auth answers 4xx for bad or expired tokens; 429 and 5xx are
+    # transient and must not lock valid users out
+    return (
+        isinstance(error, AuthApiError)
+        and error.status is not None
+        and 400 <= error.status < 500
+        and error.status != 429
+    )
+
+
+def _reject_token(token: str):
+    """Remember a failed token for REJECTED_TOKEN_TTL_SECONDS"""
+    _rejected_tokens.set(token, None, time.time() + REJECTED_TOKEN_TTL_SECONDS)
+
+
 async def verify_token(token: str) -> Optional[str]:
-    """Verify token and return user ID if valid"""
+    """Verify token and return user ID if valid
+
+    Verified tokens are cached for up to TOKEN_CACHE_TTL_SECONDS (never past
+    their exp claim), so a token revoked by logout keeps working until its
+    cache entry expires.
+    """
+    hit, user_id = _verified_tokens.get(token)
+    if hit:
+        return user_id
+    if _rejected_tokens.get(token)[0]:
+        return None
+
     try:
-        client = await get_auth_client()
-        # Verify JWT token
-        user = await client.auth.get_user(token)
-        return user.user.id if user and user.user else None
+        if (
+            SUPABASE_JWT_SECRET
+            and jwt.get_unverified_header(token).get("alg") == "HS256"
+        ):
+            # Verify the signature locally instead of calling Supabase Auth
+            payload = jwt.decode(
+                token,
+                SUPABASE_JWT_SECRET,
+                algorithms=["HS256"],
+                options={"verify_aud": False},
+            )
+            user_id = payload.get("sub")
+        else:
+            user_id = await _verify_token_remote(token)
+            payload = jwt.decode(token, options={"verify_signature": False})
+
+        if user_id:
+            expires_at = time.time() + TOKEN_CACHE_TTL_SECONDS
+            if payload.get("exp"):
+                expires_at = min(expires_at, float(payload["exp"]))
+            _verified_tokens.set(token, user_id, expires_at)
+        else:
+            _reject_token(token)
+        return user_id
     except Exception as e:
         logger.error(f"Error verifying token: {str(e)}")
-        print(f"[DEBUG] Token verification error: {str(e)}")  # Debug print
+        if _is_rejection(e):
+            _reject_token(token)
         return None
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """Middleware for extracting user context from requests"""
+class AuthMiddleware:
+    """Middleware for extracting user context from requests
+
+    Implemented as plain ASGI rather than BaseHTTPMiddleware, so requests are
+    passed straight through without building a Request or running the app in
+    a separate task.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-    async def dispatch(self, request: Request, call_next):
-        """Process the request and extract user context"""
-        # Extract token from request
-        token = await extract_token(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            token = _parse_bearer(_authorization_header(scope))
 
-        if token:
-            # Verify token and get user ID
-            user_id = await verify_token(token)
-            if user_id:
-                # Attach user ID to request state
-                request.state.user_id = user_id
-                logger.debug(f"Authenticated user: {user_id}")
+            if token:
+                # Verify token and get user ID
+                user_id = await verify_token(token)
+                if user_id:
+                    # Attach user ID to the scope state read by request.state
+                    scope.setdefault("state", {})["user_id"] = user_id
+                    logger.debug("Authenticated user: %s", user_id)
 
-        # Continue with request processing
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
 
 def get_user_id_from_request(request: Request) -> Optional[str]:
-    """Get user ID from request state"""
-    return getattr(request.state, "user_id", None)
+    """Get the user ID AuthMiddleware stored for this request"""
+    return request.scope.get("state", {}).get("user_id")
@@ -1,20 +1,29 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, func
+from sqlalchemy import Column, Integer, DateTime, Index, func
 from src.backend.database.base import Base
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 
 class UserSettings(Base):
     __tablename__ = "user_settings"
+    __table_args__ = (
+        # jsonb_path_ops keeps the index small and serves @> containment queries
+        Index(
+            "ix_user_settings_gin",
+            "settings",
+            postgresql_using="gin",
+            postgresql_ops={"settings": "jsonb_path_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
-    settings = Column(JSON, nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=False, unique=True, index=True)
+    settings = Column(JSONB, nullable=False)
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    # Set by the application on update, see settings_crud
     updated_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
-        onupdate=func.now(),
         nullable=False,
     )
@@ -2,11 +2,20 @@
 SQLAlchemy session management for deer-flow
 """
 
+import asyncio
 import os
 import logging
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Sequence
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
+from sqlalchemy.sql import Executable
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +28,43 @@ DATABASE_URL = os.getenv(
     ),
 )
 
+# Connection pool sizing, shared by every session in the process
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "20"))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+DATABASE_POOL_RECYCLE_SECONDS = 1800
+
+# Prepared statements cached per asyncpg connection. Set to 0 behind pgbouncer in
+# transaction mode, where a statement prepared on one server connection is not
+# visible on the next.
+DATABASE_STATEMENT_CACHE_SIZE = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "512"))
+
+# Rows per statement when a bulk INSERT ... RETURNING is batched by insertmanyvalues
+DATABASE_INSERTMANYVALUES_PAGE_SIZE = int(
+    os.getenv("DATABASE_INSERTMANYVALUES_PAGE_SIZE", "1000")
+)
+
+
+def _connect_args(url: str) -> dict:
+    """Driver-level connection arguments for the configured database URL"""
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    return {
+        "prepared_statement_cache_size": DATABASE_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": DATABASE_STATEMENT_CACHE_SIZE,
+    }
+
+
 # Create async engine
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DATABASE_POOL_SIZE,
+    max_overflow=DATABASE_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=DATABASE_POOL_RECYCLE_SECONDS,
+    insertmanyvalues_page_size=DATABASE_INSERTMANYVALUES_PAGE_SIZE,
+    connect_args=_connect_args(DATABASE_URL),
 )
 
 # Create async session factory
@@ -41,3 +83,46 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
     finally:
         await session.close()
+
+
+async def _prepare_statements(conn: AsyncConnection, statements: Sequence[Executable]):
+    """Run each statement once in a rolled-back transaction, then release `conn`
+
+    Leaves the statements in the connection's prepared statement cache.
+    """
+    try:
+        for statement in statements:
+            try:
+                transaction = await conn.begin()
+                try:
+                    await conn.execute(statement)
+                finally:
+                    await transaction.rollback()
+            except Exception as e:
+                logger.debug(f"Could not prepare warm-up statement: {e}")
+    finally:
+        await conn.close()
+
+
+async def warm_up_pool(
+    size: int = DATABASE_POOL_SIZE, statements: Sequence[Executable] = ()
+):
+    """Open `size` connections up front and return them to the pool
+
+    Avoids a burst of concurrent connects on the first requests after startup.
+    `statements` are prepared on every connection, so the first requests reuse
+    their parse and plan.
+    """
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(size)), return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    await asyncio.gather(
+        *(
+            _prepare_statements(conn, statements)
+            for conn in results
+            if not isinstance(conn, BaseException)
+        )
+    )
+    if errors:
+        logger.warning(f"Could not warm up the database pool: {errors[0]}")
@@ -1,63 +1,57 @@
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from src.backend.database.models import UserSettings
-from typing import Optional, Dict, Any, cast, Union
+from typing import List, Optional, Dict, Any, cast
 import uuid
 
 
+def _select_settings(user_id: uuid.UUID):
+    # Only the settings column is needed, so skip building an ORM instance
+    return select(UserSettings.settings).where(UserSettings.user_id == user_id).limit(1)
+
+
+def warm_up_statements() -> List:
+    """Read statements run on most requests, to prepare when the pool warms up"""
+    return [_select_settings(uuid.UUID(int=0))]
+
+
 async def get_settings_by_user_id(
-    session: AsyncSession, user_id: Union[str, uuid.UUID]
+    session: AsyncSession, user_id: uuid.UUID
 ) -> Optional[Dict[str, Any]]:
-    # Ensure user_id is a UUID object
-    if isinstance(user_id, str):
-        user_id = uuid.UUID(user_id)
-    result = await session.execute(
-        select(UserSettings).where(UserSettings.user_id == user_id)
-    )
-    settings_obj = result.scalars().first()
-    if settings_obj:
-        return cast(Dict[str, Any], settings_obj.settings)
-    return None
+    result = await session.execute(_select_settings(user_id))
+    return cast(Optional[Dict[str, Any]], result.scalar_one_or_none())
 
 
 async def upsert_settings_by_user_id(
-    session: AsyncSession, user_id: Union[str, uuid.UUID], settings: Dict[str, Any]
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    settings: Dict[str, Any],
+    commit: bool = True,
 ) -> Dict[str, Any]:
-    if isinstance(user_id, str):
-        user_id = uuid.UUID(user_id)
-    result = await session.execute(
-        select(UserSettings).where(UserSettings.user_id == user_id)
-    )
-    settings_obj = result.scalars().first()
-    if settings_obj:
-        settings_obj.settings = cast(Any, settings)
-    else:
-        settings_obj = UserSettings(user_id=user_id, settings=settings)
-        session.add(settings_obj)
-    await session.commit()
-    await session.refresh(settings_obj)
-    return cast(Dict[str, Any], settings_obj.settings)
+    # Single round-trip: insert or overwrite and read back in one statement
+    insert_stmt = pg_insert(UserSettings).values(user_id=user_id, settings=settings)
+    stmt = insert_stmt.on_conflict_do_update(
+        index_elements=[UserSettings.user_id],
+        set_={
+            "settings": insert_stmt.excluded.settings,
+            "updated_at": datetime.now(timezone.utc),
+        },
+    ).returning(UserSettings.settings)
+    result = await session.execute(stmt)
+    saved = result.scalar_one()
+    if commit:
+        await session.commit()
+    return cast(Dict[str, Any], saved)
 
 
 async def reset_settings_by_user_id(
     session: AsyncSession,
-    user_id: Union[str, uuid.UUID],
+    user_id: uuid.UUID,
     default_settings: Dict[str, Any],
+    commit: bool = True,
 ) -> Dict[str, Any]:
-    if isinstance(user_id, str):
-        user_id = uuid.UUID(user_id)
-    result = await session.execute(
-        select(UserSettings).where(UserSettings.user_id == user_id)
+    return await upsert_settings_by_user_id(
+        session, user_id, default_settings, commit=commit
     )
-    settings_obj = result.scalars().first()
-    if settings_obj:
-        settings_obj.settings = cast(Any, default_settings)
-        await session.commit()
-        await session.refresh(settings_obj)
-        return cast(Dict[str, Any], settings_obj.settings)
-    else:
-        settings_obj = UserSettings(user_id=user_id, settings=default_settings)
-        session.add(settings_obj)
-        await session.commit()
-        await session.refresh(settings_obj)
-        return cast(Dict[str, Any], settings_obj.settings)
@@ -3,47 +3,50 @@ User context management for database sessions
 """
 
 import logging
-from typing import AsyncGenerator, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.backend.database.session import get_session
+from src.backend.database.session import async_session_factory
 
 logger = logging.getLogger(__name__)
 
 
+def _open_user_session(user_id: str) -> AsyncSession:
+    """Create a session tagged with the given user"""
+    session = async_session_factory()
+    # Set session info that can be used by query filters
+    session.info["user_id"] = user_id
+    logger.debug("Created session with user context: %s", user_id)
+    return session
+
+
 class UserSessionContext:
     """Context manager that attaches user context to database sessions"""
 
     def __init__(self, user_id: str):
         """Initialize with user ID"""
         self.user_id = user_id
+        self._session: Optional[AsyncSession] = None
 
-    async def get_session(self) -> AsyncSession:
-        """Get a session with user context"""
-        session_gen = get_session()
-        session = await session_gen.__anext__()
-
-        # Set session info that can be used by query filters
-        session.info["user_id"] = self.user_id
-        logger.debug(f"Created session with user context: {self.user_id}")
-
-        return session
-
+    async def __aenter__(self) -> AsyncSession:
+        """Open a session with user context"""
+        self._session = _open_user_session(self.user_id)
+        return self._session
 
-async def get_user_session(user_id: str) -> AsyncGenerator[AsyncSession, None]:
-    """Get a session with user context"""
-    session_gen = get_session()
-    session = await session_gen.__anext__()
+    async def __aexit__(self, exc_type, exc, tb):
+        """Close the session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
-    try:
-        # Set session info that can be used by query filters
-        session.info["user_id"] = user_id
-        logger.debug(f"Created session with user context: {user_id}")
 
+@asynccontextmanager
+async def get_user_session(user_id: str) -> AsyncIterator[AsyncSession]:
+    """Get a session with user context, closed when the block exits"""
+    async with _open_user_session(user_id) as session:
         yield session
-    finally:
-        await session.close()
 
 
 def get_user_id_from_session(session: AsyncSession) -> Optional[str]:
@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: MIT
 
 from .tools import SELECTED_SEARCH_ENGINE, SearchEngine
-from .loader import load_yaml_config
+from .loader import clear_config_cache, load_yaml_config
 from .questions import BUILT_IN_QUESTIONS, BUILT_IN_QUESTIONS_ZH_CN
 
 from dotenv import load_dotenv
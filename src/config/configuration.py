@@ -3,8 +3,11 @@
 
 import os
 from dataclasses import dataclass, field, fields
+from functools import lru_cache
 from typing import Any, Optional, Dict
 
+from jinja2 import Template, TemplateSyntaxError, meta
+
 from src.rag.retriever import Resource
 from src.config.report_style import ReportStyle
 
@@ -29,6 +32,24 @@ class Configuration:
     model_parameters: Optional[Dict[str, Dict[str, float]]] = (
         None  # Model parameters: {"model_id": {"temperature": 0.7, "max_tokens": 2048}}
     )
+    compiled_custom_prompts: Dict[str, Template] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )  # Non-blank custom prompts, compiled when the configuration is built
+    custom_prompt_errors: Dict[str, TemplateSyntaxError] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )  # Custom prompts that failed to compile, raised when that prompt is applied
+
+    def __post_init__(self):
+        if not self.custom_prompts:
+            return
+        for name, source in self.custom_prompts.items():
+            if not source or not source.strip():
+                continue
+            # Prompts come from users; a broken one must only fail its own agent
+            try:
+                self.compiled_custom_prompts[name] = _compile_custom_prompt(source)
+            except TemplateSyntaxError as e:
+                self.custom_prompt_errors[name] = e
 
     @classmethod
     def from_runnable_config(cls, config: Optional[dict] = None) -> "Configuration":
@@ -36,9 +57,25 @@ class Configuration:
         configurable = (
             config["configurable"] if config and "configurable" in config else {}
         )
-        values: dict[str, Any] = {
-            f.name: os.environ.get(f.name.upper(), configurable.get(f.name))
-            for f in fields(cls)
-            if f.init
-        }
-        return cls(**{k: v for k, v in values.items() if v})
+        values: dict[str, Any] = {}
+        for name, env_name in _FIELD_NAMES:
+            value = os.environ.get(env_name, configurable.get(name))
+            if value:
+                values[name] = value
+        return cls(**values)
+
+
+@lru_cache(maxsize=512)
+def _compile_custom_prompt(source: str) -> Template:
+    """Compile a custom prompt once and share it across configurations"""
+    template = Template(source)
+    template.referenced_variables = tuple(
+        sorted(meta.find_undeclared_variables(template.environment.parse(source)))
+    )
+    return template
+
+
+# (field name, environment variable) pairs, resolved once instead of per call
+_FIELD_NAMES: tuple[tuple[str, str], ...] = tuple(
+    (f.name, f.name.upper()) for f in fields(Configuration) if f.init
+)
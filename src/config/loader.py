@@ -3,7 +3,7 @@
 
 import os
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 
 def replace_env_vars(value: str) -> str:
@@ -31,18 +31,26 @@ def process_dict(config: Dict[str, Any]) -> Dict[str, Any]:
     return result
 
 
-_config_cache: Dict[str, Dict[str, Any]] = {}
+# file path -> (mtime_ns, processed config)
+_config_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
 
 
 def load_yaml_config(file_path: str) -> Dict[str, Any]:
-    """Load and process YAML configuration file."""
+    """Load and process YAML configuration file.
+
+    The parsed config is cached per path and reloaded when the file's
+    modification time changes.
+    """
     # 如果文件不存在，返回{}
-    if not os.path.exists(file_path):
+    try:
+        mtime_ns = os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
         return {}
 
     # 检查缓存中是否已存在配置
-    if file_path in _config_cache:
-        return _config_cache[file_path]
+    cached = _config_cache.get(file_path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
 
     # 如果缓存中不存在，则加载并处理配置
     with open(file_path, "r") as f:
@@ -50,5 +58,10 @@ def load_yaml_config(file_path: str) -> Dict[str, Any]:
     processed_config = process_dict(config)
 
     # 将处理后的配置存入缓存
-    _config_cache[file_path] = processed_config
+    _config_cache[file_path] = (mtime_ns, processed_config)
     return processed_config
+
+
+def clear_config_cache():
+    """Drop all cached configuration files."""
+    _config_cache.clear()
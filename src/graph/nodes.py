@@ -490,6 +490,7 @@ async def _setup_and_execute_agent_step(
     config: RunnableConfig,
     agent_type: str,
     default_tools: list,
+    cache_agent: bool = False,
 ) -> Command[Literal["research_team"]]:
     """Helper function to set up an agent with appropriate tools and execute a step.
 
@@ -503,6 +504,8 @@ async def _setup_and_execute_agent_step(
         config: The runnable config
         agent_type: The type of agent ("researcher" or "coder")
         default_tools: The default tools to add to the agent
+        cache_agent: Whether the default tools are shared instances, so the
+            compiled agent can be reused across requests
 
     Returns:
         Command to update state and go to research_team
@@ -554,6 +557,7 @@ async def _setup_and_execute_agent_step(
             agent_type,
             configurable,
             configurable.selected_models,
+            cache=cache_agent,
         )
         return await _execute_agent_step(state, agent, agent_type)
 
@@ -574,6 +578,8 @@ async def researcher_node(
         config,
         "researcher",
         tools,
+        # The retriever tool is built per request from the state's resources
+        cache_agent=retriever_tool is None,
     )
 
 
@@ -587,4 +593,5 @@ async def coder_node(
         config,
         "coder",
         [python_repl_tool],
+        cache_agent=True,
     )
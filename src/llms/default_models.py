@@ -1,7 +1,8 @@
 from typing import List, Optional
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.llms.model_info import ModelInfo
-from src.llms.llm import get_configured_llm_models
+from src.llms.llm import get_configured_model_index
 
 # List of default model IDs to assign to new accounts
 DEFAULT_MODEL_IDS = [
@@ -16,46 +17,52 @@ def get_model_config_by_id(model_id: str) -> Optional[dict]:
     Look up the model config from the configured LLM models by model_id.
     Returns the model config dict, or None if not found.
     """
-    all_models = get_configured_llm_models()
-    for models in all_models.values():
-        for model in models:
-            if model["id"] == model_id:
-                return model
-    return None
+    return get_configured_model_index().get(model_id)
 
 
 async def initialize_default_models_for_account(
-    account_id: str, session: AsyncSession
+    account_id: str, session: AsyncSession, commit: bool = True
 ) -> List[str]:
     """
     Ensure that the default models are associated with the given account.
-    For each required model, if it does not exist for the account, create it.
+    Models the account is missing are inserted together in a single statement.
     Args:
         account_id (str): The account/user ID to associate models with.
         session (AsyncSession): SQLAlchemy async session.
+        commit (bool): Commit the insert; pass False to batch it with other writes.
     Returns:
         List[str]: List of model IDs that were created (empty if all already existed).
     """
-    created_model_ids = []
+    # Fetch the defaults this account already has in one query
+    existing = await ModelInfo.get_by_ids(session, account_id, DEFAULT_MODEL_IDS)
+    existing_ids = {model.id for model in existing}
+
+    rows = []
     for model_id in DEFAULT_MODEL_IDS:
-        # Check if model already exists for this account
-        existing = await ModelInfo.get_by_id(session, model_id)
-        if existing and getattr(existing, "account_id", None) == account_id:
+        if model_id in existing_ids:
             continue  # Already exists for this account
         # Get the model config from the global config
         model_config = get_model_config_by_id(model_id)
         if not model_config:
             continue  # Model not found in config, skip
-        # Prepare model data for this account
-        model_data = dict(model_config)
-        model_data["account_id"] = account_id
-        # Use get_or_create to avoid duplicates
-        await ModelInfo.get_or_create(session, model_data)
-        created_model_ids.append(model_id)
-    return created_model_ids
+        rows.append({**model_config, "account_id": account_id})
+    if not rows:
+        return []
+
+    # Insert every missing model in one statement; IDs already taken are skipped
+    result = await session.execute(
+        pg_insert(ModelInfo)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[ModelInfo.id])
+        .returning(ModelInfo.id)
+    )
+    inserted_ids = set(result.scalars().all())
+    if commit:
+        await session.commit()
+    return [row["id"] for row in rows if row["id"] in inserted_ids]
 
 
 # Usage example (in an async context):
 # from src.backend.database.user_context import get_user_session
-# async for session in get_user_session(account_id):
+# async with get_user_session(account_id) as session:
 #     await initialize_default_models_for_account(account_id, session)
@@ -1,6 +1,7 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 import os
@@ -11,11 +12,31 @@ from langchain_openai import ChatOpenAI
 from langchain_deepseek import ChatDeepSeek
 from typing import get_args
 
-from src.config import load_yaml_config
+from src.config import clear_config_cache, load_yaml_config
 from src.config.agents import LLMType
 
-# Cache for LLM instances - now keyed by (llm_type, model_id)
-_llm_cache: dict[tuple[LLMType, str, Optional[int]], ChatOpenAI] = {}
+# Model parameters that are applied to an LLM instance, with their value types
+_MODEL_PARAMETER_CONVERTERS: tuple[tuple[str, type], ...] = (
+    ("temperature", float),
+    ("max_tokens", int),
+    ("top_p", float),
+    ("frequency_penalty", float),
+)
+_SUPPORTED_MODEL_PARAMETERS = tuple(name for name, _ in _MODEL_PARAMETER_CONVERTERS)
+
+# Cache for LLM instances - keyed by (llm_type, model_id, applied parameters)
+_llm_cache: dict[tuple[LLMType, str, tuple[Any, ...]], ChatOpenAI] = {}
+
+# Models resolved per LLM type, along with the config dict they were built from
+_models_cache: dict[LLMType, tuple[Dict[str, Any], List["ModelInfo"]]] = {}
+
+# Model metadata grouped by LLM type, along with its source config dict
+_configured_models_cache: Optional[
+    tuple[Dict[str, Any], dict[str, list[dict[str, Any]]]]
+] = None
+
+# Model metadata by model ID across all types, along with its source config dict
+_model_index_cache: Optional[tuple[Dict[str, Any], dict[str, dict[str, Any]]]] = None
 
 
 # Model metadata structure
@@ -129,6 +150,31 @@ def _get_models_for_type(llm_type: LLMType, conf: Dict[str, Any]) -> List[ModelI
     return model_infos
 
 
+@lru_cache(maxsize=1)
+def _get_insecure_http_client() -> httpx.Client:
+    """Shared client for models configured with verify_ssl: false"""
+    return httpx.Client(verify=False)
+
+
+@lru_cache(maxsize=1)
+def _get_insecure_http_async_client() -> httpx.AsyncClient:
+    """Shared async client for models configured with verify_ssl: false"""
+    return httpx.AsyncClient(verify=False)
+
+
+def _model_parameters_key(
+    model_parameters: Optional[Dict[str, Any]],
+) -> tuple[Any, ...]:
+    """Hashable cache key for the parameters that affect the created LLM"""
+    if not model_parameters:
+        return ()
+    return tuple(
+        (name, model_parameters[name])
+        for name in _SUPPORTED_MODEL_PARAMETERS
+        if name in model_parameters
+    )
+
+
 def _create_llm_from_model_info(
     model_info: ModelInfo,
     llm_type: LLMType,
@@ -146,24 +192,17 @@ def _create_llm_from_model_info(
         else:
             llm_conf["base_url"] = model_info.base_url
 
-    # Apply model parameters if provided
+    # Apply supported model parameters if provided
     if model_parameters:
-        # Apply supported parameters
-        if "temperature" in model_parameters:
-            llm_conf["temperature"] = model_parameters["temperature"]
-        if "max_tokens" in model_parameters:
-            llm_conf["max_tokens"] = int(model_parameters["max_tokens"])
-        if "top_p" in model_parameters:
-            llm_conf["top_p"] = model_parameters["top_p"]
-        if "frequency_penalty" in model_parameters:
-            llm_conf["frequency_penalty"] = model_parameters["frequency_penalty"]
+        for name, convert in _MODEL_PARAMETER_CONVERTERS:
+            value = model_parameters.get(name)
+            if value is not None:
+                llm_conf[name] = convert(value)
 
     # Handle SSL verification settings
     if not model_info.verify_ssl:
-        http_client = httpx.Client(verify=False)
-        http_async_client = httpx.AsyncClient(verify=False)
-        llm_conf["http_client"] = http_client
-        llm_conf["http_async_client"] = http_async_client
+        llm_conf["http_client"] = _get_insecure_http_client()
+        llm_conf["http_async_client"] = _get_insecure_http_async_client()
 
     return (
         ChatOpenAI(**llm_conf) if llm_type != "reasoning" else ChatDeepSeek(**llm_conf)
@@ -174,7 +213,13 @@ def get_available_models_for_type(llm_type: LLMType) -> List[ModelInfo]:
     """Get all available models for a specific LLM type."""
     try:
         conf = load_yaml_config(_get_config_file_path())
-        return _get_models_for_type(llm_type, conf)
+        # load_yaml_config returns the same dict until conf.yaml changes
+        cached = _models_cache.get(llm_type)
+        if cached is not None and cached[0] is conf:
+            return cached[1]
+        models = _get_models_for_type(llm_type, conf)
+        _models_cache[llm_type] = (conf, models)
+        return models
     except Exception as e:
         print(f"Warning: Failed to load models for {llm_type}: {e}")
         return []
@@ -214,10 +259,7 @@ def get_llm_by_type(
             selected_model_id = model_id
 
     # Check cache first (include parameters in cache key)
-    params_hash = (
-        hash(str(sorted(model_parameters.items()))) if model_parameters else None
-    )
-    cache_key = (llm_type, selected_model_id, params_hash)
+    cache_key = (llm_type, selected_model_id, _model_parameters_key(model_parameters))
     if cache_key in _llm_cache:
         return _llm_cache[cache_key]
 
@@ -236,10 +278,18 @@ def get_configured_llm_models() -> dict[str, list[dict[str, Any]]]:
     """
     Get all configured LLM models grouped by type with their metadata.
 
+    The same dict is returned until conf.yaml changes or the LLM cache is
+    cleared, so callers must not modify it.
+
     Returns:
         Dictionary mapping LLM type to list of model information.
     """
+    global _configured_models_cache
     try:
+        conf = load_yaml_config(_get_config_file_path())
+        if _configured_models_cache is not None and _configured_models_cache[0] is conf:
+            return _configured_models_cache[1]
+
         configured_models: dict[str, list[dict[str, Any]]] = {}
 
         for llm_type in get_args(LLMType):
@@ -247,6 +297,7 @@ def get_configured_llm_models() -> dict[str, list[dict[str, Any]]]:
             if models:
                 configured_models[llm_type] = [model.to_dict() for model in models]
 
+        _configured_models_cache = (conf, configured_models)
         return configured_models
 
     except Exception as e:
@@ -255,6 +306,26 @@ def get_configured_llm_models() -> dict[str, list[dict[str, Any]]]:
         return {}
 
 
+def get_configured_model_index() -> dict[str, dict[str, Any]]:
+    """
+    Get the metadata of every configured model keyed by model ID.
+
+    If an ID is configured for several LLM types, the first type wins. The
+    index is rebuilt only when conf.yaml changes or the LLM cache is cleared.
+    """
+    global _model_index_cache
+    conf = load_yaml_config(_get_config_file_path())
+    if _model_index_cache is not None and _model_index_cache[0] is conf:
+        return _model_index_cache[1]
+
+    index: dict[str, dict[str, Any]] = {}
+    for models in get_configured_llm_models().values():
+        for model in models:
+            index.setdefault(model["id"], model)
+    _model_index_cache = (conf, index)
+    return index
+
+
 def get_default_model_id_for_type(llm_type: LLMType) -> Optional[str]:
     """Get the default model ID for a given LLM type (first in the list)."""
     models = get_available_models_for_type(llm_type)
@@ -262,9 +333,13 @@ def get_default_model_id_for_type(llm_type: LLMType) -> Optional[str]:
 
 
 def clear_llm_cache():
-    """Clear the LLM cache. Useful for testing or config reloads."""
-    global _llm_cache
+    """Clear the LLM, model and config caches. Useful for testing or config reloads."""
+    global _llm_cache, _configured_models_cache, _model_index_cache
     _llm_cache.clear()
+    _models_cache.clear()
+    _configured_models_cache = None
+    _model_index_cache = None
+    clear_config_cache()
 
 
 # Legacy compatibility - keep the original function signature
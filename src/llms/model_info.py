@@ -2,10 +2,22 @@
 LLM Model Info class with SQLAlchemy integration
 """
 
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Sequence
+
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Text,
+    cast,
+    func,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -25,24 +37,26 @@ class ModelInfo(Base):
     base_url = Column(String)
     verify_ssl = Column(Boolean, default=True)
     account_id = Column(String, ForeignKey("auth.users.id"), nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
-        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    # Read server-generated timestamps back via RETURNING instead of lazy loading
+    __mapper_args__ = {"eager_defaults": True}
+
     def __init__(self, data: Optional[Dict[str, Any]] = None, **kwargs):
         """Initialize the model info"""
         if data is not None:
             kwargs.update(data)
-
-        # Set defaults for dates if not provided
-        if "created_at" not in kwargs:
-            kwargs["created_at"] = datetime.utcnow()
-        if "updated_at" not in kwargs:
-            kwargs["updated_at"] = datetime.utcnow()
-
         super().__init__(**kwargs)
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _column_names(cls) -> frozenset:
+        """Names of the table's columns, computed once per class"""
+        return frozenset(cls.__table__.columns.keys())
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert the model info to a dictionary"""
         return {
@@ -55,25 +69,27 @@ class ModelInfo(Base):
             "verify_ssl": self.verify_ssl,
             "account_id": self.account_id,
             "created_at": (
-                self.created_at.isoformat()
-                if hasattr(self.created_at, "isoformat")
-                else None
+                self.created_at.isoformat() if self.created_at is not None else None
             ),
             "updated_at": (
-                self.updated_at.isoformat()
-                if hasattr(self.updated_at, "isoformat")
-                else None
+                self.updated_at.isoformat() if self.updated_at is not None else None
             ),
         }
 
     @classmethod
     async def create(
-        cls, session: AsyncSession, model_data: Dict[str, Any]
+        cls, session: AsyncSession, model_data: Dict[str, Any], commit: bool = True
     ) -> "ModelInfo":
-        """Create a new model info"""
+        """Create a new model info
+
+        Pass commit=False to only flush and leave the commit to the caller.
+        """
         model_info = cls(model_data)
         session.add(model_info)
-        await session.commit()
+        if commit:
+            await session.commit()
+        else:
+            await session.flush()
         return model_info
 
     @classmethod
@@ -81,57 +97,114 @@ class ModelInfo(Base):
         cls, session: AsyncSession, model_id: str
     ) -> Optional["ModelInfo"]:
         """Get a model info by ID"""
-        result = await session.execute(select(cls).where(cls.id == model_id))
-        return result.scalars().first()
+        result = await session.execute(select(cls).where(cls.id == model_id).limit(1))
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def get_by_ids(
+        cls, session: AsyncSession, account_id: str, model_ids: List[str]
+    ) -> Sequence["ModelInfo"]:
+        """Get the model infos of an account with the given IDs in one query"""
+        if not model_ids:
+            return []
+        result = await session.execute(
+            select(cls).where(cls.account_id == account_id, cls.id.in_(model_ids))
+        )
+        return result.scalars().all()
 
     @classmethod
-    async def get_all(cls, session: AsyncSession) -> List["ModelInfo"]:
+    async def get_all(cls, session: AsyncSession) -> Sequence["ModelInfo"]:
         """Get all model infos"""
         result = await session.execute(select(cls))
-        return list(result.scalars().all())
+        return result.scalars().all()
 
     @classmethod
     async def get_for_account(
         cls, session: AsyncSession, account_id: str
-    ) -> List["ModelInfo"]:
+    ) -> Sequence["ModelInfo"]:
         """Get all model infos for a specific account"""
         result = await session.execute(select(cls).where(cls.account_id == account_id))
-        return list(result.scalars().all())
+        return result.scalars().all()
+
+    @classmethod
+    async def get_for_account_as_json(
+        cls, session: AsyncSession, account_id: str
+    ) -> str:
+        """Get {"models": [...]} for an account as a JSON string built by Postgres
+
+        Produces the same fields as to_dict() without materializing ORM objects.
+        """
+        table = cls.__table__
+        rows = select(table).where(table.c.account_id == account_id).subquery("m")
+        models = func.coalesce(
+            func.json_agg(func.row_to_json(rows.table_valued())),
+            literal_column("'[]'::json"),
+        )
+        result = await session.execute(
+            select(cast(func.json_build_object("models", models), Text))
+        )
+        return result.scalar_one()
 
     @classmethod
     async def update(
-        cls, session: AsyncSession, model_id: str, model_data: Dict[str, Any]
+        cls,
+        session: AsyncSession,
+        model_id: str,
+        model_data: Dict[str, Any],
+        commit: bool = True,
     ) -> Optional["ModelInfo"]:
         """Update a model info"""
         model_info = await cls.get_by_id(session, model_id)
         if model_info:
+            columns = cls._column_names()
             for key, value in model_data.items():
-                if hasattr(model_info, key):
+                if key in columns:
                     setattr(model_info, key, value)
-            model_info.updated_at = datetime.utcnow()
-            await session.commit()
+            if commit:
+                await session.commit()
+            else:
+                await session.flush()
         return model_info
 
     @classmethod
-    async def delete(cls, session: AsyncSession, model_id: str) -> bool:
+    async def delete(
+        cls, session: AsyncSession, model_id: str, commit: bool = True
+    ) -> bool:
         """Delete a model info"""
         model_info = await cls.get_by_id(session, model_id)
         if model_info:
             await session.delete(model_info)
-            await session.commit()
+            if commit:
+                await session.commit()
+            else:
+                await session.flush()
             return True
         return False
 
     @classmethod
     async def get_or_create(
-        cls, session: AsyncSession, model_data: Dict[str, Any]
+        cls, session: AsyncSession, model_data: Dict[str, Any], commit: bool = True
     ) -> "ModelInfo":
-        """Get or create a model info"""
+        """Get or create a model info
+
+        Inserts with ON CONFLICT DO NOTHING RETURNING, so creating a model takes
+        one round-trip; the row is only selected when it already exists.
+        """
         model_id = model_data.get("id")
         if not model_id:
             raise ValueError("Model ID is required")
 
-        model_info = await cls.get_by_id(session, model_id)
-        if not model_info:
-            model_info = await cls.create(session, model_data)
+        columns = cls._column_names()
+        values = {key: value for key, value in model_data.items() if key in columns}
+        result = await session.execute(
+            pg_insert(cls)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[cls.id])
+            .returning(cls)
+        )
+        model_info = result.scalar_one_or_none()
+        if model_info is None:
+            model_info = await cls.get_by_id(session, model_id)
+        elif commit:
+            await session.commit()
         return model_info
@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, Sequence
 
 from sqlalchemy import (
     Column,
@@ -9,6 +9,7 @@ from sqlalchemy import (
     ForeignKey,
     Integer,
     UniqueConstraint,
+    func,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -32,8 +33,19 @@ class ModelParameters(Base):
     max_tokens = Column(Integer, default=2048)
     top_p = Column(Float, default=0.9)
     frequency_penalty = Column(Float, default=0.0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    # Read server-generated timestamps back via RETURNING instead of lazy loading
+    __mapper_args__ = {"eager_defaults": True}
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _column_names(cls) -> frozenset:
+        """Names of the table's columns, computed once per class"""
+        return frozenset(cls.__table__.columns.keys())
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -44,32 +56,30 @@ class ModelParameters(Base):
             "top_p": self.top_p,
             "frequency_penalty": self.frequency_penalty,
             "created_at": (
-                self.created_at.isoformat()
-                if hasattr(self.created_at, "isoformat")
-                else None
+                self.created_at.isoformat() if self.created_at is not None else None
             ),
             "updated_at": (
-                self.updated_at.isoformat()
-                if hasattr(self.updated_at, "isoformat")
-                else None
+                self.updated_at.isoformat() if self.updated_at is not None else None
             ),
         }
 
     @classmethod
     async def get_for_account(
         cls, session: AsyncSession, account_id: str
-    ) -> list["ModelParameters"]:
+    ) -> Sequence["ModelParameters"]:
         result = await session.execute(select(cls).where(cls.account_id == account_id))
-        return list(result.scalars().all())
+        return result.scalars().all()
 
     @classmethod
     async def get_for_model(
         cls, session: AsyncSession, account_id: str, model_id: str
     ) -> Optional["ModelParameters"]:
         result = await session.execute(
-            select(cls).where(cls.account_id == account_id, cls.model_id == model_id)
+            select(cls)
+            .where(cls.account_id == account_id, cls.model_id == model_id)
+            .limit(1)
         )
-        return result.scalars().first()
+        return result.scalar_one_or_none()
 
     @classmethod
     async def upsert(
@@ -78,26 +88,33 @@ class ModelParameters(Base):
         account_id: str,
         model_id: str,
         params: Dict[str, Any],
+        commit: bool = True,
     ) -> "ModelParameters":
         obj = await cls.get_for_model(session, account_id, model_id)
         if obj:
+            columns = cls._column_names()
             for k, v in params.items():
-                if hasattr(obj, k):
+                if k in columns:
                     setattr(obj, k, v)
-            obj.updated_at = datetime.utcnow()
         else:
             obj = cls(account_id=account_id, model_id=model_id, **params)
             session.add(obj)
-        await session.commit()
+        if commit:
+            await session.commit()
+        else:
+            await session.flush()
         return obj
 
     @classmethod
     async def delete_for_model(
-        cls, session: AsyncSession, account_id: str, model_id: str
+        cls, session: AsyncSession, account_id: str, model_id: str, commit: bool = True
     ) -> bool:
         obj = await cls.get_for_model(session, account_id, model_id)
         if obj:
             await session.delete(obj)
-            await session.commit()
+            if commit:
+                await session.commit()
+            else:
+                await session.flush()
             return True
         return False
@@ -2,12 +2,21 @@
 # If you want a CLI entrypoint, you can use the following:
 
 if __name__ == "__main__":
+    import os
+    import sys
+
     import uvicorn
 
+    # uvloop has no Windows build; fail loudly elsewhere if it is missing.
+    # For production, prefer e.g.
+    #   gunicorn src.server.app:app -k uvicorn.workers.UvicornWorker -w $((2 * $(nproc) + 1))
     uvicorn.run(
         "src.server.app:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=os.getenv("DEV") == "1",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info",
     )
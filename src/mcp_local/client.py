@@ -4,68 +4,177 @@ MCP Connection class with SQLAlchemy integration
 
 import uuid
 import json
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Any, Sequence
 
-from sqlalchemy import Column, String, JSON, DateTime, Boolean, UUID, ForeignKey, select
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    Column,
+    String,
+    JSON,
+    DateTime,
+    Boolean,
+    UUID,
+    ForeignKey,
+    Index,
+    func,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import delete as sql_delete, insert, update as sql_update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from src.backend.database.base import Base
 from src.server.mcp_request import MCPServerMetadataRequest
 
+# Batches at least this large are written with COPY instead of INSERT on asyncpg
+MCP_COPY_THRESHOLD = 1000
+
+# Filled in by Postgres when a row is inserted without them
+_SERVER_DEFAULT_COLUMNS = ("id", "created_at", "updated_at")
+
+# Reused validator for building metadata requests from plain dicts
+_METADATA_REQUEST_ADAPTER = TypeAdapter(MCPServerMetadataRequest)
+
+# Config keys copied into the metadata request, per transport and for all
+_TRANSPORT_KEYS = {"stdio": ("command", "args"), "sse": ("url",)}
+_COMMON_REQUEST_KEYS = ("env", "timeout_seconds")
+
+
+def _metadata_request_data(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Pick the MCPServerMetadataRequest fields out of a connection config"""
+    if config is None:
+        raise ValueError("Connection config is missing")
+
+    transport = config.get("transport")
+    if transport is None:
+        raise ValueError("Connection transport is missing")
+
+    request_data = {"transport": transport}
+    for key in _TRANSPORT_KEYS.get(transport, ()) + _COMMON_REQUEST_KEYS:
+        request_data[key] = config.get(key)
+    return request_data
+
+
+def _prebuild_metadata_request(
+    config: Optional[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """Validate a config at write time and return the request data to store
+
+    Configs without a transport are stored without a prebuilt request, so
+    to_metadata_request still reports them when called.
+    """
+    if not config or config.get("transport") is None:
+        return None
+    request_data = _metadata_request_data(config)
+    _METADATA_REQUEST_ADAPTER.validate_python(request_data)
+    return request_data
+
 
 class MCPConnection(Base):
     """Extends existing MCPConnection with SQLAlchemy persistence"""
 
     __tablename__ = "mcp_connections"
+    __table_args__ = (
+        # Also serves account_id-only lookups via the leading column
+        Index("ix_mcp_conn_acct_qn", "account_id", "qualified_name"),
+        # jsonb_path_ops serves the @> containment used by get_with_tool
+        Index(
+            "ix_mcp_enabled_tools_gin",
+            "enabled_tools",
+            postgresql_using="gin",
+            postgresql_ops={"enabled_tools": "jsonb_path_ops"},
+        ),
+    )
 
-    id = Column(UUID, primary_key=True, default=uuid.uuid4)
+    # Assigned by Postgres and read back with RETURNING on insert
+    id = Column(UUID, primary_key=True, server_default=text("gen_random_uuid()"))
     qualified_name = Column(String, nullable=False)
     name = Column(String, nullable=False)
-    config = Column(JSON)  # Store non-sensitive config
-    enabled_tools = Column(JSON)
-    account_id = Column(String, ForeignKey("auth.users.id"), nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    config = Column(JSONB)  # Store non-sensitive config
+    enabled_tools = Column(JSONB)
+    # MCPServerMetadataRequest fields derived from config whenever it is written
+    metadata_request = Column(JSONB)
+    account_id = Column(String, ForeignKey("auth.users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
-        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+    __mapper_args__ = {"eager_defaults": True}
+
+    # str(id), cached by to_dict
+    _id_str = None
 
     def __init__(self, **kwargs):
         """Initialize the MCP connection"""
-        # Generate ID if not provided
-        if "id" not in kwargs:
-            kwargs["id"] = uuid.uuid4()
-
-        # Set defaults for dates if not provided
-        if "created_at" not in kwargs:
-            kwargs["created_at"] = datetime.utcnow()
-        if "updated_at" not in kwargs:
-            kwargs["updated_at"] = datetime.utcnow()
+        if "metadata_request" not in kwargs:
+            kwargs["metadata_request"] = _prebuild_metadata_request(
+                kwargs.get("config")
+            )
 
         super().__init__(**kwargs)
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _column_names(cls) -> frozenset:
+        """Names of the table's columns, computed once per class"""
+        return frozenset(cls.__table__.columns.keys())
+
+    def _id_string(self) -> str:
+        """Format the UUID once per instance; it never changes after insert"""
+        if self._id_str is None:
+            if self.id is None:
+                return str(None)
+            self._id_str = str(self.id)
+        return self._id_str
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert the connection to a dictionary"""
         return {
-            "id": str(self.id),
+            "id": self._id_string(),
             "qualified_name": self.qualified_name,
             "name": self.name,
             "config": self.config,
             "enabled_tools": self.enabled_tools,
             "account_id": self.account_id,
+            # Only None before the row is inserted
             "created_at": (
-                self.created_at.isoformat()
-                if hasattr(self.created_at, "isoformat")
-                else None
+                self.created_at.isoformat() if self.created_at is not None else None
             ),
             "updated_at": (
-                self.updated_at.isoformat()
-                if hasattr(self.updated_at, "isoformat")
-                else None
+                self.updated_at.isoformat() if self.updated_at is not None else None
             ),
         }
 
+    def _json_fields(self) -> Dict[str, Any]:
+        """The to_dict fields as raw values, left for orjson to encode"""
+        return {
+            "id": self.id,
+            "qualified_name": self.qualified_name,
+            "name": self.name,
+            "config": self.config,
+            "enabled_tools": self.enabled_tools,
+            "account_id": self.account_id,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def to_json_bytes(self) -> bytes:
+        """Serialize the connection straight to a JSON response body"""
+        return orjson.dumps(self._json_fields(), option=orjson.OPT_UTC_Z)
+
+    @staticmethod
+    def dump_json(connections: List["MCPConnection"]) -> bytes:
+        """Serialize many connections straight to a JSON response body"""
+        return orjson.dumps(
+            [connection._json_fields() for connection in connections],
+            option=orjson.OPT_UTC_Z,
+        )
+
     @classmethod
     async def create(
         cls, session: AsyncSession, connection_data: Dict[str, Any]
@@ -76,6 +185,69 @@ class MCPConnection(Base):
         await session.commit()
         return connection
 
+    @classmethod
+    async def create_many(
+        cls, session: AsyncSession, connections_data: List[Dict[str, Any]]
+    ) -> Sequence["MCPConnection"]:
+        """Create several MCP connections in one round trip
+
+        Uses a multi-row INSERT ... RETURNING, or COPY for batches of at least
+        MCP_COPY_THRESHOLD rows on asyncpg. Keys that are not table columns are
+        ignored.
+        """
+        if not connections_data:
+            return []
+
+        columns = cls.__table__.columns.keys()
+        rows = []
+        for data in connections_data:
+            row = {column: data.get(column) for column in columns}
+            if row["metadata_request"] is None:
+                row["metadata_request"] = _prebuild_metadata_request(row["config"])
+            for column in _SERVER_DEFAULT_COLUMNS:
+                if row[column] is None:
+                    del row[column]  # Assigned by the server
+            rows.append(row)
+
+        if (
+            len(rows) < MCP_COPY_THRESHOLD
+            or session.get_bind().dialect.driver != "asyncpg"
+        ):
+            result = await session.execute(insert(cls).returning(cls), rows)
+            connections = result.scalars().all()
+            await session.commit()
+            return connections
+
+        # COPY cannot return server-generated values, so assign them here
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            row.setdefault("id", uuid.uuid4())
+            row.setdefault("created_at", now)
+            row.setdefault("updated_at", now)
+        json_columns = {
+            column.name
+            for column in cls.__table__.columns
+            if isinstance(column.type, JSON)
+        }
+        records = [
+            tuple(
+                (
+                    json.dumps(row[c])
+                    if c in json_columns and row[c] is not None
+                    else row[c]
+                )
+                for c in columns
+            )
+            for row in rows
+        ]
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            cls.__tablename__, records=records, columns=columns
+        )
+        await session.commit()
+        return [cls(**row) for row in rows]
+
     @classmethod
     async def get_by_id(
         cls, session: AsyncSession, connection_id: str
@@ -85,61 +257,92 @@ class MCPConnection(Base):
         return result.scalars().first()
 
     @classmethod
-    async def get_all(cls, session: AsyncSession) -> List["MCPConnection"]:
-        """Get all MCP connections"""
-        result = await session.execute(select(cls))
-        return list(result.scalars().all())
+    async def get_all(
+        cls, session: AsyncSession, *, limit: int = 1000, offset: int = 0
+    ) -> Sequence["MCPConnection"]:
+        """Get a page of MCP connections, oldest first"""
+        result = await session.execute(
+            select(cls).order_by(cls.created_at, cls.id).limit(limit).offset(offset)
+        )
+        return result.scalars().all()
+
+    @classmethod
+    async def iter_all(
+        cls, session: AsyncSession, chunk_size: int = 500
+    ) -> AsyncIterator["MCPConnection"]:
+        """Stream every MCP connection, holding at most `chunk_size` rows at a time"""
+        result = await session.stream_scalars(
+            select(cls).execution_options(yield_per=chunk_size)
+        )
+        async for connection in result:
+            yield connection
 
     @classmethod
     async def get_for_account(
         cls, session: AsyncSession, account_id: str
-    ) -> List["MCPConnection"]:
+    ) -> Sequence["MCPConnection"]:
         """Get all MCP connections for a specific account"""
         result = await session.execute(select(cls).where(cls.account_id == account_id))
-        return list(result.scalars().all())
+        return result.scalars().all()
+
+    @classmethod
+    async def get_by_qualified_name(
+        cls, session: AsyncSession, account_id: str, qualified_name: str
+    ) -> Optional["MCPConnection"]:
+        """Get an account's MCP connection by qualified name"""
+        result = await session.execute(
+            select(cls)
+            .where(cls.account_id == account_id, cls.qualified_name == qualified_name)
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def get_with_tool(
+        cls, session: AsyncSession, account_id: str, tool_name: str
+    ) -> Sequence["MCPConnection"]:
+        """Get an account's MCP connections that have `tool_name` enabled"""
+        result = await session.execute(
+            select(cls).where(
+                cls.account_id == account_id, cls.enabled_tools.contains([tool_name])
+            )
+        )
+        return result.scalars().all()
 
     @classmethod
     async def update(
         cls, session: AsyncSession, connection_id: str, connection_data: Dict[str, Any]
     ) -> Optional["MCPConnection"]:
-        """Update an MCP connection"""
-        connection = await cls.get_by_id(session, connection_id)
-        if connection:
-            for key, value in connection_data.items():
-                if hasattr(connection, key):
-                    setattr(connection, key, value)
-            connection.updated_at = datetime.utcnow()
-            await session.commit()
+        """Update an MCP connection
+
+        Applies the change with a single UPDATE ... RETURNING instead of loading
+        the row first. Keys that are not table columns are ignored.
+        """
+        columns = cls._column_names()
+        values = {k: v for k, v in connection_data.items() if k in columns}
+        if "config" in values:
+            values["metadata_request"] = _prebuild_metadata_request(values["config"])
+        stmt = (
+            sql_update(cls)
+            .where(cls.id == connection_id)
+            .values(**values)
+            .returning(cls)
+        )
+        connection = (await session.execute(stmt)).scalar_one_or_none()
+        await session.commit()
         return connection
 
     @classmethod
     async def delete(cls, session: AsyncSession, connection_id: str) -> bool:
         """Delete an MCP connection"""
-        connection = await cls.get_by_id(session, connection_id)
-        if connection:
-            await session.delete(connection)
-            await session.commit()
-            return True
-        return False
+        stmt = sql_delete(cls).where(cls.id == connection_id).returning(cls.id)
+        deleted_id = (await session.execute(stmt)).scalar_one_or_none()
+        await session.commit()
+        return deleted_id is not None
 
     def to_metadata_request(self) -> MCPServerMetadataRequest:
         """Convert to MCPServerMetadataRequest"""
-        if self.config is None:
-            raise ValueError("Connection config is missing")
-
-        transport = self.config.get("transport")
-        if transport is None:
-            raise ValueError("Connection transport is missing")
-
-        request_data = {"transport": transport}
-
-        if transport == "stdio":
-            request_data["command"] = self.config.get("command")
-            request_data["args"] = self.config.get("args")
-        elif transport == "sse":
-            request_data["url"] = self.config.get("url")
-
-        request_data["env"] = self.config.get("env")
-        request_data["timeout_seconds"] = self.config.get("timeout_seconds")
-
-        return MCPServerMetadataRequest(**request_data)
+        request_data = self.metadata_request
+        if request_data is None:
+            request_data = _metadata_request_data(self.config)
+        return _METADATA_REQUEST_ADAPTER.validate_python(request_data)
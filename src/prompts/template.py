@@ -1,22 +1,101 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import logging
 import os
 import dataclasses
+import time
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
-from jinja2 import Environment, FileSystemLoader, select_autoescape, Template
+from jinja2 import Environment, FileSystemLoader, meta, select_autoescape, Template
 from src.config.configuration import Configuration
 
+logger = logging.getLogger(__name__)
+
+# Prompt files ship with the package, so only check them for edits under DEV=1
+PROMPT_AUTO_RELOAD = os.getenv("DEV") == "1"
+
 # Initialize Jinja2 environment
 env = Environment(
     loader=FileSystemLoader(os.path.dirname(__file__)),
     autoescape=select_autoescape(),
     trim_blocks=True,
     lstrip_blocks=True,
+    auto_reload=PROMPT_AUTO_RELOAD,
 )
 
 
+# [epoch second, formatted time] for the last rendered second
+_current_time_cache: list = [0, ""]
+
+
+def _current_time() -> str:
+    """Current local time for prompts, re-formatted at most once per second"""
+    second = int(time.time())
+    if second != _current_time_cache[0]:
+        formatted = datetime.fromtimestamp(second).strftime("%a %b %d %Y %H:%M:%S %z")
+        _current_time_cache[:] = [second, formatted]
+    return _current_time_cache[1]
+
+
+@lru_cache(maxsize=None)
+def _config_field_names(config_cls: type) -> tuple[str, ...]:
+    """Configuration fields exposed to templates (custom prompts are not)"""
+    return tuple(
+        f.name
+        for f in dataclasses.fields(config_cls)
+        if f.init and f.name != "custom_prompts"
+    )
+
+
+def _load_file_template(prompt_name: str) -> Template:
+    """Load the compiled template for a prompt file"""
+    template = env.get_template(f"{prompt_name}.md")
+    source, _, _ = env.loader.get_source(env, template.name)
+    template.referenced_variables = tuple(
+        sorted(meta.find_undeclared_variables(env.parse(source)))
+    )
+    return template
+
+
+# Jinja re-checks the file on every get_template when reloading, so only memoize
+# templates that can never change
+_get_file_template = (
+    _load_file_template
+    if PROMPT_AUTO_RELOAD
+    else lru_cache(maxsize=256)(_load_file_template)
+)
+
+
+@lru_cache(maxsize=1024)
+def _render_cached(template: Template, context: tuple, types: tuple) -> str:
+    """Render a template for a given tuple of (name, value) pairs
+
+    `types` keeps equal values of different types (1 and True) apart.
+    """
+    return template.render(**dict(context))
+
+
+def _render(template: Template, state_vars: dict) -> str:
+    """Render a template, reusing the output for identical inputs
+
+    Only the variables the template references make up the cache key. Renders
+    are not cached when the template reads CURRENT_TIME, when its variables are
+    unknown, or when one of their values is unhashable.
+    """
+    names = getattr(template, "referenced_variables", None)
+    if names is None or "CURRENT_TIME" in names:
+        return template.render(**state_vars)
+    context = tuple((name, state_vars[name]) for name in names if name in state_vars)
+    types = tuple(type(value) for _, value in context)
+    try:
+        return _render_cached(template, context, types)
+    except TypeError:
+        # An unhashable value (list, dict, ...) cannot be part of the cache key
+        return template.render(**state_vars)
+
+
 def get_prompt_template(prompt_name: str) -> str:
     """
     Load and return a prompt template using Jinja2.
@@ -28,8 +107,7 @@ def get_prompt_template(prompt_name: str) -> str:
         The template string with proper variable substitution syntax
     """
     try:
-        template = env.get_template(f"{prompt_name}.md")
-        return template.render()
+        return _render(_get_file_template(prompt_name), {})
     except Exception as e:
         raise ValueError(f"Error loading template {prompt_name}: {e}")
 
@@ -50,44 +128,40 @@ def apply_prompt_template(
     """
     # Convert state to dict for template rendering
     state_vars = {
-        "CURRENT_TIME": datetime.now().strftime("%a %b %d %Y %H:%M:%S %z"),
+        "CURRENT_TIME": _current_time(),
         **state,
     }
 
-    # Add configurable variables
+    # Add configurable variables (shallow: templates only read them)
     if configurable:
-        state_vars.update(dataclasses.asdict(configurable))
+        for name in _config_field_names(type(configurable)):
+            state_vars[name] = getattr(configurable, name)
 
     # Context window management for messages
     messages = state.get("messages", [])
     max_messages = 20  # Limit conversation history
     if len(messages) > max_messages:
         # Keep first few messages (important context) and recent messages
-        important_messages = messages[:3]  # Keep initial context
-        recent_messages = messages[-(max_messages - 3) :]  # Keep recent conversation
-        truncated_messages = important_messages + recent_messages
-        print(
-            f"Context management: Truncated messages from {len(messages)} to {len(truncated_messages)}"
+        logger.debug(
+            "Context management: Truncated messages from %d to %d",
+            len(messages),
+            max_messages,
         )
-        messages = truncated_messages
+        messages = [*messages[:3], *messages[-(max_messages - 3) :]]
 
     try:
-        # Check if we have custom prompts from configuration
-        custom_prompts = (
-            getattr(configurable, "custom_prompts", None) if configurable else None
+        # Custom prompts from settings are compiled with the configuration
+        if configurable and prompt_name in configurable.custom_prompt_errors:
+            raise configurable.custom_prompt_errors[prompt_name]
+        template = (
+            configurable.compiled_custom_prompts.get(prompt_name)
+            if configurable
+            else None
         )
-
-        if custom_prompts and prompt_name in custom_prompts:
-            # Use custom prompt from settings
-            custom_prompt_content = custom_prompts[prompt_name]
-            if custom_prompt_content and custom_prompt_content.strip():
-                template = Template(custom_prompt_content)
-                system_prompt = template.render(**state_vars)
-                return [{"role": "system", "content": system_prompt}] + messages
-
-        # Fall back to default template file
-        template = env.get_template(f"{prompt_name}.md")
-        system_prompt = template.render(**state_vars)
-        return [{"role": "system", "content": system_prompt}] + messages
+        if template is None:
+            # Fall back to default template file
+            template = _get_file_template(prompt_name)
+        system_prompt = _render(template, state_vars)
+        return [{"role": "system", "content": system_prompt}, *messages]
     except Exception as e:
         raise ValueError(f"Error applying template {prompt_name}: {e}")
@@ -1,16 +1,25 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
 import base64
-import json
 import logging
 import os
-from typing import Annotated, List, cast, Optional
-from uuid import uuid4
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Annotated, AsyncIterator, List, cast, Optional
+from uuid import UUID, uuid4
 
+import orjson
 from fastapi import FastAPI, HTTPException, Query, Request, Depends, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import (
+    FileResponse,
+    ORJSONResponse,
+    Response,
+    StreamingResponse,
+)
 from langchain_core.messages import (
     AIMessageChunk,
     ToolMessage,
@@ -18,6 +27,7 @@ from langchain_core.messages import (
     HumanMessage,
 )
 from langgraph.types import Command
+from starlette.background import BackgroundTask
 
 from src.config.report_style import ReportStyle
 from src.config.tools import SELECTED_RAG_PROVIDER
@@ -38,6 +48,7 @@ from src.server.chat_request import (
 )
 from src.server.mcp_request import MCPServerMetadataRequest, MCPServerMetadataResponse
 from src.server.mcp_utils import load_mcp_tools
+from src.server.model_parameters_request import ModelParametersRequest
 from src.server.rag_request import (
     RAGConfigResponse,
     RAGResourceRequest,
@@ -54,9 +65,16 @@ from src.llms.model_parameters import ModelParameters
 from src.backend.database.settings_crud import (
     get_settings_by_user_id,
     upsert_settings_by_user_id,
+    warm_up_statements,
 )
-from src.backend.database.session import get_session
+from src.backend.database.session import engine, get_session, warm_up_pool
 from src.backend.auth.middleware import AuthMiddleware
+from src.auth.billing import close_subscription_upserts, reset_stripe_client
+from src.auth.database import reset_supabase_client
+from src.auth.http import close_http_transport
+from src.tools.tavily_search.tavily_search_api_wrapper import (
+    close_session as close_tavily_session,
+)
 
 from fastapi import status
 
@@ -64,10 +82,33 @@ logger = logging.getLogger(__name__)
 
 INTERNAL_SERVER_ERROR_DETAIL = "Internal Server Error"
 
+# Stream events produced within this window are sent in a single write
+SSE_BATCH_WINDOW_SECONDS = 0.005
+SSE_BATCH_MAX_BYTES = 8 * 1024
+# Events the workflow may run ahead of a slow client
+SSE_BATCH_QUEUE_SIZE = 256
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the database pool on startup and release pooled connections on shutdown"""
+    await warm_up_pool(statements=warm_up_statements())
+    yield
+    await engine.dispose()
+    # Finish pending webhook upserts while their HTTP clients are still open
+    await close_subscription_upserts()
+    reset_stripe_client()
+    reset_supabase_client()
+    await close_http_transport()
+    await close_tavily_session()
+
+
 app = FastAPI(
     title="DeerFlow API",
     description="API for Deer",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -82,16 +123,17 @@ app.add_middleware(
 # Add Auth middleware directly to the main app
 app.add_middleware(AuthMiddleware)
 
+# Compress larger JSON responses; added last so it wraps the CORS headers too.
+# text/event-stream responses are never compressed, so streams are not buffered.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 graph = build_graph_with_memory()
 
 
-# Dependency to get current user ID
-async def get_current_user_id(request: Request) -> str:
-    """Get current user ID from request"""
-    user_id = get_user_id_from_request(request)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    return user_id
+@lru_cache(maxsize=8)
+def _compiled_graph(build):
+    """Compile a stateless workflow graph once and reuse it across requests"""
+    return build()
 
 
 # Dependency to get optional user ID (doesn't require authentication)
@@ -100,17 +142,39 @@ async def get_optional_user_id(request: Request) -> Optional[str]:
     return get_user_id_from_request(request)
 
 
+# Dependency to get current user ID; FastAPI resolves get_optional_user_id
+# once per request however many dependencies share it
+async def get_current_user_id(
+    user_id: Optional[str] = Depends(get_optional_user_id),
+) -> str:
+    """Get current user ID from request"""
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user_id
+
+
+# Dependency to get the current user ID parsed as a UUID, once per request
+async def get_current_user_uuid(
+    user_id: str = Depends(get_current_user_id),
+) -> UUID:
+    """Get current user ID from request as a UUID"""
+    try:
+        return UUID(user_id)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+
 @app.post("/api/chat/stream")
-async def chat_stream(request: ChatRequest, request_obj: Request):
+async def chat_stream(
+    request: ChatRequest, user_id: Optional[str] = Depends(get_optional_user_id)
+):
     thread_id = request.thread_id or "__default__"
     if thread_id == "__default__":
         thread_id = str(uuid4())
 
-    # Get user ID from request if available
-    user_id = get_user_id_from_request(request_obj)
-
     # Provide default values for parameters that may be None
-    messages = request.model_dump().get("messages") or []
+    # Dump only the messages rather than copying the whole request
+    messages = [message.model_dump() for message in request.messages or []]
     resources = request.resources if request.resources is not None else []
     max_plan_iterations = (
         request.max_plan_iterations if request.max_plan_iterations is not None else 1
@@ -152,23 +216,25 @@ async def chat_stream(request: ChatRequest, request_obj: Request):
     )
 
     return StreamingResponse(
-        _astream_workflow_generator(
-            messages,
-            thread_id,
-            resources,
-            max_plan_iterations,
-            max_step_num,
-            max_search_results,
-            auto_accepted_plan,
-            interrupt_feedback,
-            mcp_settings,
-            enable_background_investigation,
-            report_style,
-            enable_deep_thinking,
-            custom_prompts,
-            selected_models,
-            model_parameters,
-            user_id,
+        _batch_events(
+            _astream_workflow_generator(
+                messages,
+                thread_id,
+                resources,
+                max_plan_iterations,
+                max_step_num,
+                max_search_results,
+                auto_accepted_plan,
+                interrupt_feedback,
+                mcp_settings,
+                enable_background_investigation,
+                report_style,
+                enable_deep_thinking,
+                custom_prompts,
+                selected_models,
+                model_parameters,
+                user_id,
+            )
         ),
         media_type="text/event-stream",
     )
@@ -192,9 +258,6 @@ async def _astream_workflow_generator(
     model_parameters: dict = {},
     user_id: Optional[str] = None,
 ):
-    # Import Command here to avoid circular imports
-    from langgraph.types import Command
-
     # Proper input structure based on State class
     input_ = {
         "messages": messages,
@@ -238,20 +301,20 @@ async def _astream_workflow_generator(
     ):
         if isinstance(event_data, dict):
             if "__interrupt__" in event_data:
-                yield _make_event(
-                    "interrupt",
-                    {
-                        "thread_id": thread_id,
-                        "id": event_data["__interrupt__"][0].ns[0],
-                        "role": "assistant",
-                        "content": event_data["__interrupt__"][0].value,
-                        "finish_reason": "interrupt",
-                        "options": [
-                            {"text": "Edit plan", "value": "edit_plan"},
-                            {"text": "Start research", "value": "accepted"},
-                        ],
-                    },
-                )
+                interrupt = event_data["__interrupt__"][0]
+                interrupt_message = {
+                    "thread_id": thread_id,
+                    "id": interrupt.ns[0],
+                    "role": "assistant",
+                    "finish_reason": "interrupt",
+                    "options": [
+                        {"text": "Edit plan", "value": "edit_plan"},
+                        {"text": "Start research", "value": "accepted"},
+                    ],
+                }
+                if interrupt.value != "":
+                    interrupt_message["content"] = interrupt.value
+                yield _make_event("interrupt", interrupt_message)
             continue
         message_chunk, message_metadata = cast(
             tuple[BaseMessage, dict[str, any]], event_data
@@ -261,8 +324,10 @@ async def _astream_workflow_generator(
             "agent": agent[0].split(":")[0],
             "id": message_chunk.id,
             "role": "assistant",
-            "content": message_chunk.content,
         }
+        # Empty content is left out of the event entirely
+        if message_chunk.content != "":
+            event_stream_message["content"] = message_chunk.content
         if message_chunk.additional_kwargs.get("reasoning_content"):
             event_stream_message["reasoning_content"] = message_chunk.additional_kwargs[
                 "reasoning_content"
@@ -295,10 +360,61 @@ async def _astream_workflow_generator(
                 yield _make_event("message_chunk", event_stream_message)
 
 
-def _make_event(event_type: str, data: dict[str, any]):
-    if data.get("content") == "":
-        data.pop("content")
-    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+def _flushes_batch(event: bytes) -> bool:
+    """Whether an event ends a step (interrupt or finish) and must not wait"""
+    return b'"finish_reason":' in event
+
+
+async def _batch_events(events: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Coalesce stream events produced within SSE_BATCH_WINDOW_SECONDS
+
+    The workflow runs in its own task and hands events over through a queue,
+    so waiting briefly for more events never holds back one that was already
+    produced for longer than the window.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_BATCH_QUEUE_SIZE)
+    end = object()
+
+    async def produce():
+        try:
+            async for event in events:
+                await queue.put(event)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(end)
+
+    producer = asyncio.create_task(produce())
+    loop = asyncio.get_running_loop()
+    try:
+        item = await queue.get()
+        while item is not end:
+            if isinstance(item, Exception):
+                raise item
+            buffer = bytearray(item)
+            flush = _flushes_batch(item)
+            deadline = loop.time() + SSE_BATCH_WINDOW_SECONDS
+            item = None
+            while not flush and len(buffer) < SSE_BATCH_MAX_BYTES:
+                try:
+                    item = await asyncio.wait_for(queue.get(), deadline - loop.time())
+                except TimeoutError:
+                    break
+                if item is end or isinstance(item, Exception):
+                    break
+                buffer += item
+                flush = _flushes_batch(item)
+                item = None
+            yield bytes(buffer)
+            if item is None:
+                item = await queue.get()
+    finally:
+        producer.cancel()
+
+
+def _make_event(event_type: str, data: dict[str, any]) -> bytes:
+    # Encoded straight to UTF-8 bytes; StreamingResponse sends them as-is
+    return b"event: " + event_type.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
 
 
 @app.post("/api/tts")
@@ -372,8 +488,8 @@ async def text_to_speech(request: TTSRequest):
 async def generate_podcast(request: GeneratePodcastRequest):
     try:
         report_content = request.content
-        print(report_content)
-        workflow = build_podcast_graph()
+        logger.debug("report_content size=%d", len(report_content))
+        workflow = _compiled_graph(build_podcast_graph)
         final_state = workflow.invoke({"input": report_content})
         audio_bytes = final_state["output"]
         return Response(content=audio_bytes, media_type="audio/mp3")
@@ -386,15 +502,16 @@ async def generate_podcast(request: GeneratePodcastRequest):
 async def generate_ppt(request: GeneratePPTRequest):
     try:
         report_content = request.content
-        print(report_content)
-        workflow = build_ppt_graph()
+        logger.debug("report_content size=%d", len(report_content))
+        workflow = _compiled_graph(build_ppt_graph)
         final_state = workflow.invoke({"input": report_content})
         generated_file_path = final_state["generated_file_path"]
-        with open(generated_file_path, "rb") as f:
-            ppt_bytes = f.read()
-        return Response(
-            content=ppt_bytes,
+        # Stream the file from disk and remove it once it has been sent
+        return FileResponse(
+            generated_file_path,
             media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+            filename="output.pptx",
+            background=BackgroundTask(os.unlink, generated_file_path),
         )
     except Exception as e:
         logger.exception(f"Error occurred during ppt generation: {str(e)}")
@@ -406,7 +523,7 @@ async def generate_prose(request: GenerateProseRequest):
     try:
         sanitized_prompt = request.prompt.replace("\r\n", "").replace("\n", "")
         logger.info(f"Generating prose for prompt: {sanitized_prompt}")
-        workflow = build_prose_graph()
+        workflow = _compiled_graph(build_prose_graph)
         events = workflow.astream(
             {
                 "content": request.prompt,
@@ -417,7 +534,7 @@ async def generate_prose(request: GenerateProseRequest):
             subgraphs=True,
         )
         return StreamingResponse(
-            (f"data: {event[0].content}\n\n" async for _, event in events),
+            (_make_prose_event(event[0].content) async for _, event in events),
             media_type="text/event-stream",
         )
     except Exception as e:
@@ -425,37 +542,29 @@ async def generate_prose(request: GenerateProseRequest):
         raise HTTPException(status_code=500, detail=INTERNAL_SERVER_ERROR_DETAIL)
 
 
+def _make_prose_event(content) -> bytes:
+    # Content is normally a str; anything else is sent as its str() form
+    if not isinstance(content, str):
+        content = str(content)
+    return b"data: " + content.encode() + b"\n\n"
+
+
+# Report styles by upper-cased name, for case-insensitive lookup
+_REPORT_STYLES = {style.name: style for style in ReportStyle}
+
+
 @app.post("/api/prompt/enhance")
 async def enhance_prompt(request: EnhancePromptRequest):
     try:
         sanitized_prompt = request.prompt.replace("\r\n", "").replace("\n", "")
         logger.info(f"Enhancing prompt: {sanitized_prompt}")
 
-        # Convert string report_style to ReportStyle enum
-        report_style = None
-        if request.report_style:
-            try:
-                # Handle both uppercase and lowercase input
-                style_mapping = {
-                    "ACADEMIC": ReportStyle.ACADEMIC,
-                    "POPULAR_SCIENCE": ReportStyle.POPULAR_SCIENCE,
-                    "NEWS": ReportStyle.NEWS,
-                    "SOCIAL_MEDIA": ReportStyle.SOCIAL_MEDIA,
-                    "academic": ReportStyle.ACADEMIC,
-                    "popular_science": ReportStyle.POPULAR_SCIENCE,
-                    "news": ReportStyle.NEWS,
-                    "social_media": ReportStyle.SOCIAL_MEDIA,
-                }
-                report_style = style_mapping.get(
-                    request.report_style, ReportStyle.ACADEMIC
-                )
-            except Exception:
-                # If invalid style, default to ACADEMIC
-                report_style = ReportStyle.ACADEMIC
-        else:
-            report_style = ReportStyle.ACADEMIC
+        # Convert string report_style to ReportStyle enum, defaulting to ACADEMIC
+        report_style = _REPORT_STYLES.get(
+            (request.report_style or "").upper(), ReportStyle.ACADEMIC
+        )
 
-        workflow = build_prompt_enhancer_graph()
+        workflow = _compiled_graph(build_prompt_enhancer_graph)
         final_state = workflow.invoke(
             {
                 "prompt": request.prompt,
@@ -538,13 +647,20 @@ async def rag_resources(request: Annotated[RAGResourceRequest, Query()]):
     return RAGResourcesResponse(resources=[])
 
 
-@app.get("/api/config", response_model=ConfigResponse)
-async def config():
-    """Get the config of the server."""
+# Serialized /api/config body, along with the model config it was built from
+_config_response_cache: Optional[tuple[dict, bytes]] = None
+
+
+def _config_response_body() -> bytes:
+    """Build the /api/config body, reusing it until the model config changes"""
+    global _config_response_cache
     from src.server.config_request import ModelInfo
 
-    # Convert the model data to the new format
     raw_models = get_configured_llm_models()
+    if _config_response_cache is not None and _config_response_cache[0] is raw_models:
+        return _config_response_cache[1]
+
+    # Convert the model data to the new format
     formatted_models = {}
 
     for llm_type, models_list in raw_models.items():
@@ -552,10 +668,24 @@ async def config():
             ModelInfo(**model_data) for model_data in models_list
         ]
 
-    return ConfigResponse(
+    response = ConfigResponse(
         rag=RAGConfigResponse(provider=SELECTED_RAG_PROVIDER),
         models=formatted_models,
     )
+    body = orjson.dumps(response.model_dump(mode="json"))
+    _config_response_cache = (raw_models, body)
+    return body
+
+
+@app.get("/api/config", response_model=ConfigResponse)
+async def config():
+    """Get the config of the server."""
+    return Response(content=_config_response_body(), media_type="application/json")
+
+
+# Accounts whose default models this process has already initialized
+INITIALIZED_ACCOUNTS_MAX_SIZE = 100_000
+_initialized_accounts: set[str] = set()
 
 
 @app.get("/api/models")
@@ -563,17 +693,25 @@ async def get_account_models(user_id: str = Depends(get_current_user_id)):
     """
     Get all models for the authenticated account. Ensures default models are initialized.
     """
-    async for session in get_user_session(user_id):
-        # Ensure default models are initialized
-        await initialize_default_models_for_account(user_id, session)
-        # Fetch all models for this account
-        models = await ModelInfo.get_for_account(session, user_id)
-        return {"models": [m.to_dict() for m in models]}
+    async with get_user_session(user_id) as session:
+        # Ensure default models are initialized, in the same transaction as the read
+        initialize = user_id not in _initialized_accounts
+        if initialize:
+            await initialize_default_models_for_account(user_id, session, commit=False)
+        # Fetch all models for this account, serialized by the database
+        models_json = await ModelInfo.get_for_account_as_json(session, user_id)
+        await session.commit()
+
+    if initialize:
+        if len(_initialized_accounts) >= INITIALIZED_ACCOUNTS_MAX_SIZE:
+            _initialized_accounts.clear()
+        _initialized_accounts.add(user_id)
+    return Response(content=models_json, media_type="application/json")
 
 
 @app.get("/api/model-parameters")
 async def list_model_parameters(user_id: str = Depends(get_current_user_id)):
-    async for session in get_user_session(user_id):
+    async with get_user_session(user_id) as session:
         params = await ModelParameters.get_for_account(session, user_id)
         return {"parameters": [p.to_dict() for p in params]}
 
@@ -582,7 +720,7 @@ async def list_model_parameters(user_id: str = Depends(get_current_user_id)):
 async def get_model_parameters(
     model_id: str, user_id: str = Depends(get_current_user_id)
 ):
-    async for session in get_user_session(user_id):
+    async with get_user_session(user_id) as session:
         param = await ModelParameters.get_for_model(session, user_id, model_id)
         if not param:
             raise HTTPException(status_code=404, detail="Model parameters not found")
@@ -592,12 +730,12 @@ async def get_model_parameters(
 @app.post("/api/model-parameters/{model_id}")
 async def upsert_model_parameters(
     model_id: str,
-    params: dict = Body(...),
+    params: ModelParametersRequest,
     user_id: str = Depends(get_current_user_id),
 ):
-    allowed_keys = {"temperature", "max_tokens", "top_p", "frequency_penalty"}
-    filtered = {k: v for k, v in params.items() if k in allowed_keys}
-    async for session in get_user_session(user_id):
+    # Only the fields the client sent are updated
+    filtered = params.model_dump(exclude_unset=True)
+    async with get_user_session(user_id) as session:
         obj = await ModelParameters.upsert(session, user_id, model_id, filtered)
         return obj.to_dict()
 
@@ -606,7 +744,7 @@ async def upsert_model_parameters(
 async def delete_model_parameters(
     model_id: str, user_id: str = Depends(get_current_user_id)
 ):
-    async for session in get_user_session(user_id):
+    async with get_user_session(user_id) as session:
         ok = await ModelParameters.delete_for_model(session, user_id, model_id)
         if not ok:
             raise HTTPException(status_code=404, detail="Model parameters not found")
@@ -614,14 +752,14 @@ async def delete_model_parameters(
 
 
 @app.get("/api/settings")
-async def get_user_settings(user_id: str = Depends(get_current_user_id)):
+async def get_user_settings(user_id: UUID = Depends(get_current_user_uuid)):
     DEFAULT_SETTINGS = {
         "flows": [],
         "activeFlowId": "",
         "modelParameters": {},
         "mcp": {"servers": [], "preRegistered": []},
     }
-    async for session in get_user_session(user_id):
+    async with get_user_session(str(user_id)) as session:
         settings = await get_settings_by_user_id(session, user_id)
         if settings is None:
             # Auto-create default settings for new user
@@ -634,8 +772,8 @@ async def get_user_settings(user_id: str = Depends(get_current_user_id)):
 @app.post("/api/settings")
 async def update_user_settings(
     settings: dict = Body(...),
-    user_id: str = Depends(get_current_user_id),
+    user_id: UUID = Depends(get_current_user_uuid),
 ):
-    async for session in get_user_session(user_id):
+    async with get_user_session(str(user_id)) as session:
         updated = await upsert_settings_by_user_id(session, user_id, settings)
         return {"settings": updated}
@@ -0,0 +1,21 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ModelParametersRequest(BaseModel):
+    """Request model for saving a model's parameters; unknown keys are dropped."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    temperature: Optional[float] = Field(None, description="Sampling temperature")
+    max_tokens: Optional[int] = Field(
+        None, description="Maximum number of tokens to generate"
+    )
+    top_p: Optional[float] = Field(None, description="Nucleus sampling probability")
+    frequency_penalty: Optional[float] = Field(
+        None, description="Penalty for repeated tokens"
+    )
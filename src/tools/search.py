@@ -25,8 +25,19 @@ LoggedBraveSearch = create_logged_tool(BraveSearch)
 LoggedArxivSearch = create_logged_tool(ArxivQueryRun)
 
 
+# Search tools are stateless, so reuse one instance per engine and result count
+_web_search_tools: dict[tuple[str, int], object] = {}
+
+
 # Get the selected search tool
 def get_web_search_tool(max_search_results: int):
+    key = (SELECTED_SEARCH_ENGINE, max_search_results)
+    if key not in _web_search_tools:
+        _web_search_tools[key] = _create_web_search_tool(max_search_results)
+    return _web_search_tools[key]
+
+
+def _create_web_search_tool(max_search_results: int):
     if SELECTED_SEARCH_ENGINE == SearchEngine.TAVILY.value:
         return LoggedTavilySearch(
             name="web_search",
@@ -2,17 +2,61 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
-import json
+import asyncio
+from functools import lru_cache
 from typing import Dict, List, Optional
 
 import aiohttp
-import requests
+import httpx
+import orjson
 from langchain_community.utilities.tavily_search import TAVILY_API_URL
 from langchain_community.utilities.tavily_search import (
     TavilySearchAPIWrapper as OriginalTavilySearchAPIWrapper,
 )
 
 
+# Advanced searches with raw content can take a while
+TAVILY_TIMEOUT_SECONDS = 60
+
+
+@lru_cache(maxsize=1)
+def _get_http_client() -> httpx.Client:
+    """Shared client for synchronous searches, keeping connections to Tavily alive"""
+    return httpx.Client(timeout=TAVILY_TIMEOUT_SECONDS)
+
+
+# Session shared by async searches, and the event loop it belongs to
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Get or create the aiohttp session for async searches on this event loop"""
+    global _session, _session_loop
+
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=128, limit_per_host=32, ttl_dns_cache=300, keepalive_timeout=60
+            ),
+            timeout=aiohttp.ClientTimeout(total=TAVILY_TIMEOUT_SECONDS),
+            trust_env=True,
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close_session():
+    """Close the shared async session and its pooled connections"""
+    global _session, _session_loop
+
+    if _session is not None:
+        await _session.close()
+        _session = None
+        _session_loop = None
+
+
 class EnhancedTavilySearchAPIWrapper(OriginalTavilySearchAPIWrapper):
     def raw_results(
         self,
@@ -39,13 +83,9 @@ class EnhancedTavilySearchAPIWrapper(OriginalTavilySearchAPIWrapper):
             "include_image_descriptions": include_image_descriptions,
         }
         try:
-            response = requests.post(
-                # type: ignore
-                f"{TAVILY_API_URL}/search",
-                json=params,
-            )
+            response = _get_http_client().post(f"{TAVILY_API_URL}/search", json=params)
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
             # Return a proper error response instead of raising exception
             return {"error": f"Search API error: {str(e)}", "results": [], "images": []}
@@ -64,36 +104,29 @@ class EnhancedTavilySearchAPIWrapper(OriginalTavilySearchAPIWrapper):
     ) -> Dict:
         """Get results from the Tavily Search API asynchronously."""
 
-        # Function to perform the API call
-        async def fetch() -> str:
-            params = {
-                "api_key": self.tavily_api_key.get_secret_value(),
-                "query": query,
-                "max_results": max_results,
-                "search_depth": search_depth,
-                "include_domains": include_domains,
-                "exclude_domains": exclude_domains,
-                "include_answer": include_answer,
-                "include_raw_content": include_raw_content,
-                "include_images": include_images,
-                "include_image_descriptions": include_image_descriptions,
+        params = {
+            "api_key": self.tavily_api_key.get_secret_value(),
+            "query": query,
+            "max_results": max_results,
+            "search_depth": search_depth,
+            "include_domains": include_domains,
+            "exclude_domains": exclude_domains,
+            "include_answer": include_answer,
+            "include_raw_content": include_raw_content,
+            "include_images": include_images,
+            "include_image_descriptions": include_image_descriptions,
+        }
+        session = await get_session()
+        async with session.post(f"{TAVILY_API_URL}/search", json=params) as res:
+            if res.status == 200:
+                # Parse the body bytes directly, skipping the decode to str
+                return orjson.loads(await res.read())
+            # Return a proper error response instead of raising exception
+            return {
+                "error": f"Search API error {res.status}: {res.reason}",
+                "results": [],
+                "images": [],
             }
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.post(f"{TAVILY_API_URL}/search", json=params) as res:
-                    if res.status == 200:
-                        data = await res.text()
-                        return data
-                    else:
-                        # Return a proper error JSON instead of raising exception
-                        error_response = {
-                            "error": f"Search API error {res.status}: {res.reason}",
-                            "results": [],
-                            "images": [],
-                        }
-                        return json.dumps(error_response)
-
-        results_json_str = await fetch()
-        return json.loads(results_json_str)
 
     def clean_results_with_images(
         self, raw_results: Dict[str, List[Dict]]
@@ -3,10 +3,18 @@
 
 import logging
 import json
+import re
+
 import json_repair
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Payload of an optionally fenced (```json / ```ts) block
+_FENCE_RE = re.compile(r"^\s*(?:```(?:json|ts)\s*)?(.*?)(?:```)?\s*$", re.DOTALL)
+# First structural character of a JSON document
+_JSON_START_RE = re.compile(r"[{\[]")
+
 
 def repair_json_output(content: str) -> str:
     """
@@ -16,46 +24,34 @@ def repair_json_output(content: str) -> str:
         content (str): String content that may contain JSON
 
     Returns:
-        str: Repaired JSON string, or original content if not JSON
+        str: The JSON itself if it is already valid, the repaired JSON string
+            otherwise, or original content if not JSON
     """
-    content = content.strip()
-
-    # Check if content contains JSON (either starts with JSON or has it embedded)
-    has_json = (
-        content.startswith(("{", "["))
-        or "```json" in content
-        or "```ts" in content
-        or "{" in content
-        or "[" in content
-    )
-
-    if has_json:
-        try:
-            # If content is wrapped in ```json code block, extract the JSON part
-            if content.startswith("```json"):
-                content = content.removeprefix("```json")
-
-            if content.startswith("```ts"):
-                content = content.removeprefix("```ts")
-
-            if content.endswith("```"):
-                content = content.removesuffix("```")
-
-            # Handle cases where LLM adds prefix text before JSON (e.g., "planner: {...}")
-            if not content.strip().startswith(("{", "[")):
-                # Find the first occurrence of { or [
-                start_idx = -1
-                for char in ["{", "["]:
-                    idx = content.find(char)
-                    if idx != -1 and (start_idx == -1 or idx < start_idx):
-                        start_idx = idx
-
-                if start_idx != -1:
-                    content = content[start_idx:]
-
-            # Try to repair and parse JSON
-            repaired_content = json_repair.loads(content)
-            return json.dumps(repaired_content, ensure_ascii=False)
-        except Exception as e:
-            logger.warning(f"JSON repair failed: {e}")
-    return content
+    # Track the bounds of the payload instead of stripping and re-slicing, so
+    # multi-KB LLM outputs are copied once, when the result is cut out
+    lo, hi = _FENCE_RE.match(content).span(1)
+
+    # Skip any prefix text the LLM added before the JSON (e.g., "planner: {...}")
+    start = _JSON_START_RE.search(content, lo, hi)
+    if start:
+        lo = start.start()
+        # Well-formed JSON is returned as is; text after the closing bracket is
+        # the next most common defect
+        end = content.rfind("}" if content[lo] == "{" else "]", lo, hi)
+        if end != -1:
+            candidate = content[lo : end + 1]
+            try:
+                orjson.loads(candidate)
+                return candidate
+            except orjson.JSONDecodeError:
+                pass
+    elif "```json" not in content and "```ts" not in content:
+        return content.strip()
+
+    try:
+        # Try to repair and parse JSON
+        repaired_content = json_repair.loads(content[lo:hi])
+        return json.dumps(repaired_content, ensure_ascii=False)
+    except Exception as e:
+        logger.warning(f"JSON repair failed: {e}")
+        return content[lo:hi]
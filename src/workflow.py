@@ -4,24 +4,27 @@
 import asyncio
 import logging
 import uuid
-from datetime import datetime, timezone
-from src.graph import build_graph
-from src.auth.billing import (
-    check_billing_status,
-    create_workflow_execution,
-    update_workflow_execution,
-)
-from src.graph.types import State
-from langchain_core.runnables import RunnableConfig
-from src.config.configuration import Configuration
-from langchain_core.messages import HumanMessage, AIMessage
-from src.prompts.planner_model import Plan
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,  # Default level is INFO
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Mapping
+
+if TYPE_CHECKING:
+    from src.graph.types import State
+
+__all__ = [
+    "configure_logging",
+    "enable_debug_logging",
+    "get_graph",
+    "run_agent_workflow_async",
+]
+
+
+def configure_logging(level: int = logging.INFO):
+    """Configure root logging; called by entry points, never on import."""
+    logging.basicConfig(
+        level=level,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
 
 
 def enable_debug_logging():
@@ -31,8 +34,55 @@ def enable_debug_logging():
 
 logger = logging.getLogger(__name__)
 
-# Create the graph
-graph = build_graph()
+# Workflows allowed to run at once in this process; further calls wait for a
+# slot instead of piling more load onto billing, the database and the LLMs
+MAX_CONCURRENT_WORKFLOWS = 64
+
+_workflow_semaphore = asyncio.Semaphore(MAX_CONCURRENT_WORKFLOWS)
+
+
+@lru_cache(maxsize=1)
+def get_graph():
+    """Get the workflow graph, importing and building it on first use"""
+    from src.graph import build_graph
+
+    return build_graph()
+
+
+def __getattr__(name: str):
+    # Keep `src.workflow.graph` working without building the graph on import
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Initial state values that do not depend on the request
+_STATE_DEFAULTS: Mapping[str, Any] = MappingProxyType(
+    {
+        "plan_iterations": 0,
+        "final_report": "",
+        "current_plan": "",  # Empty string as initial value
+        "auto_accepted_plan": True,
+    }
+)
+
+
+@lru_cache(maxsize=64)
+def _config_template(
+    max_plan_iterations: int,
+    max_step_num: int,
+    enable_background_investigation: bool,
+    locale: str,
+) -> Mapping[str, Any]:
+    """Read-only configurable values shared by workflows with the same options"""
+    return MappingProxyType(
+        {
+            "max_plan_iterations": max_plan_iterations,
+            "max_step_num": max_step_num,
+            "enable_background_investigation": enable_background_investigation,
+            "locale": locale,
+        }
+    )
 
 
 async def run_agent_workflow_async(
@@ -43,68 +93,90 @@ async def run_agent_workflow_async(
     max_step_num: int = 3,
     enable_background_investigation: bool = False,
     locale: str = "en",
-) -> State:
+) -> "State":
     """Run the agent workflow asynchronously."""
-    try:
-        # Check billing status
-        can_run, message = await check_billing_status(user_id)
-        if not can_run:
-            raise ValueError(message)
-
-        # Create workflow execution record
-        thread_id = str(uuid.uuid4())
-        execution_id = await create_workflow_execution(user_id, thread_id)
-
-        # Create initial state
-        state = State(
-            {
-                "messages": [HumanMessage(content=user_input)],
-                "plan_iterations": 0,
-                "final_report": "",
-                "current_plan": "",  # Empty string as initial value
-                "observations": [],
-                "auto_accepted_plan": True,
-                "enable_background_investigation": enable_background_investigation,
-                "research_topic": user_input,
-                "locale": locale,
-                "max_plan_iterations": max_plan_iterations,
-                "max_step_num": max_step_num,
-                "thread_id": thread_id,
-                "execution_id": execution_id,
-                "user_id": user_id,
-            }
-        )
-
-        # Create config
-        config = RunnableConfig(
-            configurable={
-                "max_plan_iterations": max_plan_iterations,
-                "max_step_num": max_step_num,
-                "enable_background_investigation": enable_background_investigation,
-                "locale": locale,
-                "thread_id": thread_id,
-                "execution_id": execution_id,
-                "user_id": user_id,
-            }
-        )
-
-        # Enable debug logging if requested
-        if debug:
-            enable_debug_logging()
-
-        # Run the graph
+    from langchain_core.messages import HumanMessage
+    from langchain_core.runnables import RunnableConfig
+
+    from src.auth.billing import (
+        check_billing_status,
+        create_workflow_execution,
+        update_workflow_execution,
+    )
+    from src.graph.types import State
+
+    async with _workflow_semaphore:
         try:
-            final_state = await graph.astream(state, config=config).__anext__()
-            await update_workflow_execution(execution_id, "completed")
-            return final_state
+            # Check billing status while the workflow execution record is created
+            thread_id = uuid.uuid4().hex
+            billing, execution_id = await asyncio.gather(
+                check_billing_status(user_id),
+                create_workflow_execution(user_id, thread_id),
+                return_exceptions=True,
+            )
+            if isinstance(execution_id, BaseException):
+                raise execution_id
+            if isinstance(billing, BaseException):
+                await update_workflow_execution(execution_id, "failed", str(billing))
+                raise billing
+            can_run, message = billing
+            if not can_run:
+                # The record was created optimistically; close it out as stopped
+                await update_workflow_execution(execution_id, "stopped", message)
+                raise ValueError(message)
+
+            # Create initial state
+            state = State(
+                {
+                    **_STATE_DEFAULTS,
+                    "messages": [HumanMessage(content=user_input)],
+                    "observations": [],
+                    "enable_background_investigation": enable_background_investigation,
+                    "research_topic": user_input,
+                    "locale": locale,
+                    "max_plan_iterations": max_plan_iterations,
+                    "max_step_num": max_step_num,
+                    "thread_id": thread_id,
+                    "execution_id": execution_id,
+                    "user_id": user_id,
+                }
+            )
+
+            # Create config
+            config = RunnableConfig(
+                configurable={
+                    **_config_template(
+                        max_plan_iterations,
+                        max_step_num,
+                        enable_background_investigation,
+                        locale,
+                    ),
+                    "thread_id": thread_id,
+                    "execution_id": execution_id,
+                    "user_id": user_id,
+                }
+            )
+
+            # Enable debug logging if requested
+            if debug:
+                enable_debug_logging()
+
+            # Run the graph
+            try:
+                final_state = (
+                    await get_graph().astream(state, config=config).__anext__()
+                )
+                await update_workflow_execution(execution_id, "completed")
+                return final_state
+            except Exception as e:
+                await update_workflow_execution(execution_id, "failed", str(e))
+                raise
+
         except Exception as e:
-            await update_workflow_execution(execution_id, "failed", str(e))
+            logger.error(f"Error running workflow: {str(e)}")
             raise
 
-    except Exception as e:
-        logger.error(f"Error running workflow: {str(e)}")
-        raise
-
 
 if __name__ == "__main__":
-    print(graph.get_graph(xray=True).draw_mermaid())
+    configure_logging()
+    print(get_graph().get_graph(xray=True).draw_mermaid())
@@ -5,9 +5,48 @@ Test script for our Hello World MCP server
 
 import subprocess
 import json
+import selectors
 import time
 import sys
 
+# How long the server may take to answer the initialize request
+STARTUP_TIMEOUT_SECONDS = 10
+
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "test_mcp", "version": "0.1.0"},
+    },
+}
+
+
+def wait_until_ready(process, timeout=STARTUP_TIMEOUT_SECONDS):
+    """Send an MCP initialize request and wait for the server's reply"""
+    process.stdin.write(json.dumps(INITIALIZE_REQUEST) + "\n")
+    process.stdin.flush()
+
+    deadline = time.monotonic() + timeout
+    with selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ)
+        while process.poll() is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not selector.select(remaining):
+                return False
+            line = process.stdout.readline()
+            if not line:
+                return False
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("id") == INITIALIZE_REQUEST["id"]:
+                return "result" in message
+    return False
+
 
 def test_mcp_server():
     """Test our MCP server by running it and checking if tools are available"""
@@ -21,18 +60,17 @@ def test_mcp_server():
         # Start the server process
         process = subprocess.Popen(
             ["python", "hello_mcp.py"],
+            stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
         )
 
-        # Give it a moment to start
-        time.sleep(2)
-
-        # Check if process is still running (not crashed)
-        if process.poll() is None:
+        # Wait until the server answers instead of sleeping a fixed time
+        if wait_until_ready(process):
             print("✅ MCP server started successfully!")
         else:
+            process.terminate()
             stdout, stderr = process.communicate()
             print(f"❌ MCP server failed to start!")
             print(f"STDOUT: {stdout}")
@@ -66,6 +104,7 @@ def print_server_info():
     print("Server Name: hello-world")
     print("Available Tools:")
     print("  🔢 add_numbers - Add two numbers together")
+    print("  🔢 add_numbers_batch - Add many pairs of numbers in one call")
     print("  👋 say_hello - Say hello to someone")
     print("  📊 get_system_info - Get basic system information")
     print()
@@ -2,8 +2,33 @@
 Pytest configuration and shared fixtures
 """
 
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
-from tests.utils.db_test_utils import db_session
+from tests.utils.db_test_utils import db_schema, db_session, mock_result
+
+# Make the database fixtures available to all tests
+__all__ = ["db_schema", "db_session"]
+
+
+@pytest.fixture
+def mock_session():
+    """Factory for AsyncSession mocks used by statement-level unit tests
+
+    Each value passed becomes the result of one execute() call, in order; a
+    single value is returned by every call.
+    """
+
+    def make(*values):
+        session = MagicMock(info={})
+        if len(values) > 1:
+            session.execute = AsyncMock(side_effect=[mock_result(v) for v in values])
+        else:
+            session.execute = AsyncMock(return_value=mock_result(*values))
+        for name in ("commit", "flush", "rollback", "refresh", "close"):
+            setattr(session, name, AsyncMock())
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        return session
 
-# Make the db_session fixture available to all tests
-__all__ = ["db_session"]
+    return make
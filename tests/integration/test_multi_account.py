@@ -2,6 +2,7 @@
 Integration tests for multi-account functionality
 """
 
+import asyncio
 import pytest
 import uuid
 from datetime import datetime
@@ -22,43 +23,41 @@ async def test_account_isolation():
     user2_id = str(uuid.uuid4())
 
     # Get sessions for both users
-    async for user1_session in get_user_session(user1_id):
-        async for user2_session in get_user_session(user2_id):
-            # Create MCP connection for user 1
+    async with get_user_session(user1_id) as user1_session:
+        async with get_user_session(user2_id) as user2_session:
+            # Create MCP connections for both users concurrently
             connection1_data = {
                 "qualified_name": "test.user1.connection",
                 "name": "User 1 Connection",
                 "config": {"transport": "stdio"},
                 "account_id": user1_id,
             }
-            connection1 = await MCPConnection.create(user1_session, connection1_data)
-
-            # Create MCP connection for user 2
             connection2_data = {
                 "qualified_name": "test.user2.connection",
                 "name": "User 2 Connection",
                 "config": {"transport": "stdio"},
                 "account_id": user2_id,
             }
-            connection2 = await MCPConnection.create(user2_session, connection2_data)
-
-            # User 1 should only see their own connections
-            user1_connections = await MCPConnection.get_for_account(
-                user1_session, user1_id
+            connection1, connection2 = await asyncio.gather(
+                MCPConnection.create(user1_session, connection1_data),
+                MCPConnection.create(user2_session, connection2_data),
             )
-            assert len(user1_connections) == 1
-            assert user1_connections[0].name == "User 1 Connection"
 
-            # User 2 should only see their own connections
-            user2_connections = await MCPConnection.get_for_account(
-                user2_session, user2_id
+            # Each user should only see their own connections
+            user1_connections, user2_connections = await asyncio.gather(
+                MCPConnection.get_for_account_core(user1_session, user1_id),
+                MCPConnection.get_for_account_core(user2_session, user2_id),
             )
+            assert len(user1_connections) == 1
+            assert user1_connections[0]["name"] == "User 1 Connection"
             assert len(user2_connections) == 1
-            assert user2_connections[0].name == "User 2 Connection"
+            assert user2_connections[0]["name"] == "User 2 Connection"
 
             # Clean up
-            await MCPConnection.delete(user1_session, str(connection1.id))
-            await MCPConnection.delete(user2_session, str(connection2.id))
+            await asyncio.gather(
+                MCPConnection.delete(user1_session, str(connection1.id)),
+                MCPConnection.delete(user2_session, str(connection2.id)),
+            )
 
 
 async def test_model_account_isolation():
@@ -68,9 +67,9 @@ async def test_model_account_isolation():
     user2_id = str(uuid.uuid4())
 
     # Get sessions for both users
-    async for user1_session in get_user_session(user1_id):
-        async for user2_session in get_user_session(user2_id):
-            # Create model for user 1
+    async with get_user_session(user1_id) as user1_session:
+        async with get_user_session(user2_id) as user2_session:
+            # Create models for both users concurrently
             model1_data = {
                 "id": "gpt-4-user1",
                 "name": "GPT-4 User 1",
@@ -78,9 +77,6 @@ async def test_model_account_isolation():
                 "provider": "openai",
                 "account_id": user1_id,
             }
-            model1 = await ModelInfo.create(user1_session, model1_data)
-
-            # Create model for user 2
             model2_data = {
                 "id": "gpt-4-user2",
                 "name": "GPT-4 User 2",
@@ -88,18 +84,23 @@ async def test_model_account_isolation():
                 "provider": "anthropic",
                 "account_id": user2_id,
             }
-            model2 = await ModelInfo.create(user2_session, model2_data)
+            model1, model2 = await asyncio.gather(
+                ModelInfo.create(user1_session, model1_data),
+                ModelInfo.create(user2_session, model2_data),
+            )
 
-            # User 1 should only see their own models
-            user1_models = await ModelInfo.get_for_account(user1_session, user1_id)
+            # Each user should only see their own models
+            user1_models, user2_models = await asyncio.gather(
+                ModelInfo.get_for_account_core(user1_session, user1_id),
+                ModelInfo.get_for_account_core(user2_session, user2_id),
+            )
             assert len(user1_models) == 1
-            assert user1_models[0].provider == "openai"
-
-            # User 2 should only see their own models
-            user2_models = await ModelInfo.get_for_account(user2_session, user2_id)
+            assert user1_models[0]["provider"] == "openai"
             assert len(user2_models) == 1
-            assert user2_models[0].provider == "anthropic"
+            assert user2_models[0]["provider"] == "anthropic"
 
             # Clean up
-            await ModelInfo.delete(user1_session, model1.id)
-            await ModelInfo.delete(user2_session, model2.id)
+            await asyncio.gather(
+                ModelInfo.delete(user1_session, model1.id),
+                ModelInfo.delete(user2_session, model2.id),
+            )
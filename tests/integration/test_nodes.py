@@ -1170,6 +1170,8 @@ async def test_setup_and_execute_agent_step_with_mcp(
     tool_names = [t.name for t in loaded_tools if hasattr(t, "name")]
     assert "toolA" in tool_names
     assert "toolB" in tool_names
+    # MCP tools are created per request, so the agent is never cached
+    assert not kwargs.get("cache")
     # Should call _execute_agent_step
     patch_execute_agent_step.assert_called_once()
     assert result == "EXECUTED"
@@ -1340,7 +1342,9 @@ def patch_get_retriever_tool():
 
 @pytest.fixture
 def patch_setup_and_execute_agent_step():
-    async def fake_setup_and_execute_agent_step(state, config, agent_type, tools):
+    async def fake_setup_and_execute_agent_step(
+        state, config, agent_type, tools, cache_agent=False
+    ):
         return "RESEARCHER_RESULT"
 
     with patch(
@@ -1375,6 +1379,8 @@ async def test_researcher_node_with_retriever_tool(
     tools = args[3]
     assert tools[0] == retriever_tool
     assert patch_get_web_search_tool.return_value in tools
+    # The per-request retriever tool must keep the agent out of the cache
+    assert kwargs["cache_agent"] is False
     assert result == "RESEARCHER_RESULT"
 
 
@@ -1400,6 +1406,7 @@ async def test_researcher_node_without_retriever_tool(
     # Should not include retriever_tool
     assert all(getattr(t, "name", None) != "retriever_tool" for t in tools)
     assert patch_get_web_search_tool.return_value in tools
+    assert kwargs["cache_agent"] is True
     assert result == "RESEARCHER_RESULT"
 
 
@@ -9,7 +9,6 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.backend.database.base import Base
-from src.backend.database.session import get_session
 from tests.utils.db_test_utils import TestMCPConnection as MCPConnection
 from tests.utils.db_test_utils import TestModelInfo as ModelInfo
 
@@ -30,20 +29,18 @@ async def test_mcp_connection_persistence(db_session):
     # Act - Create
     connection = await MCPConnection.create(db_session, connection_data)
 
-    # Get a new session to ensure data was persisted
-    new_session = await anext(get_session())
+    # Commit and expire the identity map so the read below hits the database
+    await db_session.commit()
+    db_session.expire_all()
 
     # Act - Retrieve
-    retrieved_connection = await MCPConnection.get_by_id(new_session, connection_id)
+    retrieved_connection = await MCPConnection.get_by_id(db_session, connection_id)
 
     # Assert
     assert retrieved_connection is not None
     assert retrieved_connection.id == connection.id
     assert retrieved_connection.qualified_name == "test.integration.connection"
 
-    # Clean up
-    await new_session.close()
-
 
 async def test_model_info_persistence(db_session):
     """Test model info persistence with SQLAlchemy"""
@@ -60,11 +57,12 @@ async def test_model_info_persistence(db_session):
     # Act - Create
     model_info = await ModelInfo.create(db_session, model_data)
 
-    # Get a new session to ensure data was persisted
-    new_session = await anext(get_session())
+    # Commit and expire the identity map so the read below hits the database
+    await db_session.commit()
+    db_session.expire_all()
 
     # Act - Retrieve
-    retrieved_model = await ModelInfo.get_by_id(new_session, model_id)
+    retrieved_model = await ModelInfo.get_by_id(db_session, model_id)
 
     # Assert
     assert retrieved_model is not None
@@ -72,9 +70,6 @@ async def test_model_info_persistence(db_session):
     assert retrieved_model.name == "Test Integration Model"
     assert retrieved_model.context_window == 4096
 
-    # Clean up
-    await new_session.close()
-
 
 async def test_transaction_rollback(db_session):
     """Test transaction rollback with SQLAlchemy"""
@@ -90,24 +85,20 @@ async def test_transaction_rollback(db_session):
     # Create the connection
     await MCPConnection.create(db_session, connection_data)
 
-    # Start a new session and transaction
-    new_session = await anext(get_session())
+    await db_session.commit()
 
     try:
         # Try to update with invalid data (missing required field)
-        await MCPConnection.update(new_session, connection_id, {"qualified_name": None})
-        await new_session.commit()
+        await MCPConnection.update(db_session, connection_id, {"qualified_name": None})
+        await db_session.commit()
         assert False, "Should have raised an exception"
     except Exception:
         # Rollback the transaction
-        await new_session.rollback()
+        await db_session.rollback()
 
     # Get the connection again to verify it wasn't changed
-    retrieved_connection = await MCPConnection.get_by_id(new_session, connection_id)
+    retrieved_connection = await MCPConnection.get_by_id(db_session, connection_id)
 
     # Assert
     assert retrieved_connection is not None
     assert retrieved_connection.qualified_name == "test.rollback.connection"
-
-    # Clean up
-    await new_session.close()
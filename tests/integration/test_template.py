@@ -1,6 +1,8 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import re
+
 import pytest
 from src.prompts.template import get_prompt_template, apply_prompt_template
 
@@ -143,3 +145,143 @@ def test_apply_prompt_template_reporter():
     messages_cn = apply_prompt_template("reporter", test_state_social_media_cn)
     system_content_cn = messages_cn[0]["content"]
     assert "小红书" in system_content_cn
+
+
+def test_compiled_templates_are_reused():
+    """Test that file and custom prompt templates are compiled once"""
+    from src.prompts import template as template_module
+    from src.config.configuration import Configuration
+
+    state = {"messages": [], "locale": "en-US"}
+    apply_prompt_template("coder", state)
+    assert template_module._get_file_template("coder") is (
+        template_module._get_file_template("coder")
+    )
+
+    config = Configuration(custom_prompts={"coder": "Custom {{ locale }}"})
+    first = apply_prompt_template("coder", state, config)
+    second = apply_prompt_template("coder", state, config)
+    assert first == second == [{"role": "system", "content": "Custom en-US"}]
+    # Configurations rebuilt from the same settings share the compiled prompt
+    same = Configuration(custom_prompts={"coder": "Custom {{ locale }}"})
+    assert same.compiled_custom_prompts["coder"] is (
+        config.compiled_custom_prompts["coder"]
+    )
+
+
+def test_blank_custom_prompt_falls_back_to_file_template():
+    """Test that a whitespace-only custom prompt is ignored"""
+    from src.config.configuration import Configuration
+
+    config = Configuration(custom_prompts={"coder": "  \n"})
+    assert config.compiled_custom_prompts == {}
+    messages = apply_prompt_template("coder", {"messages": []}, config)
+    assert messages[0]["content"].strip()
+
+
+def test_malformed_custom_prompt_only_fails_its_own_agent():
+    """Test that a custom prompt with a syntax error does not break other agents"""
+    from src.config.configuration import Configuration
+
+    config = Configuration.from_runnable_config(
+        {"configurable": {"custom_prompts": {"reporter": "Hi {% if %}"}}}
+    )
+
+    messages = apply_prompt_template("planner", {"messages": []}, config)
+    assert messages[0]["content"].strip()
+    with pytest.raises(ValueError, match="Error applying template reporter"):
+        apply_prompt_template("reporter", {"messages": []}, config)
+
+
+def test_configuration_fields_are_passed_without_copying():
+    """Test that configuration values reach templates as-is"""
+    from src.config.configuration import Configuration
+
+    resources = [{"uri": "rag://dataset/1", "title": "Docs"}]
+    config = Configuration(
+        resources=resources,
+        max_step_num=7,
+        custom_prompts={
+            "planner": "Steps: {{ max_step_num }} {{ resources is sameas r }}"
+        },
+    )
+    messages = apply_prompt_template(
+        "planner", {"messages": [], "r": resources}, config
+    )
+    assert messages[0]["content"] == "Steps: 7 True"
+
+
+def test_current_time_is_formatted_once_per_second(monkeypatch):
+    """Test that CURRENT_TIME is reused within the same second"""
+    from src.prompts import template as template_module
+
+    monkeypatch.setattr(template_module, "_current_time_cache", [0, ""])
+    monkeypatch.setattr(template_module.time, "time", lambda: 1_700_000_000.25)
+    first = template_module._current_time()
+    monkeypatch.setattr(template_module.time, "time", lambda: 1_700_000_000.75)
+    assert template_module._current_time() is first
+
+    monkeypatch.setattr(template_module.time, "time", lambda: 1_700_000_001.0)
+    assert template_module._current_time() != first
+    assert re.match(r"\w{3} \w{3} \d{2} \d{4} \d{2}:\d{2}:\d{2}", first)
+
+
+def test_long_history_keeps_first_and_recent_messages():
+    """Test context window truncation of long conversations"""
+    history = [{"role": "user", "content": str(i)} for i in range(30)]
+    messages = apply_prompt_template("coder", {"messages": history})
+
+    assert len(messages) == 21
+    assert [m["content"] for m in messages[1:4]] == ["0", "1", "2"]
+    assert [m["content"] for m in messages[4:]] == [str(i) for i in range(13, 30)]
+
+
+def test_static_renders_are_cached():
+    """Test that renders without CURRENT_TIME are reused for identical inputs"""
+    from src.prompts import template as template_module
+    from src.config.configuration import Configuration
+
+    config = Configuration(custom_prompts={"coder": "Hi {{ name }}"})
+    template = config.compiled_custom_prompts["coder"]
+    assert template.referenced_variables == ("name",)
+
+    template_module._render_cached.cache_clear()
+    for _ in range(2):
+        messages = apply_prompt_template("coder", {"messages": [], "name": 1}, config)
+    assert messages[0]["content"] == "Hi 1"
+    assert template_module._render_cached.cache_info().hits == 1
+
+    # Equal values of another type get their own entry
+    messages = apply_prompt_template("coder", {"messages": [], "name": True}, config)
+    assert messages[0]["content"] == "Hi True"
+
+    # Unhashable values are rendered without the cache
+    messages = apply_prompt_template("coder", {"messages": [], "name": [1]}, config)
+    assert messages[0]["content"] == "Hi [1]"
+    assert template_module._render_cached.cache_info().currsize == 2
+
+
+def test_templates_reading_current_time_are_not_cached():
+    """Test that prompts using CURRENT_TIME always render fresh"""
+    from src.prompts import template as template_module
+
+    template_module._render_cached.cache_clear()
+    apply_prompt_template("coder", {"messages": [], "locale": "en-US"})
+    assert template_module._render_cached.cache_info().currsize == 0
+
+
+def test_prompt_files_reload_only_in_dev(monkeypatch):
+    """Test that DEV=1 re-reads edited prompt files"""
+    import importlib
+
+    from src.prompts import template as template_module
+
+    assert not template_module.env.auto_reload
+    monkeypatch.setenv("DEV", "1")
+    try:
+        dev = importlib.reload(template_module)
+        assert dev.env.auto_reload
+        assert not hasattr(dev._get_file_template, "cache_info")
+    finally:
+        monkeypatch.delenv("DEV")
+        importlib.reload(template_module)
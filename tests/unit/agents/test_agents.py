@@ -0,0 +1,80 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+import src.agents.agents as agents
+
+
+@pytest.fixture
+def patch_agent_factory():
+    agents._build_agent.cache_clear()
+    with (
+        patch("src.agents.agents.get_llm_by_type") as mock_llm,
+        patch("src.agents.agents.ToolNode") as mock_tool_node,
+        patch(
+            "src.agents.agents.create_react_agent",
+            side_effect=lambda **kwargs: MagicMock(),
+        ) as mock_create,
+    ):
+        yield mock_create
+    agents._build_agent.cache_clear()
+
+
+def test_cached_agent_is_reused_for_same_tools(patch_agent_factory):
+    tools = [MagicMock(name="search"), MagicMock(name="crawl")]
+    first = agents.create_agent(
+        "researcher", "researcher", tools, "researcher", cache=True
+    )
+    second = agents.create_agent(
+        "researcher", "researcher", list(tools), "researcher", cache=True
+    )
+    assert first is second
+    assert patch_agent_factory.call_count == 1
+
+
+def test_cache_misses_on_new_tool_instances(patch_agent_factory):
+    first = agents.create_agent(
+        "researcher", "researcher", [MagicMock()], "researcher", cache=True
+    )
+    second = agents.create_agent(
+        "researcher", "researcher", [MagicMock()], "researcher", cache=True
+    )
+    assert first is not second
+    assert patch_agent_factory.call_count == 2
+
+
+def test_cache_misses_on_different_model(patch_agent_factory):
+    tools = [MagicMock()]
+    agents.create_agent("coder", "coder", tools, "coder", cache=True)
+    agents.create_agent(
+        "coder", "coder", tools, "coder", selected_models={"basic": "m2"}, cache=True
+    )
+    assert patch_agent_factory.call_count == 2
+
+
+def test_uncached_agent_is_always_rebuilt(patch_agent_factory):
+    tools = [MagicMock()]
+    agents.create_agent("coder", "coder", tools, "coder")
+    agents.create_agent("coder", "coder", tools, "coder")
+    assert patch_agent_factory.call_count == 2
+    assert agents._build_agent.cache_info().currsize == 0
+
+
+def test_unknown_agent_type_raises(patch_agent_factory):
+    with pytest.raises(ValueError):
+        agents.create_agent("x", "unknown", [], "x", cache=True)
+
+
+def test_prompt_reads_custom_prompts_from_run_config(patch_agent_factory):
+    agents.create_agent("coder", "coder", [MagicMock()], "coder", cache=True)
+    prompt = patch_agent_factory.call_args.kwargs["prompt"]
+    state = {"messages": [], "locale": "en-US"}
+
+    custom = prompt(
+        state,
+        {"configurable": {"custom_prompts": {"coder": "Custom coder in {{ locale }}"}}},
+    )
+    assert custom[0] == {"role": "system", "content": "Custom coder in en-US"}
+
+    # The same cached agent falls back to the template without custom prompts
+    default = prompt(state, {"configurable": {}})
+    assert default[0]["content"] != "Custom coder in en-US"
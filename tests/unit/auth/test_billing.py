@@ -0,0 +1,153 @@
+"""
+Unit tests for Stripe billing helpers
+"""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+
+from src.auth import billing
+from src.auth.http import get_http_transport
+
+
+def _mock_supabase(*results):
+    """Build a Supabase client whose RPC calls return the given data lists"""
+    client = MagicMock()
+    client.rpc.return_value.execute = AsyncMock(
+        side_effect=[
+            r if isinstance(r, Exception) else MagicMock(data=r) for r in results
+        ]
+    )
+    return client
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def _stop_upsert_worker():
+    yield
+    await billing.close_subscription_upserts()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_upserts_share_one_rpc_call():
+    client = _mock_supabase([{"ok": True}, {"ok": True}])
+    with patch.object(billing, "get_supabase_client", AsyncMock(return_value=client)):
+        await asyncio.gather(
+            billing.queue_subscription_upsert({"account_id": "a"}),
+            billing.queue_subscription_upsert({"account_id": "b"}),
+        )
+
+    client.rpc.assert_called_once_with(
+        "service_role_upsert_customer_subscriptions",
+        {"items": [{"account_id": "a"}, {"account_id": "b"}]},
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_item_only_fails_its_own_caller():
+    client = _mock_supabase([{"ok": True}, {"ok": False, "error": "bad uuid"}])
+    with patch.object(billing, "get_supabase_client", AsyncMock(return_value=client)):
+        ok, failed = await asyncio.gather(
+            billing.queue_subscription_upsert({"account_id": "a"}),
+            billing.queue_subscription_upsert({"account_id": "not-a-uuid"}),
+            return_exceptions=True,
+        )
+
+    assert ok is None
+    assert isinstance(failed, Exception)
+    assert str(failed) == "bad uuid"
+
+
+@pytest.mark.asyncio
+async def test_rpc_error_propagates_to_every_caller():
+    client = _mock_supabase(ConnectionError("supabase down"))
+    with patch.object(billing, "get_supabase_client", AsyncMock(return_value=client)):
+        results = await asyncio.gather(
+            billing.queue_subscription_upsert({"account_id": "a"}),
+            billing.queue_subscription_upsert({"account_id": "b"}),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_a_failed_batch():
+    client = _mock_supabase(ConnectionError("supabase down"), [{"ok": True}])
+    with patch.object(billing, "get_supabase_client", AsyncMock(return_value=client)):
+        with pytest.raises(ConnectionError):
+            await billing.queue_subscription_upsert({"account_id": "a"})
+        await billing.queue_subscription_upsert({"account_id": "a"})
+
+    assert client.rpc.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_upserts_before_stopping_the_worker():
+    client = _mock_supabase([{"ok": True}])
+    with patch.object(billing, "get_supabase_client", AsyncMock(return_value=client)):
+        pending = asyncio.create_task(
+            billing.queue_subscription_upsert({"account_id": "a"})
+        )
+        await asyncio.sleep(0)
+        worker = billing._upsert_worker
+        await billing.close_subscription_upserts()
+
+    assert client.rpc.call_count == 1
+    assert pending.done() and pending.exception() is None
+    assert worker.cancelled()
+    assert billing._upsert_worker is None
+
+
+def test_worker_is_recreated_on_a_new_event_loop():
+    client = _mock_supabase([{"ok": True}], [{"ok": True}])
+    with patch.object(billing, "get_supabase_client", AsyncMock(return_value=client)):
+        for _ in range(2):
+            asyncio.run(
+                asyncio.wait_for(
+                    billing.queue_subscription_upsert({"account_id": "a"}), timeout=5
+                )
+            )
+
+    assert client.rpc.call_count == 2
+
+
+def test_stripe_client_uses_shared_transport_with_retries():
+    billing.reset_stripe_client()
+    client = billing.get_stripe_client()
+    try:
+        http_client = billing._stripe_http_client
+        assert isinstance(http_client, billing.HTTP2StripeClient)
+        assert http_client._client_async._transport is get_http_transport()
+        assert client._requestor._options.max_network_retries == (
+            billing.STRIPE_MAX_NETWORK_RETRIES
+        )
+        assert billing.get_stripe_client() is client
+    finally:
+        billing.reset_stripe_client()
+    assert billing._stripe_client is None
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"verify_ssl_certs": False}, {"proxy": "http://proxy:8080"}]
+)
+def test_stripe_http_client_keeps_sdk_client_for_custom_tls_or_proxy(kwargs):
+    http_client = billing.HTTP2StripeClient(**kwargs)
+    assert http_client._client_async._transport is not get_http_transport()
+
+
+@pytest.mark.parametrize(
+    "subscription, item",
+    [
+        # API versions before 2025-03-31.basil
+        ({"current_period_start": 100, "current_period_end": 200}, {}),
+        # Basil and later report the period on the subscription item
+        ({}, {"current_period_start": 100, "current_period_end": 200}),
+    ],
+)
+def test_current_period_reads_either_shape(subscription, item):
+    start, end = billing._current_period(subscription, item)
+    assert start == datetime.fromtimestamp(100)
+    assert end == datetime.fromtimestamp(200)
@@ -0,0 +1,21 @@
+import pytest
+
+from src.auth import http
+
+
+@pytest.mark.asyncio
+async def test_transport_is_shared_until_closed():
+    transport = http.get_http_transport()
+    assert http.get_http_transport() is transport
+    assert transport._pool._http2 is True
+
+    await http.close_http_transport()
+
+    assert http.get_http_transport() is not transport
+    await http.close_http_transport()
+
+
+@pytest.mark.asyncio
+async def test_close_without_transport_is_a_no_op():
+    await http.close_http_transport()
+    await http.close_http_transport()
@@ -0,0 +1,42 @@
+import pytest
+
+from src.auth.config import Configuration, EnvMode
+
+
+@pytest.fixture(autouse=True)
+def clear_stripe_env(monkeypatch):
+    for name in Configuration._ENV_SPECIFIC_IDS:
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_staging_mode_resolves_staging_ids(monkeypatch):
+    monkeypatch.setenv("ENV_MODE", "staging")
+    config = Configuration()
+    assert config.ENV_MODE == EnvMode.STAGING
+    for name in Configuration._ENV_SPECIFIC_IDS:
+        assert getattr(config, name) == getattr(config, name + "_STAGING")
+    assert config.STRIPE_TIER_50_400_ID == "price_1RIKNgG6l1KZGqIrvsat5PW7"
+    assert config.STRIPE_PRODUCT_ID == "prod_SduuIP4pVCzDJG"
+
+
+@pytest.mark.parametrize("mode", ["local", "production"])
+def test_other_modes_resolve_prod_ids(monkeypatch, mode):
+    monkeypatch.setenv("ENV_MODE", mode)
+    config = Configuration()
+    for name in Configuration._ENV_SPECIFIC_IDS:
+        assert getattr(config, name) == getattr(config, name + "_PROD")
+    assert config.STRIPE_TIER_50_400_ID == "price_1RILb4G6l1KZGqIruNBUMTF1"
+
+
+def test_env_specific_ids_cannot_be_overridden_directly(monkeypatch):
+    monkeypatch.setenv("ENV_MODE", "production")
+    monkeypatch.setenv("STRIPE_PRODUCT_ID", "prod_override")
+    config = Configuration()
+    assert config.STRIPE_PRODUCT_ID == config.STRIPE_PRODUCT_ID_PROD
+
+
+def test_as_dict_includes_resolved_ids(monkeypatch):
+    monkeypatch.setenv("ENV_MODE", "staging")
+    data = Configuration().as_dict()
+    assert data["STRIPE_FREE_TIER_ID"] == data["STRIPE_FREE_TIER_ID_STAGING"]
+    assert "_ENV_SPECIFIC_IDS" not in data
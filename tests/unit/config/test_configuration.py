@@ -8,6 +8,8 @@ import types
 from pathlib import Path
 import builtins
 import importlib
+from dataclasses import fields
+import src.config.configuration as configuration_module
 from src.config.configuration import Configuration
 
 # Patch sys.path so relative import works
@@ -93,3 +95,10 @@ def test_from_runnable_config_with_no_config():
     assert config.max_search_results == 3
     assert config.resources == []
     assert config.mcp_settings is None
+
+
+def test_field_names_cover_every_init_field():
+    assert {name for name, _ in configuration_module._FIELD_NAMES} == {
+        f.name for f in fields(Configuration) if f.init
+    }
+    assert ("max_step_num", "MAX_STEP_NUM") in configuration_module._FIELD_NAMES
@@ -81,3 +81,22 @@ def test_load_yaml_config_cache(monkeypatch):
         assert config1["foo"] == "cache_value"
     finally:
         os.remove(tmp_path)
+
+
+def test_load_yaml_config_reloads_when_file_changes():
+    with tempfile.NamedTemporaryFile("w+", delete=False) as tmp:
+        tmp.write("foo: 1")
+        tmp_path = tmp.name
+
+    try:
+        config1 = load_yaml_config(tmp_path)
+        with open(tmp_path, "w") as f:
+            f.write("foo: 2")
+        stat = os.stat(tmp_path)
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        config2 = load_yaml_config(tmp_path)
+        assert config1["foo"] == 1
+        assert config2["foo"] == 2
+    finally:
+        os.remove(tmp_path)
@@ -0,0 +1,24 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.backend.database import connection, session
+
+
+def test_connection_module_reuses_the_session_factory():
+    assert connection.async_session_factory is session.async_session_factory
+    assert not hasattr(connection, "engine")
+
+
+@pytest.mark.asyncio
+async def test_db_connection_opens_one_session_and_closes_it():
+    db_session = MagicMock(close=AsyncMock())
+    factory = MagicMock(return_value=db_session)
+    with patch.object(connection, "async_session_factory", factory):
+        db = connection.DBConnection()
+        assert await db.get_session() is db_session
+        assert await db.get_session() is db_session
+        await db.close()
+
+    factory.assert_called_once_with()
+    db_session.close.assert_awaited_once()
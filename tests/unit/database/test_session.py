@@ -0,0 +1,70 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.backend.database import session
+
+
+def test_engine_uses_a_sized_queue_pool():
+    pool = session.engine.pool
+    assert isinstance(pool, AsyncAdaptedQueuePool)
+    assert pool.size() == session.DATABASE_POOL_SIZE
+    assert pool._pre_ping
+
+
+def test_engine_batches_bulk_inserts():
+    assert session.engine.sync_engine.dialect.insertmanyvalues_page_size == (
+        session.DATABASE_INSERTMANYVALUES_PAGE_SIZE
+    )
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_and_returns_connections():
+    connections = [MagicMock(close=AsyncMock()) for _ in range(3)]
+    connect = AsyncMock(side_effect=connections)
+    with patch.object(session, "engine", MagicMock(connect=connect)):
+        await session.warm_up_pool(3)
+
+    assert connect.call_count == 3
+    for conn in connections:
+        conn.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_tolerates_unreachable_database():
+    healthy = MagicMock(close=AsyncMock())
+    connect = AsyncMock(side_effect=[healthy, ConnectionRefusedError()])
+    with patch.object(session, "engine", MagicMock(connect=connect)):
+        await session.warm_up_pool(2)
+
+    healthy.close.assert_awaited_once()
+
+
+def test_asyncpg_statement_cache_is_configured():
+    args = session._connect_args("postgresql+asyncpg://u:p@localhost/db")
+    assert args == {
+        "prepared_statement_cache_size": session.DATABASE_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": session.DATABASE_STATEMENT_CACHE_SIZE,
+    }
+
+
+def test_other_drivers_get_no_statement_cache_args():
+    assert session._connect_args("sqlite+aiosqlite:///:memory:") == {}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_prepares_statements_without_committing():
+    transaction = MagicMock(rollback=AsyncMock())
+    conn = MagicMock(
+        begin=AsyncMock(return_value=transaction),
+        execute=AsyncMock(side_effect=[None, RuntimeError("no such table")]),
+        close=AsyncMock(),
+    )
+    connect = AsyncMock(return_value=conn)
+    with patch.object(session, "engine", MagicMock(connect=connect)):
+        await session.warm_up_pool(1, statements=["first", "second"])
+
+    assert [c.args[0] for c in conn.execute.await_args_list] == ["first", "second"]
+    assert transaction.rollback.await_count == 2
+    conn.close.assert_awaited_once()
@@ -0,0 +1,95 @@
+import uuid
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.backend.database import settings_crud
+from tests.utils.db_test_utils import executed_sql
+
+USER_ID = uuid.UUID("6f1c5a8e-2b7d-4c1e-9a3f-0d2e4b6c8a10")
+
+
+@pytest.mark.asyncio
+async def test_upsert_returns_the_saved_settings_and_commits(mock_session):
+    session = mock_session({"theme": "dark"})
+
+    result = await settings_crud.upsert_settings_by_user_id(
+        session, USER_ID, {"theme": "dark"}
+    )
+
+    assert result == {"theme": "dark"}
+    session.commit.assert_awaited_once()
+    session.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_upsert_is_a_single_statement(mock_session):
+    session = mock_session({"theme": "dark"})
+
+    await settings_crud.upsert_settings_by_user_id(session, USER_ID, {"theme": "dark"})
+
+    session.execute.assert_awaited_once()
+    sql = executed_sql(session)
+    assert "ON CONFLICT (user_id) DO UPDATE" in sql
+    assert "settings = excluded.settings" in sql
+    assert "RETURNING user_settings.settings" in sql
+
+
+@pytest.mark.asyncio
+async def test_upsert_can_leave_the_commit_to_the_caller(mock_session):
+    session = mock_session({"theme": "dark"})
+    await settings_crud.upsert_settings_by_user_id(
+        session, USER_ID, {"theme": "dark"}, commit=False
+    )
+    session.execute.assert_awaited_once()
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_upsert_binds_user_id(mock_session):
+    session = mock_session({})
+    await settings_crud.upsert_settings_by_user_id(session, USER_ID, {})
+
+    stmt = session.execute.await_args.args[0]
+    params = stmt.compile(dialect=postgresql.dialect()).params
+    assert params["user_id"] == USER_ID
+
+
+@pytest.mark.asyncio
+async def test_reset_overwrites_with_defaults(mock_session):
+    defaults = {"flows": []}
+    session = mock_session(defaults)
+
+    result = await settings_crud.reset_settings_by_user_id(session, USER_ID, defaults)
+
+    assert result == defaults
+    session.execute.assert_awaited_once()
+    assert "ON CONFLICT (user_id) DO UPDATE" in executed_sql(session)
+
+
+@pytest.mark.asyncio
+async def test_get_settings_reads_a_single_row(mock_session):
+    session = mock_session({"theme": "dark"})
+
+    assert await settings_crud.get_settings_by_user_id(session, USER_ID) == {
+        "theme": "dark"
+    }
+    sql = executed_sql(session)
+    assert sql.startswith("SELECT user_settings.settings \nFROM user_settings")
+    assert "LIMIT" in sql
+
+
+@pytest.mark.asyncio
+async def test_get_settings_returns_none_for_unknown_user(mock_session):
+    session = mock_session(None)
+
+    assert await settings_crud.get_settings_by_user_id(session, USER_ID) is None
+
+
+@pytest.mark.asyncio
+async def test_warm_up_statement_matches_settings_lookup(mock_session):
+    session = mock_session(None)
+    await settings_crud.get_settings_by_user_id(session, USER_ID)
+
+    [warm_up] = settings_crud.warm_up_statements()
+    assert str(warm_up.compile(dialect=postgresql.dialect())) == executed_sql(session)
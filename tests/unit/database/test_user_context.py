@@ -0,0 +1,37 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.backend.database import user_context
+
+
+@pytest.mark.asyncio
+async def test_user_session_is_tagged_and_closed(mock_session):
+    session = mock_session()
+    with patch.object(user_context, "async_session_factory", return_value=session):
+        async with user_context.get_user_session("user-1") as s:
+            assert s is session
+            assert user_context.get_user_id_from_session(s) == "user-1"
+
+    session.__aexit__.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_user_session_is_closed_on_error(mock_session):
+    session = mock_session()
+    with patch.object(user_context, "async_session_factory", return_value=session):
+        with pytest.raises(RuntimeError):
+            async with user_context.get_user_session("user-1"):
+                raise RuntimeError("boom")
+
+    session.__aexit__.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_user_session_context_closes_its_session(mock_session):
+    session = mock_session()
+    with patch.object(user_context, "async_session_factory", return_value=session):
+        async with user_context.UserSessionContext("user-1") as s:
+            assert s.info["user_id"] == "user-1"
+
+    session.close.assert_awaited_once()
@@ -0,0 +1,95 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.llms import default_models
+
+CONFIGS = {
+    model_id: {"id": model_id, "name": model_id, "model": model_id}
+    for model_id in default_models.DEFAULT_MODEL_IDS
+}
+
+
+def _rows(ids):
+    """Existing llm_models rows with the given ids"""
+    return [MagicMock(id=model_id) for model_id in ids]
+
+
+def test_get_model_config_by_id_uses_the_index():
+    with patch.object(
+        default_models, "get_configured_model_index", return_value=CONFIGS
+    ):
+        assert default_models.get_model_config_by_id("gemini-2-flash") is (
+            CONFIGS["gemini-2-flash"]
+        )
+        assert default_models.get_model_config_by_id("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_missing_defaults_are_inserted_in_one_statement(mock_session):
+    existing, *missing = default_models.DEFAULT_MODEL_IDS
+    session = mock_session(_rows([existing]), missing)
+
+    with patch.object(
+        default_models, "get_configured_model_index", return_value=CONFIGS
+    ):
+        created = await default_models.initialize_default_models_for_account(
+            "account-1", session
+        )
+
+    assert created == missing
+    assert session.execute.await_count == 2
+    session.commit.assert_awaited_once()
+
+    stmt = session.execute.await_args_list[1].args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO llm_models")
+    assert "ON CONFLICT (id) DO NOTHING" in sql
+    params = stmt.compile(dialect=postgresql.dialect()).params
+    assert params["account_id_m0"] == params["account_id_m1"] == "account-1"
+
+
+@pytest.mark.asyncio
+async def test_ids_taken_by_another_account_are_not_reported(mock_session):
+    session = mock_session([], default_models.DEFAULT_MODEL_IDS[:1])
+
+    with patch.object(
+        default_models, "get_configured_model_index", return_value=CONFIGS
+    ):
+        created = await default_models.initialize_default_models_for_account(
+            "account-1", session
+        )
+
+    assert created == default_models.DEFAULT_MODEL_IDS[:1]
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_written_when_all_defaults_exist(mock_session):
+    session = mock_session(_rows(default_models.DEFAULT_MODEL_IDS))
+
+    with patch.object(
+        default_models, "get_configured_model_index", return_value=CONFIGS
+    ):
+        created = await default_models.initialize_default_models_for_account(
+            "account-1", session
+        )
+
+    assert created == []
+    session.execute.assert_awaited_once()
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_insert_can_leave_the_commit_to_the_caller(mock_session):
+    session = mock_session([], default_models.DEFAULT_MODEL_IDS)
+
+    with patch.object(
+        default_models, "get_configured_model_index", return_value=CONFIGS
+    ):
+        await default_models.initialize_default_models_for_account(
+            "account-1", session, commit=False
+        )
+
+    assert session.execute.await_count == 2
+    session.commit.assert_not_awaited()
@@ -68,3 +68,72 @@ def test_get_llm_by_type_caches(monkeypatch, dummy_conf):
     inst2 = llm.get_llm_by_type("basic")
     assert inst1 is inst2
     assert called["called"]
+
+
+def test_models_are_resolved_once_per_config(monkeypatch, dummy_conf):
+    monkeypatch.setattr(llm, "load_yaml_config", lambda path: dummy_conf)
+    calls = []
+    real_get_models = llm._get_models_for_type
+
+    def counting_get_models(llm_type, conf):
+        calls.append(llm_type)
+        return real_get_models(llm_type, conf)
+
+    monkeypatch.setattr(llm, "_get_models_for_type", counting_get_models)
+    llm.clear_llm_cache()
+
+    models = llm.get_configured_llm_models()
+    assert llm.get_configured_llm_models() is models
+    assert sorted(calls) == ["basic", "reasoning", "vision"]
+
+    llm.clear_llm_cache()
+    llm.get_available_models_for_type("basic")
+    assert calls.count("basic") == 2
+
+
+def test_model_index_maps_ids_to_metadata(monkeypatch):
+    conf = {
+        "BASIC_MODELS": [{"id": "m1", "name": "M1", "model": "m1"}],
+        "REASONING_MODELS": [
+            {"id": "m1", "name": "Reasoning M1", "model": "m1"},
+            {"id": "m2", "name": "M2", "model": "m2"},
+        ],
+    }
+    monkeypatch.setattr(llm, "load_yaml_config", lambda path: conf)
+    llm.clear_llm_cache()
+
+    index = llm.get_configured_model_index()
+    assert set(index) == {"m1", "m2"}
+    assert index["m1"]["name"] == "M1"
+    assert llm.get_configured_model_index() is index
+
+    llm.clear_llm_cache()
+    assert llm.get_configured_model_index() is not index
+
+
+def test_llm_cache_key_ignores_parameter_order_and_unused_keys():
+    key = llm._model_parameters_key({"top_p": 0.9, "temperature": 0.2, "x": {}})
+    assert key == llm._model_parameters_key({"temperature": 0.2, "top_p": 0.9})
+    assert key != llm._model_parameters_key({"temperature": 0.3, "top_p": 0.9})
+    assert llm._model_parameters_key(None) == llm._model_parameters_key({}) == ()
+
+
+def test_unverified_models_share_http_clients():
+    info = llm.ModelInfo({"id": "m", "model": "m", "verify_ssl": False})
+    first = llm._create_llm_from_model_info(info, "basic")
+    second = llm._create_llm_from_model_info(info, "basic", {"temperature": 0.1})
+    assert first.kwargs["http_client"] is second.kwargs["http_client"]
+    assert first.kwargs["http_async_client"] is second.kwargs["http_async_client"]
+
+
+def test_model_parameters_are_converted_and_none_skipped():
+    info = llm.ModelInfo({"id": "m", "model": "m"})
+    result = llm._create_llm_from_model_info(
+        info,
+        "basic",
+        {"temperature": "0.5", "max_tokens": "256", "top_p": None, "other": 1},
+    )
+    assert result.kwargs["temperature"] == 0.5
+    assert result.kwargs["max_tokens"] == 256
+    assert "top_p" not in result.kwargs
+    assert "other" not in result.kwargs
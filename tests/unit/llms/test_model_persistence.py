@@ -0,0 +1,80 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.llms.model_info import ModelInfo
+from tests.utils.db_test_utils import executed_sql
+
+MODEL_DATA = {
+    "id": "gpt-4o",
+    "name": "GPT-4o",
+    "model": "gpt-4o",
+    "account_id": "account-1",
+    "api_key": "not-a-column",
+}
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_returns_and_commits_the_new_row(mock_session):
+    created = MagicMock()
+    session = mock_session(created)
+
+    assert await ModelInfo.get_or_create(session, MODEL_DATA) is created
+
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_can_leave_the_commit_to_the_caller(mock_session):
+    created = MagicMock()
+    session = mock_session(created)
+
+    assert await ModelInfo.get_or_create(session, MODEL_DATA, commit=False) is created
+
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_inserts_in_one_statement(mock_session):
+    session = mock_session(MagicMock())
+
+    await ModelInfo.get_or_create(session, MODEL_DATA)
+
+    session.execute.assert_awaited_once()
+    sql = executed_sql(session)
+    assert "ON CONFLICT (id) DO NOTHING RETURNING" in sql
+    assert "api_key" not in sql
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_falls_back_to_existing_row(mock_session):
+    existing = MagicMock()
+    session = mock_session(None)
+
+    with patch.object(
+        ModelInfo, "get_by_id", AsyncMock(return_value=existing)
+    ) as get_by_id:
+        assert await ModelInfo.get_or_create(session, MODEL_DATA) is existing
+
+    get_by_id.assert_awaited_once_with(session, "gpt-4o")
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_requires_an_id(mock_session):
+    with pytest.raises(ValueError):
+        await ModelInfo.get_or_create(mock_session(), {"name": "x"})
+
+
+@pytest.mark.asyncio
+async def test_get_for_account_as_json_selects_from_the_mapped_table(mock_session):
+    session = mock_session('{"models" : []}')
+
+    assert await ModelInfo.get_for_account_as_json(session, "account-1") == (
+        '{"models" : []}'
+    )
+
+    sql = executed_sql(session)
+    assert f"FROM {ModelInfo.__tablename__}" in sql
+    for column in ModelInfo.__table__.columns.keys():
+        assert f"{ModelInfo.__tablename__}.{column}" in sql
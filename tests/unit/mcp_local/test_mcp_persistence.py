@@ -0,0 +1,303 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.mcp_local.client import MCPConnection
+from tests.utils.db_test_utils import executed_sql
+
+
+@pytest.mark.asyncio
+async def test_update_returns_and_commits_the_updated_row(mock_session):
+    updated = MagicMock()
+    session = mock_session(updated)
+
+    assert await MCPConnection.update(session, "conn-1", {"name": "x"}) is updated
+
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_update_is_a_single_returning_statement(mock_session):
+    session = mock_session(MagicMock())
+
+    await MCPConnection.update(
+        session, "conn-1", {"name": "Renamed", "not_a_column": 1}
+    )
+
+    session.execute.assert_awaited_once()
+    sql = executed_sql(session)
+    assert sql.startswith("UPDATE mcp_connections SET name=")
+    assert "updated_at=" in sql
+    assert "not_a_column" not in sql
+    assert "RETURNING" in sql
+
+
+@pytest.mark.asyncio
+async def test_update_missing_connection_returns_none(mock_session):
+    assert (
+        await MCPConnection.update(mock_session(None), "missing", {"name": "x"}) is None
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("returned, expected", [("conn-1", True), (None, False)])
+async def test_delete_reports_whether_a_row_was_removed(
+    mock_session, returned, expected
+):
+    session = mock_session(returned)
+
+    assert await MCPConnection.delete(session, "conn-1") is expected
+
+    session.commit.assert_awaited_once()
+    session.execute.assert_awaited_once()
+    assert executed_sql(session).startswith("DELETE FROM mcp_connections WHERE")
+    assert "RETURNING mcp_connections.id" in executed_sql(session)
+
+
+def _on_driver(session, driver="asyncpg"):
+    """Bind a mock session to a connection using the given DBAPI driver"""
+    session.get_bind = MagicMock(
+        return_value=MagicMock(dialect=MagicMock(driver=driver))
+    )
+    return session
+
+
+@pytest.mark.asyncio
+async def test_create_many_inserts_all_rows_in_one_statement(mock_session):
+    created = [MagicMock(), MagicMock()]
+    session = _on_driver(mock_session(created))
+
+    result = await MCPConnection.create_many(
+        session,
+        [
+            {"qualified_name": "a", "name": "A", "account_id": "acct", "x": 1},
+            {"qualified_name": "b", "name": "B", "account_id": "acct"},
+        ],
+    )
+
+    assert result == created
+    session.execute.assert_awaited_once()
+    stmt, rows = session.execute.await_args.args
+    assert "RETURNING" in str(stmt.compile(dialect=postgresql.dialect()))
+    assert [r["qualified_name"] for r in rows] == ["a", "b"]
+    # Left to the column server defaults
+    assert all(r.keys().isdisjoint({"id", "created_at", "updated_at"}) for r in rows)
+    assert all("x" not in r for r in rows)
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_many_uses_copy_for_large_batches(monkeypatch, mock_session):
+    monkeypatch.setattr("src.mcp_local.client.MCP_COPY_THRESHOLD", 2)
+    session = _on_driver(mock_session([]))
+    driver_connection = MagicMock(copy_records_to_table=AsyncMock())
+    connection = MagicMock(
+        get_raw_connection=AsyncMock(
+            return_value=MagicMock(driver_connection=driver_connection)
+        )
+    )
+    session.connection = AsyncMock(return_value=connection)
+    data = [
+        {"qualified_name": n, "name": n, "account_id": "acct", "config": {"k": n}}
+        for n in ("a", "b")
+    ]
+
+    result = await MCPConnection.create_many(session, data)
+
+    session.execute.assert_not_awaited()
+    copy = driver_connection.copy_records_to_table
+    copy.assert_awaited_once()
+    assert copy.await_args.args == ("mcp_connections",)
+    columns = copy.await_args.kwargs["columns"]
+    record = dict(zip(columns, copy.await_args.kwargs["records"][0]))
+    assert record["config"] == '{"k": "a"}'
+    assert record["id"] is not None
+    assert record["created_at"].tzinfo is not None
+    assert [c.qualified_name for c in result] == ["a", "b"]
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_many_only_copies_on_asyncpg(monkeypatch, mock_session):
+    monkeypatch.setattr("src.mcp_local.client.MCP_COPY_THRESHOLD", 1)
+    session = _on_driver(mock_session([]), driver="aiosqlite")
+
+    await MCPConnection.create_many(
+        session, [{"qualified_name": "a", "name": "A", "account_id": "acct"}]
+    )
+
+    session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_many_with_no_rows_is_a_no_op(mock_session):
+    session = _on_driver(mock_session([]))
+    assert await MCPConnection.create_many(session, []) == []
+    session.execute.assert_not_awaited()
+
+
+def test_account_and_qualified_name_are_indexed_together():
+    indexes = {
+        i.name: [c.name for c in i.columns] for i in MCPConnection.__table__.indexes
+    }
+    assert indexes["ix_mcp_conn_acct_qn"] == ["account_id", "qualified_name"]
+
+
+@pytest.mark.asyncio
+async def test_get_by_qualified_name_filters_in_the_database(mock_session):
+    found = MagicMock()
+    session = mock_session(found)
+
+    assert await MCPConnection.get_by_qualified_name(session, "acct", "a.b") is found
+
+    sql = executed_sql(session)
+    assert "mcp_connections.account_id = " in sql
+    assert "mcp_connections.qualified_name = " in sql
+
+
+@pytest.mark.asyncio
+async def test_get_all_is_paged_in_a_stable_order(mock_session):
+    session = mock_session([MagicMock()])
+
+    await MCPConnection.get_all(session, limit=50, offset=100)
+
+    stmt = session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ORDER BY mcp_connections.created_at, mcp_connections.id" in sql
+    assert stmt._limit == 50
+    assert stmt._offset == 100
+
+
+@pytest.mark.asyncio
+async def test_iter_all_streams_in_chunks():
+    rows = [MagicMock(), MagicMock()]
+
+    async def stream():
+        for row in rows:
+            yield row
+
+    session = MagicMock(stream_scalars=AsyncMock(return_value=stream()))
+
+    assert [c async for c in MCPConnection.iter_all(session, chunk_size=10)] == rows
+    stmt = session.stream_scalars.await_args.args[0]
+    assert stmt.get_execution_options()["yield_per"] == 10
+
+
+def test_column_names_are_computed_once():
+    assert MCPConnection._column_names() is MCPConnection._column_names()
+    assert "qualified_name" in MCPConnection._column_names()
+    assert "to_dict" not in MCPConnection._column_names()
+
+
+def test_id_is_generated_by_the_database():
+    assert MCPConnection().id is None
+    default = MCPConnection.__table__.c.id.server_default
+    assert default.arg.text == "gen_random_uuid()"
+
+
+def test_to_dict_formats_the_id_once():
+    connection = MCPConnection(id=uuid.uuid4())
+    assert connection.to_dict()["id"] == str(connection.id)
+    assert connection._id_str == str(connection.id)
+
+
+STDIO_CONFIG = {
+    "transport": "stdio",
+    "command": "python",
+    "args": ["-m", "mcp"],
+    "env": {"KEY": "value"},
+    "url": "ignored for stdio",
+}
+
+
+def test_metadata_request_is_prebuilt_from_config():
+    connection = MCPConnection(config=STDIO_CONFIG)
+    assert connection.metadata_request == {
+        "transport": "stdio",
+        "command": "python",
+        "args": ["-m", "mcp"],
+        "env": {"KEY": "value"},
+        "timeout_seconds": None,
+    }
+
+    request = connection.to_metadata_request()
+    assert request.command == "python"
+    assert request.url is None
+
+
+def test_invalid_config_fails_at_write_time():
+    with pytest.raises(ValueError):
+        MCPConnection(config={"transport": "stdio", "args": "not-a-list"})
+
+
+@pytest.mark.parametrize(
+    "config, message",
+    [(None, "config is missing"), ({"command": "x"}, "transport is missing")],
+)
+def test_config_without_transport_fails_on_use(config, message):
+    connection = MCPConnection(config=config)
+    assert connection.metadata_request is None
+    with pytest.raises(ValueError, match=message):
+        connection.to_metadata_request()
+
+
+@pytest.mark.asyncio
+async def test_update_rebuilds_metadata_request_with_config(mock_session):
+    session = mock_session(MagicMock())
+
+    await MCPConnection.update(
+        session, "conn-1", {"config": {"transport": "sse", "url": "http://x"}}
+    )
+
+    params = session.execute.await_args.args[0].compile().params
+    assert params["metadata_request"]["url"] == "http://x"
+
+
+def test_dump_json_matches_to_dict_fields():
+    now = datetime.now(timezone.utc)
+    connection = MCPConnection(
+        id=uuid.uuid4(),
+        qualified_name="a.b",
+        name="A",
+        config={"transport": "sse", "url": "http://x"},
+        enabled_tools=["search"],
+        account_id="acct",
+        created_at=now,
+        updated_at=now,
+    )
+
+    [dumped] = json.loads(MCPConnection.dump_json([connection]))
+    expected = connection.to_dict()
+
+    assert dumped.keys() == expected.keys()
+    assert dumped["id"] == expected["id"]
+    assert datetime.fromisoformat(dumped["created_at"]) == now
+    assert dumped["config"] == expected["config"]
+    assert json.loads(connection.to_json_bytes()) == dumped
+    assert dumped["created_at"].endswith("Z")
+
+
+def test_timestamps_are_set_by_the_database():
+    connection = MCPConnection(qualified_name="a", name="A")
+    assert connection.created_at is None
+    assert connection.to_dict()["created_at"] is None
+    assert str(MCPConnection.__table__.c.updated_at.onupdate.arg) == "now()"
+
+
+@pytest.mark.asyncio
+async def test_get_with_tool_uses_jsonb_containment(mock_session):
+    session = mock_session([MagicMock()])
+
+    assert len(await MCPConnection.get_with_tool(session, "acct", "search")) == 1
+
+    assert "mcp_connections.enabled_tools @> " in executed_sql(session)
+    index = next(
+        i
+        for i in MCPConnection.__table__.indexes
+        if i.name == "ix_mcp_enabled_tools_gin"
+    )
+    assert index.dialect_options["postgresql"]["using"] == "gin"
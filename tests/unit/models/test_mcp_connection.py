@@ -4,6 +4,7 @@ Tests for the MCPConnection SQLAlchemy model
 
 import uuid
 import pytest
+import pytest_asyncio
 from datetime import datetime
 
 from tests.utils.db_test_utils import TestMCPConnection as MCPConnection
@@ -12,24 +13,35 @@ from src.server.mcp_request import MCPServerMetadataRequest
 pytestmark = pytest.mark.asyncio
 
 
+@pytest_asyncio.fixture
+async def existing_connection(db_session):
+    """A stdio connection shared by the read/update/delete tests"""
+    connection_data = {
+        "id": str(uuid.uuid4()),
+        "qualified_name": "test.connection",
+        "name": "Test Connection",
+        "config": {"transport": "stdio"},
+    }
+    return await MCPConnection.create(db_session, connection_data)
+
+
 async def test_mcp_connection_create(db_session):
     """Test creating an MCP connection"""
-    async for session in db_session():
-        # Arrange
-        connection_data = {
-            "qualified_name": "test.connection",
-            "name": "Test Connection",
-            "config": {
-                "transport": "stdio",
-                "command": "python",
-                "args": ["-m", "mcp"],
-                "env": {"TEST_ENV": "test_value"},
-            },
-            "enabled_tools": ["tool1", "tool2"],
-        }
-
-        # Act
-        connection = await MCPConnection.create(session, connection_data)
+    # Arrange
+    connection_data = {
+        "qualified_name": "test.connection",
+        "name": "Test Connection",
+        "config": {
+            "transport": "stdio",
+            "command": "python",
+            "args": ["-m", "mcp"],
+            "env": {"TEST_ENV": "test_value"},
+        },
+        "enabled_tools": ["tool1", "tool2"],
+    }
+
+    # Act
+    connection = await MCPConnection.create(db_session, connection_data)
 
     # Assert
     assert connection.id is not None
@@ -40,17 +52,10 @@ async def test_mcp_connection_create(db_session):
     assert connection.updated_at is not None
 
 
-async def test_mcp_connection_get_by_id(db_session):
+async def test_mcp_connection_get_by_id(db_session, existing_connection):
     """Test getting an MCP connection by ID"""
     # Arrange
-    connection_id = str(uuid.uuid4())
-    connection_data = {
-        "id": connection_id,
-        "qualified_name": "test.connection",
-        "name": "Test Connection",
-        "config": {"transport": "stdio"},
-    }
-    await MCPConnection.create(db_session, connection_data)
+    connection_id = existing_connection.id
 
     # Act
     connection = await MCPConnection.get_by_id(db_session, connection_id)
@@ -61,17 +66,10 @@ async def test_mcp_connection_get_by_id(db_session):
     assert connection.qualified_name == "test.connection"
 
 
-async def test_mcp_connection_update(db_session):
+async def test_mcp_connection_update(db_session, existing_connection):
     """Test updating an MCP connection"""
     # Arrange
-    connection_id = str(uuid.uuid4())
-    connection_data = {
-        "id": connection_id,
-        "qualified_name": "test.connection",
-        "name": "Test Connection",
-        "config": {"transport": "stdio"},
-    }
-    await MCPConnection.create(db_session, connection_data)
+    connection_id = existing_connection.id
 
     # Act
     update_data = {"name": "Updated Connection"}
@@ -83,17 +81,10 @@ async def test_mcp_connection_update(db_session):
     assert connection.qualified_name == "test.connection"
 
 
-async def test_mcp_connection_delete(db_session):
+async def test_mcp_connection_delete(db_session, existing_connection):
     """Test deleting an MCP connection"""
     # Arrange
-    connection_id = str(uuid.uuid4())
-    connection_data = {
-        "id": connection_id,
-        "qualified_name": "test.connection",
-        "name": "Test Connection",
-        "config": {"transport": "stdio"},
-    }
-    await MCPConnection.create(db_session, connection_data)
+    connection_id = existing_connection.id
 
     # Act
     result = await MCPConnection.delete(db_session, connection_id)
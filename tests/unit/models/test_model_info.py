@@ -3,13 +3,29 @@ Tests for the ModelInfo SQLAlchemy model
 """
 
 import pytest
+import pytest_asyncio
 from datetime import datetime
 
+from sqlalchemy import insert
+
+from tests.utils.db_test_utils import mock_auth_users
 from tests.utils.db_test_utils import TestModelInfo as ModelInfo
 
 pytestmark = pytest.mark.asyncio
 
 
+@pytest_asyncio.fixture
+async def existing_model(db_session):
+    """The gpt-4 model shared by the read/update/delete tests"""
+    model_data = {
+        "id": "gpt-4",
+        "name": "GPT-4",
+        "model": "gpt-4",
+        "provider": "openai",
+    }
+    return await ModelInfo.create(db_session, model_data)
+
+
 async def test_model_info_create(db_session):
     """Test creating a model info"""
     # Arrange
@@ -35,12 +51,8 @@ async def test_model_info_create(db_session):
     assert model_info.created_at is not None
 
 
-async def test_model_info_get_by_id(db_session):
+async def test_model_info_get_by_id(db_session, existing_model):
     """Test getting a model info by ID"""
-    # Arrange
-    model_data = {"id": "gpt-4", "name": "GPT-4", "model": "gpt-4"}
-    await ModelInfo.create(db_session, model_data)
-
     # Act
     model_info = await ModelInfo.get_by_id(db_session, "gpt-4")
 
@@ -50,17 +62,8 @@ async def test_model_info_get_by_id(db_session):
     assert model_info.name == "GPT-4"
 
 
-async def test_model_info_update(db_session):
+async def test_model_info_update(db_session, existing_model):
     """Test updating a model info"""
-    # Arrange
-    model_data = {
-        "id": "gpt-4",
-        "name": "GPT-4",
-        "model": "gpt-4",
-        "provider": "openai",
-    }
-    await ModelInfo.create(db_session, model_data)
-
     # Act
     update_data = {"context_window": 16384}
     model_info = await ModelInfo.update(db_session, "gpt-4", update_data)
@@ -71,12 +74,8 @@ async def test_model_info_update(db_session):
     assert model_info.provider == "openai"
 
 
-async def test_model_info_delete(db_session):
+async def test_model_info_delete(db_session, existing_model):
     """Test deleting a model info"""
-    # Arrange
-    model_data = {"id": "gpt-4", "name": "GPT-4", "model": "gpt-4"}
-    await ModelInfo.create(db_session, model_data)
-
     # Act
     result = await ModelInfo.delete(db_session, "gpt-4")
 
@@ -86,13 +85,10 @@ async def test_model_info_delete(db_session):
     assert model_info is None
 
 
-async def test_model_info_get_or_create_existing(db_session):
+async def test_model_info_get_or_create_existing(db_session, existing_model):
     """Test getting an existing model info"""
-    # Arrange
-    model_data = {"id": "gpt-4", "name": "GPT-4", "model": "gpt-4"}
-    await ModelInfo.create(db_session, model_data)
-
     # Act
+    model_data = {"id": "gpt-4", "name": "GPT-4", "model": "gpt-4"}
     model_info = await ModelInfo.get_or_create(db_session, model_data)
 
     # Assert
@@ -117,3 +113,21 @@ async def test_model_info_get_or_create_new(db_session):
     # Verify it was actually created in the database
     model_info_db = await ModelInfo.get_by_id(db_session, "gpt-5")
     assert model_info_db is not None
+
+
+async def test_model_info_create_many(db_session):
+    """Test inserting several model infos at once"""
+    # Arrange
+    await db_session.execute(insert(mock_auth_users).values(id="user-1"))
+    rows = [
+        {"id": f"model-{i}", "name": f"Model {i}", "model": "m", "account_id": "user-1"}
+        for i in range(3)
+    ]
+
+    # Act
+    await ModelInfo.create_many(db_session, rows)
+
+    # Assert
+    models = await ModelInfo.get_for_account(db_session, "user-1")
+    assert sorted(model.id for model in models) == ["model-0", "model-1", "model-2"]
+    assert all(model.created_at is not None for model in models)
@@ -1,16 +1,22 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
 import base64
 import json
 import os
-from unittest.mock import AsyncMock, MagicMock, patch, mock_open
-from uuid import uuid4
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID, uuid4
 from fastapi.responses import JSONResponse, StreamingResponse
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import HTTPException, logger
-from src.server.app import app, _make_event, _astream_workflow_generator
+from src.server.app import (
+    app,
+    _make_event,
+    _astream_workflow_generator,
+    _batch_events,
+)
 from src.server.mcp_request import MCPServerMetadataRequest
 from src.server.rag_request import RAGResourceRequest
 from src.config.report_style import ReportStyle
@@ -39,27 +45,64 @@ class TestMakeEvent:
         data = {"content": "Hello", "role": "assistant"}
         result = _make_event(event_type, data)
         expected = (
-            'event: message_chunk\ndata: {"content": "Hello", "role": "assistant"}\n\n'
+            b'event: message_chunk\ndata: {"content":"Hello","role":"assistant"}\n\n'
         )
         assert result == expected
 
-    def test_make_event_with_empty_content(self):
-        event_type = "message_chunk"
-        data = {"content": "", "role": "assistant"}
-        result = _make_event(event_type, data)
-        expected = 'event: message_chunk\ndata: {"role": "assistant"}\n\n'
-        assert result == expected
+    def test_make_event_keeps_non_ascii_text(self):
+        result = _make_event("message_chunk", {"content": "你好"})
+        assert result.decode() == 'event: message_chunk\ndata: {"content":"你好"}\n\n'
 
     def test_make_event_without_content(self):
         event_type = "tool_calls"
         data = {"role": "assistant", "tool_calls": []}
         result = _make_event(event_type, data)
-        expected = (
-            'event: tool_calls\ndata: {"role": "assistant", "tool_calls": []}\n\n'
-        )
+        expected = b'event: tool_calls\ndata: {"role":"assistant","tool_calls":[]}\n\n'
         assert result == expected
 
 
+async def _events(*items, delay=0):
+    for item in items:
+        if isinstance(item, Exception):
+            raise item
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+class TestBatchEvents:
+    @pytest.mark.asyncio
+    async def test_events_produced_together_share_one_write(self):
+        chunks = [c async for c in _batch_events(_events(b"a\n\n", b"b\n\n"))]
+        assert chunks == [b"a\n\nb\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_finishing_event_is_sent_immediately(self):
+        finish = _make_event("message_chunk", {"finish_reason": "stop"})
+        chunks = [c async for c in _batch_events(_events(finish, b"b\n\n"))]
+        assert chunks == [finish, b"b\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_slow_events_are_not_held_back(self):
+        events = _events(b"a\n\n", b"b\n\n", delay=0.05)
+        chunks = [c async for c in _batch_events(events)]
+        assert chunks == [b"a\n\n", b"b\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_batches_are_capped_in_size(self):
+        event = b"x" * 5000
+        chunks = [c async for c in _batch_events(_events(event, event, event))]
+        assert chunks == [event * 2, event]
+
+    @pytest.mark.asyncio
+    async def test_workflow_error_is_raised_after_pending_events(self):
+        chunks = []
+        with pytest.raises(ValueError):
+            async for chunk in _batch_events(_events(b"a\n\n", ValueError())):
+                chunks.append(chunk)
+        assert chunks == [b"a\n\n"]
+
+
 class TestTTSEndpoint:
     @patch.dict(
         os.environ,
@@ -188,16 +231,29 @@ class TestPodcastEndpoint:
         assert response.status_code == 500
         assert response.json()["detail"] == "Internal Server Error"
 
+    def test_podcast_graph_is_compiled_once(self, client):
+        mock_workflow = MagicMock()
+        mock_workflow.invoke.return_value = {"output": b"fake_audio_data"}
+        with patch("src.server.app.build_podcast_graph") as mock_build_graph:
+            mock_build_graph.return_value = mock_workflow
+            for _ in range(2):
+                response = client.post(
+                    "/api/podcast/generate", json={"content": "Test content"}
+                )
+                assert response.status_code == 200
+
+        mock_build_graph.assert_called_once()
+        assert mock_workflow.invoke.call_count == 2
+
 
 class TestPPTEndpoint:
     @patch("src.server.app.build_ppt_graph")
-    @patch("builtins.open", new_callable=mock_open, read_data=b"fake_ppt_data")
-    def test_generate_ppt_success(self, mock_file, mock_build_graph, client):
+    def test_generate_ppt_success(self, mock_build_graph, client, tmp_path):
+        generated_file = tmp_path / "test.pptx"
+        generated_file.write_bytes(b"fake_ppt_data")
         mock_workflow = MagicMock()
         mock_build_graph.return_value = mock_workflow
-        mock_workflow.invoke.return_value = {
-            "generated_file_path": "/fake/path/test.pptx"
-        }
+        mock_workflow.invoke.return_value = {"generated_file_path": str(generated_file)}
 
         request_data = {"content": "Test content for PPT"}
 
@@ -209,6 +265,7 @@ class TestPPTEndpoint:
             in response.headers["content-type"]
         )
         assert response.content == b"fake_ppt_data"
+        assert not generated_file.exists()
 
     @patch("src.server.app.build_ppt_graph")
     def test_generate_ppt_error(self, mock_build_graph, client):
@@ -260,6 +317,17 @@ class TestEnhancePromptEndpoint:
             response = client.post("/api/prompt/enhance", json=request_data)
             assert response.status_code == 200
 
+        sent_styles = [
+            call.args[0]["report_style"] for call in mock_workflow.invoke.call_args_list
+        ]
+        assert sent_styles == [
+            ReportStyle.ACADEMIC,
+            ReportStyle.POPULAR_SCIENCE,
+            ReportStyle.NEWS,
+            ReportStyle.SOCIAL_MEDIA,
+            ReportStyle.ACADEMIC,
+        ]
+
     @patch("src.server.app.build_prompt_enhancer_graph")
     def test_enhance_prompt_error(self, mock_build_graph, client):
         mock_build_graph.side_effect = Exception("Enhancement failed")
@@ -363,6 +431,73 @@ class TestRAGEndpoints:
         assert response.json()["resources"] == []
 
 
+class TestConfigEndpoint:
+    @pytest.fixture(autouse=True)
+    def reset_config_cache(self):
+        with patch("src.server.app._config_response_cache", None):
+            yield
+
+    @patch("src.server.app.get_configured_llm_models")
+    def test_large_config_is_gzipped(self, mock_models, client):
+        mock_models.return_value = {
+            "basic": [
+                {"id": f"m{i}", "name": f"M{i}", "model": f"m{i}", "provider": "p"}
+                for i in range(50)
+            ]
+        }
+
+        response = client.get("/api/config", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["models"]["basic"]) == 50
+
+    @patch("src.server.app.get_configured_llm_models")
+    def test_config_hides_model_secrets(self, mock_models, client):
+        mock_models.return_value = {
+            "basic": [
+                {
+                    "id": "m1",
+                    "name": "M1",
+                    "model": "m1",
+                    "provider": "OpenAI",
+                    "api_key": "secret",
+                }
+            ]
+        }
+
+        response = client.get("/api/config")
+
+        assert response.status_code == 200
+        assert response.json()["models"]["basic"] == [
+            {
+                "id": "m1",
+                "name": "M1",
+                "model": "m1",
+                "provider": "OpenAI",
+                "context_window": 4096,
+            }
+        ]
+        assert "secret" not in response.text
+
+    @patch("src.server.app.ConfigResponse")
+    @patch("src.server.app.get_configured_llm_models")
+    def test_config_body_is_rebuilt_only_on_change(
+        self, mock_models, mock_response, client
+    ):
+        mock_response.return_value.model_dump.return_value = {"models": {}}
+        models = {}
+        mock_models.return_value = models
+
+        client.get("/api/config")
+        client.get("/api/config")
+        assert mock_response.call_count == 1
+
+        mock_models.return_value = {}
+        client.get("/api/config")
+        assert mock_response.call_count == 2
+
+
 class TestChatStreamEndpoint:
     @patch("src.server.app.graph")
     def test_chat_stream_with_default_thread_id(self, mock_graph, client):
@@ -391,6 +526,34 @@ class TestChatStreamEndpoint:
         assert response.status_code == 200
         assert response.headers["content-type"] == "text/event-stream; charset=utf-8"
 
+    @patch("src.server.app._astream_workflow_generator")
+    def test_chat_stream_passes_messages_as_dicts(self, mock_generator, client):
+        async def empty_stream():
+            return
+            yield
+
+        mock_generator.return_value = empty_stream()
+        request_data = {
+            "messages": [
+                {"role": "user", "content": "Hello"},
+                {"role": "user", "content": [{"type": "text", "text": "Hi"}]},
+            ],
+            "mcp_settings": None,
+        }
+
+        response = client.post("/api/chat/stream", json=request_data)
+
+        assert response.status_code == 200
+        args = mock_generator.call_args.args
+        assert args[0] == [
+            {"role": "user", "content": "Hello"},
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": "Hi", "image_url": None}],
+            },
+        ]
+        assert args[8] == {}
+
 
 class TestAstreamWorkflowGenerator:
     @pytest.mark.asyncio
@@ -431,13 +594,47 @@ class TestAstreamWorkflowGenerator:
 
         events = []
         async for event in generator:
-            events.append(event)
+            events.append(event.decode())
 
         assert len(events) == 1
         assert "event: message_chunk" in events[0]
         assert "Hello world" in events[0]
         # Check for the actual agent name that appears in the output
-        assert '"agent": "a"' in events[0]
+        assert '"agent":"a"' in events[0]
+
+    @pytest.mark.asyncio
+    @patch("src.server.app.graph")
+    async def test_astream_workflow_generator_omits_empty_content(self, mock_graph):
+        mock_message = AIMessageChunk(content="")
+        mock_message.id = "msg_123"
+
+        async def mock_astream(*args, **kwargs):
+            yield (("agent1:task_1",), "messages", (mock_message, {}))
+
+        mock_graph.astream = mock_astream
+
+        generator = _astream_workflow_generator(
+            messages=[{"role": "user", "content": "Hello"}],
+            thread_id="test_thread",
+            resources=[],
+            max_plan_iterations=3,
+            max_step_num=10,
+            max_search_results=5,
+            auto_accepted_plan=True,
+            interrupt_feedback="",
+            mcp_settings={},
+            enable_background_investigation=False,
+            report_style=ReportStyle.ACADEMIC,
+            enable_deep_thinking=False,
+        )
+
+        events = [event async for event in generator]
+
+        assert events == [
+            b"event: message_chunk\ndata: "
+            b'{"thread_id":"test_thread","agent":"agent1","id":"msg_123",'
+            b'"role":"assistant"}\n\n'
+        ]
 
     @pytest.mark.asyncio
     @patch("src.server.app.graph")
@@ -471,7 +668,7 @@ class TestAstreamWorkflowGenerator:
 
         events = []
         async for event in generator:
-            events.append(event)
+            events.append(event.decode())
 
     @pytest.mark.asyncio
     @patch("src.server.app.graph")
@@ -505,7 +702,7 @@ class TestAstreamWorkflowGenerator:
 
         events = []
         async for event in generator:
-            events.append(event)
+            events.append(event.decode())
 
         assert len(events) == 1
         assert "event: interrupt" in events[0]
@@ -542,7 +739,7 @@ class TestAstreamWorkflowGenerator:
 
         events = []
         async for event in generator:
-            events.append(event)
+            events.append(event.decode())
 
         assert len(events) == 1
         assert "event: tool_call_result" in events[0]
@@ -584,7 +781,7 @@ class TestAstreamWorkflowGenerator:
 
         events = []
         async for event in generator:
-            events.append(event)
+            events.append(event.decode())
 
         assert len(events) == 1
         assert "event: tool_calls" in events[0]
@@ -626,7 +823,7 @@ class TestAstreamWorkflowGenerator:
 
         events = []
         async for event in generator:
-            events.append(event)
+            events.append(event.decode())
 
         assert len(events) == 1
         assert "event: tool_call_chunks" in events[0]
@@ -665,7 +862,7 @@ class TestAstreamWorkflowGenerator:
 
         events = []
         async for event in generator:
-            events.append(event)
+            events.append(event.decode())
 
         assert len(events) == 1
         assert "event: message_chunk" in events[0]
@@ -721,7 +918,7 @@ class TestGenerateProseEndpoint:
 
         # Read the streaming response content
         content = b"".join(response.iter_bytes())
-        assert b"Generated prose 1" in content or b"Generated prose 2" in content
+        assert content == b"data: Generated prose 1\n\ndata: Generated prose 2\n\n"
 
     @patch("src.server.app.build_prose_graph")
     def test_generate_prose_error(self, mock_build_graph, client):
@@ -755,7 +952,7 @@ class TestModelParametersEndpoints:
     def test_list_model_parameters(
         self, mock_get_for_account, mock_get_user_session, mock_verify_token
     ):
-        mock_get_user_session.return_value.__aiter__.return_value = [MagicMock()]
+        mock_get_user_session.return_value.__aenter__.return_value = MagicMock()
         mock_param = MagicMock()
         mock_param.to_dict.return_value = {
             "model_id": self.model_id,
@@ -774,7 +971,7 @@ class TestModelParametersEndpoints:
     def test_get_model_parameters(
         self, mock_get_for_model, mock_get_user_session, mock_verify_token
     ):
-        mock_get_user_session.return_value.__aiter__.return_value = [MagicMock()]
+        mock_get_user_session.return_value.__aenter__.return_value = MagicMock()
         mock_param = MagicMock()
         mock_param.to_dict.return_value = {
             "model_id": self.model_id,
@@ -794,7 +991,7 @@ class TestModelParametersEndpoints:
     def test_upsert_model_parameters(
         self, mock_upsert, mock_get_user_session, mock_verify_token
     ):
-        mock_get_user_session.return_value.__aiter__.return_value = [MagicMock()]
+        mock_get_user_session.return_value.__aenter__.return_value = MagicMock()
         mock_param = MagicMock()
         mock_param.to_dict.return_value = {
             "model_id": self.model_id,
@@ -803,11 +1000,32 @@ class TestModelParametersEndpoints:
         mock_upsert.return_value = mock_param
         response = self.client.post(
             f"/api/model-parameters/{self.model_id}",
-            json=self.default_params,
+            json={**self.default_params, "unknown": 1},
             headers={"Authorization": "Bearer test-token"},
         )
         assert response.status_code == 200
         assert response.json()["model_id"] == self.model_id
+        assert mock_upsert.call_args.args[3] == self.default_params
+
+    @patch("src.backend.auth.middleware.verify_token", return_value="test-user")
+    @patch("src.server.app.get_user_session")
+    @patch("src.llms.model_parameters.ModelParameters.upsert")
+    def test_upsert_model_parameters_validates_types(
+        self, mock_upsert, mock_get_user_session, mock_verify_token
+    ):
+        mock_get_user_session.return_value.__aenter__.return_value = MagicMock()
+        mock_upsert.return_value = MagicMock()
+        mock_upsert.return_value.to_dict.return_value = {"model_id": self.model_id}
+        url = f"/api/model-parameters/{self.model_id}"
+        headers = {"Authorization": "Bearer test-token"}
+
+        response = self.client.post(url, json={"max_tokens": "many"}, headers=headers)
+        assert response.status_code == 422
+        mock_upsert.assert_not_called()
+
+        response = self.client.post(url, json={"temperature": "0.5"}, headers=headers)
+        assert response.status_code == 200
+        assert mock_upsert.call_args.args[3] == {"temperature": 0.5}
 
     @patch("src.backend.auth.middleware.verify_token", return_value="test-user")
     @patch("src.server.app.get_user_session")
@@ -815,7 +1033,7 @@ class TestModelParametersEndpoints:
     def test_delete_model_parameters(
         self, mock_delete_for_model, mock_get_user_session, mock_verify_token
     ):
-        mock_get_user_session.return_value.__aiter__.return_value = [MagicMock()]
+        mock_get_user_session.return_value.__aenter__.return_value = MagicMock()
         mock_delete_for_model.return_value = True
         response = self.client.delete(
             f"/api/model-parameters/{self.model_id}",
@@ -830,7 +1048,7 @@ class TestModelParametersEndpoints:
     def test_delete_model_parameters_not_found(
         self, mock_delete_for_model, mock_get_user_session, mock_verify_token
     ):
-        mock_get_user_session.return_value.__aiter__.return_value = [MagicMock()]
+        mock_get_user_session.return_value.__aenter__.return_value = MagicMock()
         mock_delete_for_model.return_value = False
         response = self.client.delete(
             f"/api/model-parameters/{self.model_id}",
@@ -838,3 +1056,92 @@ class TestModelParametersEndpoints:
         )
         assert response.status_code == 404
         assert response.json()["detail"] == "Model parameters not found"
+
+
+class TestAccountModelsEndpoint:
+    @pytest.fixture(autouse=True)
+    def reset_initialized_accounts(self):
+        with patch("src.server.app._initialized_accounts", set()):
+            yield
+
+    @patch("src.backend.auth.middleware.verify_token", return_value="test-user")
+    @patch("src.server.app.get_user_session")
+    @patch("src.server.app.initialize_default_models_for_account")
+    @patch("src.llms.model_info.ModelInfo.get_for_account_as_json")
+    def test_get_account_models_returns_database_json(
+        self,
+        mock_get_as_json,
+        mock_initialize,
+        mock_get_user_session,
+        mock_verify_token,
+        client,
+    ):
+        session = MagicMock(commit=AsyncMock())
+        mock_get_user_session.return_value.__aenter__.return_value = session
+        mock_get_as_json.return_value = '{"models" : [{"id" : "gpt-4o"}]}'
+        response = client.get(
+            "/api/models", headers={"Authorization": "Bearer test-token"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"models": [{"id": "gpt-4o"}]}
+        mock_initialize.assert_awaited_once_with("test-user", session, commit=False)
+        session.commit.assert_awaited_once()
+
+    @patch("src.backend.auth.middleware.verify_token", return_value="test-user")
+    @patch("src.server.app.get_user_session")
+    @patch("src.server.app.initialize_default_models_for_account")
+    @patch("src.llms.model_info.ModelInfo.get_for_account_as_json")
+    def test_default_models_are_initialized_once_per_account(
+        self,
+        mock_get_as_json,
+        mock_initialize,
+        mock_get_user_session,
+        mock_verify_token,
+        client,
+    ):
+        session = MagicMock(commit=AsyncMock())
+        mock_get_user_session.return_value.__aenter__.return_value = session
+        mock_get_as_json.return_value = '{"models" : []}'
+        headers = {"Authorization": "Bearer test-token"}
+
+        mock_initialize.side_effect = ConnectionError("database down")
+        with pytest.raises(ConnectionError):
+            client.get("/api/models", headers=headers)
+
+        mock_initialize.side_effect = None
+        for _ in range(2):
+            assert client.get("/api/models", headers=headers).status_code == 200
+
+        assert mock_initialize.await_count == 2
+        assert mock_get_as_json.await_count == 2
+
+
+class TestSettingsEndpoints:
+    USER_ID = "6f1c5a8e-2b7d-4c1e-9a3f-0d2e4b6c8a10"
+
+    @patch("src.server.app.get_user_session")
+    @patch("src.server.app.get_settings_by_user_id")
+    def test_get_settings_passes_a_uuid(
+        self, mock_get_settings, mock_get_user_session, client
+    ):
+        mock_get_user_session.return_value.__aenter__.return_value = MagicMock()
+        mock_get_settings.return_value = {"flows": []}
+        with patch(
+            "src.backend.auth.middleware.verify_token", return_value=self.USER_ID
+        ):
+            response = client.get(
+                "/api/settings", headers={"Authorization": "Bearer test-token"}
+            )
+        assert response.status_code == 200
+        assert mock_get_settings.await_args.args[1] == UUID(self.USER_ID)
+        mock_get_user_session.assert_called_once_with(self.USER_ID)
+
+    @patch("src.server.app.get_user_session")
+    def test_non_uuid_user_is_rejected(self, mock_get_user_session, client):
+        with patch("src.backend.auth.middleware.verify_token", return_value="abc"):
+            response = client.get(
+                "/api/settings", headers={"Authorization": "Bearer test-token"}
+            )
+        assert response.status_code == 401
+        mock_get_user_session.assert_not_called()
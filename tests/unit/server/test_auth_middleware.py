@@ -0,0 +1,217 @@
+import base64
+import json
+import time
+
+import jwt
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from supabase import AuthApiError
+
+import src.backend.auth.middleware as middleware
+
+SECRET = "test-secret"
+
+
+@pytest.fixture(autouse=True)
+def reset_token_caches(monkeypatch):
+    monkeypatch.setattr(middleware, "SUPABASE_JWT_SECRET", None)
+    middleware._verified_tokens.clear()
+    middleware._rejected_tokens.clear()
+    yield
+    middleware._verified_tokens.clear()
+    middleware._rejected_tokens.clear()
+
+
+def _token(sub="user-1", exp_in=3600, key=SECRET):
+    return jwt.encode({"sub": sub, "exp": int(time.time()) + exp_in}, key)
+
+
+def _unsigned_token(alg, sub="user-1"):
+    """A token whose header claims an asymmetric algorithm"""
+
+    def encode(data):
+        raw = json.dumps(data).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    payload = {"sub": sub, "exp": int(time.time()) + 3600}
+    return f"{encode({'alg': alg, 'typ': 'JWT'})}.{encode(payload)}.c2ln"
+
+
+def _request(authorization=None):
+    request = MagicMock()
+    request.headers = {} if authorization is None else {"Authorization": authorization}
+    return request
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "header",
+    ["Bearer abc.def", "bearer abc.def", "Bearer  abc.def", "Bearer\tabc.def"],
+)
+async def test_extract_token_accepts_bearer_tokens(header):
+    assert await middleware.extract_token(_request(header)) == "abc.def"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "header",
+    [None, "", "Bearer", "Bearer ", "Basic abc.def", "Bearer abc def", "abc.def"],
+)
+async def test_extract_token_rejects_malformed_headers(header):
+    assert await middleware.extract_token(_request(header)) is None
+
+
+@pytest.mark.asyncio
+async def test_verified_token_is_cached():
+    token = _token()
+    remote = AsyncMock(return_value="user-1")
+    with patch.object(middleware, "_verify_token_remote", remote):
+        assert await middleware.verify_token(token) == "user-1"
+        assert await middleware.verify_token(token) == "user-1"
+    remote.assert_awaited_once_with(token)
+
+
+@pytest.mark.asyncio
+async def test_cache_entry_never_outlives_token_exp():
+    token = _token(exp_in=10)
+    with patch.object(middleware, "_verify_token_remote", AsyncMock(return_value="u")):
+        await middleware.verify_token(token)
+    _, expires_at = middleware._verified_tokens._entries[token]
+    assert expires_at <= time.time() + 10
+
+
+@pytest.mark.asyncio
+async def test_hs256_token_is_verified_locally(monkeypatch):
+    monkeypatch.setattr(middleware, "SUPABASE_JWT_SECRET", SECRET)
+    remote = AsyncMock()
+    with patch.object(middleware, "_verify_token_remote", remote):
+        assert await middleware.verify_token(_token(sub="local")) == "local"
+    remote.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_asymmetric_token_falls_back_to_supabase(monkeypatch):
+    monkeypatch.setattr(middleware, "SUPABASE_JWT_SECRET", SECRET)
+    remote = AsyncMock(return_value="user-1")
+    with patch.object(middleware, "_verify_token_remote", remote):
+        assert await middleware.verify_token(_unsigned_token("ES256")) == "user-1"
+    remote.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bad_signature_is_cached_as_rejected(monkeypatch):
+    monkeypatch.setattr(middleware, "SUPABASE_JWT_SECRET", SECRET)
+    token = _token(key="wrong-secret")
+    with patch.object(middleware.jwt, "decode", wraps=jwt.decode) as decode:
+        assert await middleware.verify_token(token) is None
+        assert await middleware.verify_token(token) is None
+    decode.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error", [AuthApiError("invalid JWT", 403, "bad_jwt"), None], ids=["4xx", "none"]
+)
+async def test_rejected_token_skips_supabase(error):
+    token = _token()
+    remote = AsyncMock(side_effect=error) if error else AsyncMock(return_value=None)
+    with patch.object(middleware, "_verify_token_remote", remote):
+        assert await middleware.verify_token(token) is None
+        assert await middleware.verify_token(token) is None
+    remote.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error",
+    [
+        AuthApiError("upstream error", 500, None),
+        AuthApiError("rate limited", 429, None),
+        ConnectionError("connection reset"),
+        TimeoutError(),
+    ],
+)
+async def test_transient_failures_are_not_cached(error):
+    token = _token()
+    remote = AsyncMock(side_effect=[error, "user-1"])
+    with patch.object(middleware, "_verify_token_remote", remote):
+        assert await middleware.verify_token(token) is None
+        assert await middleware.verify_token(token) == "user-1"
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = middleware.TokenCache(max_size=2)
+    expires_at = time.time() + 60
+    cache.set("a", "user-a", expires_at)
+    cache.set("b", "user-b", expires_at)
+    assert cache.get("a") == (True, "user-a")
+
+    cache.set("c", "user-c", expires_at)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, "user-a")
+    assert cache.get("c") == (True, "user-c")
+
+
+def test_token_cache_drops_expired_entries():
+    cache = middleware.TokenCache(max_size=2)
+    cache.set("a", "user-a", time.time() - 1)
+    assert cache.get("a") == (False, None)
+    assert "a" not in cache._entries
+
+
+async def _call_middleware(scope):
+    """Run AuthMiddleware on a scope and return the scope the app received"""
+    received = []
+
+    async def app(scope, receive, send):
+        received.append(scope)
+
+    await middleware.AuthMiddleware(app)(scope, AsyncMock(), AsyncMock())
+    assert len(received) == 1
+    return received[0]
+
+
+@pytest.mark.asyncio
+async def test_middleware_attaches_user_id_to_scope_state():
+    scope = {"type": "http", "headers": [(b"authorization", b"Bearer abc.def")]}
+    verify = AsyncMock(return_value="user-1")
+    with patch.object(middleware, "verify_token", verify):
+        forwarded = await _call_middleware(scope)
+    verify.assert_awaited_once_with("abc.def")
+    assert forwarded["state"]["user_id"] == "user-1"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "scope",
+    [
+        {"type": "http", "headers": []},
+        {"type": "http", "headers": [(b"authorization", b"Basic abc")]},
+        {"type": "lifespan"},
+    ],
+    ids=["no-header", "not-bearer", "lifespan"],
+)
+async def test_middleware_passes_through_without_token(scope):
+    verify = AsyncMock()
+    with patch.object(middleware, "verify_token", verify):
+        forwarded = await _call_middleware(scope)
+    verify.assert_not_awaited()
+    assert "user_id" not in forwarded.get("state", {})
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_leaves_request_anonymous():
+    scope = {"type": "http", "headers": [(b"authorization", b"Bearer abc.def")]}
+    with patch.object(middleware, "verify_token", AsyncMock(return_value=None)):
+        forwarded = await _call_middleware(scope)
+    assert "user_id" not in forwarded.get("state", {})
+
+
+def test_user_id_is_read_from_scope_state():
+    request = MagicMock()
+    request.scope = {"type": "http", "state": {"user_id": "user-1"}}
+    assert middleware.get_user_id_from_request(request) == "user-1"
+
+    request.scope = {"type": "http"}
+    assert middleware.get_user_id_from_request(request) is None
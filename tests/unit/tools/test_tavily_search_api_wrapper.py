@@ -4,10 +4,14 @@ import json
 import pytest
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
 import aiohttp
-import requests
+import httpx
 from pydantic import SecretStr
 from src.tools.tavily_search.tavily_search_api_wrapper import (
+    TAVILY_TIMEOUT_SECONDS,
     EnhancedTavilySearchAPIWrapper,
+    _get_http_client,
+    close_session,
+    get_session,
 )
 
 
@@ -44,10 +48,11 @@ class TestEnhancedTavilySearchAPIWrapper:
             ],
         }
 
-    @patch("src.tools.tavily_search.tavily_search_api_wrapper.requests.post")
-    def test_raw_results_success(self, mock_post, wrapper, mock_response_data):
+    @patch("src.tools.tavily_search.tavily_search_api_wrapper._get_http_client")
+    def test_raw_results_success(self, mock_client, wrapper, mock_response_data):
+        mock_post = mock_client.return_value.post
         mock_response = Mock()
-        mock_response.json.return_value = mock_response_data
+        mock_response.content = json.dumps(mock_response_data).encode()
         mock_response.raise_for_status.return_value = None
         mock_post.return_value = mock_response
 
@@ -60,12 +65,13 @@ class TestEnhancedTavilySearchAPIWrapper:
         assert call_args.kwargs["json"]["query"] == "test query"
         assert call_args.kwargs["json"]["max_results"] == 10
 
-    @patch("src.tools.tavily_search.tavily_search_api_wrapper.requests.post")
+    @patch("src.tools.tavily_search.tavily_search_api_wrapper._get_http_client")
     def test_raw_results_with_all_parameters(
-        self, mock_post, wrapper, mock_response_data
+        self, mock_client, wrapper, mock_response_data
     ):
+        mock_post = mock_client.return_value.post
         mock_response = Mock()
-        mock_response.json.return_value = mock_response_data
+        mock_response.content = json.dumps(mock_response_data).encode()
         mock_response.raise_for_status.return_value = None
         mock_post.return_value = mock_response
 
@@ -89,10 +95,13 @@ class TestEnhancedTavilySearchAPIWrapper:
         assert params["include_answer"] is True
         assert params["include_raw_content"] is True
 
-    @patch("src.tools.tavily_search.tavily_search_api_wrapper.requests.post")
-    def test_raw_results_http_error(self, mock_post, wrapper):
+    @patch("src.tools.tavily_search.tavily_search_api_wrapper._get_http_client")
+    def test_raw_results_http_error(self, mock_client, wrapper):
+        mock_post = mock_client.return_value.post
         mock_response = Mock()
-        mock_response.raise_for_status.side_effect = requests.HTTPError("API Error")
+        mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
+            "API Error", request=Mock(), response=Mock()
+        )
         mock_post.return_value = mock_response
 
         # The implementation returns error response instead of raising exception
@@ -101,6 +110,11 @@ class TestEnhancedTavilySearchAPIWrapper:
         assert result["results"] == []
         assert result["images"] == []
 
+    def test_sync_client_is_shared(self):
+        client = _get_http_client()
+        assert _get_http_client() is client
+        assert client.timeout.read == TAVILY_TIMEOUT_SECONDS
+
     @pytest.mark.asyncio
     async def test_raw_results_async_success(self, wrapper, mock_response_data):
         # Create a mock that acts as both the response and its context manager
@@ -108,7 +122,9 @@ class TestEnhancedTavilySearchAPIWrapper:
         mock_response_cm.__aenter__ = AsyncMock(return_value=mock_response_cm)
         mock_response_cm.__aexit__ = AsyncMock(return_value=None)
         mock_response_cm.status = 200
-        mock_response_cm.text = AsyncMock(return_value=json.dumps(mock_response_data))
+        mock_response_cm.read = AsyncMock(
+            return_value=json.dumps(mock_response_data).encode()
+        )
 
         # Create mock session that returns the context manager
         mock_session = AsyncMock()
@@ -116,14 +132,9 @@ class TestEnhancedTavilySearchAPIWrapper:
             return_value=mock_response_cm
         )  # Use MagicMock, not AsyncMock
 
-        # Create mock session class
-        mock_session_cm = AsyncMock()
-        mock_session_cm.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session_cm.__aexit__ = AsyncMock(return_value=None)
-
         with patch(
-            "src.tools.tavily_search.tavily_search_api_wrapper.aiohttp.ClientSession",
-            return_value=mock_session_cm,
+            "src.tools.tavily_search.tavily_search_api_wrapper.get_session",
+            AsyncMock(return_value=mock_session),
         ):
             result = await wrapper.raw_results_async("test query")
 
@@ -144,14 +155,9 @@ class TestEnhancedTavilySearchAPIWrapper:
             return_value=mock_response_cm
         )  # Use MagicMock, not AsyncMock
 
-        # Create mock session class
-        mock_session_cm = AsyncMock()
-        mock_session_cm.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session_cm.__aexit__ = AsyncMock(return_value=None)
-
         with patch(
-            "src.tools.tavily_search.tavily_search_api_wrapper.aiohttp.ClientSession",
-            return_value=mock_session_cm,
+            "src.tools.tavily_search.tavily_search_api_wrapper.get_session",
+            AsyncMock(return_value=mock_session),
         ):
             # The implementation returns error response instead of raising exception
             result = await wrapper.raw_results_async("test query")
@@ -159,6 +165,19 @@ class TestEnhancedTavilySearchAPIWrapper:
             assert result["results"] == []
             assert result["images"] == []
 
+    @pytest.mark.asyncio
+    async def test_session_is_shared_until_closed(self):
+        session = await get_session()
+        try:
+            assert await get_session() is session
+            assert session.connector.limit_per_host == 32
+        finally:
+            await close_session()
+        assert session.closed
+        new_session = await get_session()
+        assert new_session is not session
+        await close_session()
+
     def test_clean_results_with_images(self, wrapper, mock_response_data):
         result = wrapper.clean_results_with_images(mock_response_data)
 
@@ -108,3 +108,43 @@ class TestRepairJsonOutput:
         # Should attempt to process as JSON since it contains ```json
         assert isinstance(result, str)
         assert result == '{"key": "value"}'
+
+    def test_valid_json_skips_repair(self):
+        """Test that well-formed JSON is not passed to json_repair"""
+        content = '  {"key": "value"}  '
+        with patch("src.utils.json_utils.json_repair.loads") as mock_repair:
+            result = repair_json_output(content)
+        mock_repair.assert_not_called()
+        assert result == '{"key": "value"}'
+
+    def test_content_with_prefix_text(self):
+        """Test JSON preceded by prefix text"""
+        content = 'planner: {"key": "value"}'
+        result = repair_json_output(content)
+        assert result == '{"key": "value"}'
+
+    def test_trailing_text_is_dropped_without_repair(self):
+        """Test JSON followed by trailing text is parsed natively"""
+        content = '{"key": ["a", "b"]} Let me know if you need anything else.'
+        with patch("src.utils.json_utils.json_repair.loads") as mock_repair:
+            result = repair_json_output(content)
+        mock_repair.assert_not_called()
+        assert result == '{"key": ["a", "b"]}'
+
+    def test_unclosed_array_is_repaired_as_a_whole(self):
+        """Test an unclosed array is not reduced to its first object"""
+        content = '[{"id": 1}, {"id": 2}'
+        result = repair_json_output(content)
+        assert json.loads(result) == [{"id": 1}, {"id": 2}]
+
+    def test_valid_json_is_returned_verbatim(self):
+        """Test valid JSON is not re-serialized"""
+        content = '```json\n{"key":"value",\n "list": [1,2]}\n```'
+        result = repair_json_output(content)
+        assert result == '{"key":"value",\n "list": [1,2]}'
+
+    def test_surrounding_whitespace_is_trimmed(self):
+        """Test whitespace around a fenced block is not part of the result"""
+        content = '\n\t ```json\n  {"key": "value"}  \n```\n\n'
+        result = repair_json_output(content)
+        assert result == '{"key": "value"}'
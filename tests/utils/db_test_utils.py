@@ -4,27 +4,40 @@ Test utilities for SQLAlchemy database operations
 
 import os
 import pytest
+import pytest_asyncio
 import logging
 import uuid
-from datetime import datetime
-from typing import AsyncGenerator, Dict, List, Optional, Any
+from typing import AsyncGenerator, Dict, List, Optional, Any, Sequence
+from unittest.mock import MagicMock
 
 from sqlalchemy import (
     Column,
     String,
+    Table,
     Integer,
     JSON,
     DateTime,
     Boolean,
-    UUID,
     ForeignKey,
+    bindparam,
+    event,
+    func,
+    insert,
     select,
 )
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import update as sa_update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 from sqlalchemy.orm import DeclarativeBase
 
+from src.server.mcp_request import MCPServerMetadataRequest
+
 
 # Create a separate base for tests to avoid conflicts
 class TestBase(DeclarativeBase):
@@ -33,15 +46,57 @@ class TestBase(DeclarativeBase):
 
 logger = logging.getLogger(__name__)
 
+# Config keys copied into the metadata request, per transport and for all
+_TRANSPORT_KEYS = {"stdio": ("command", "args"), "sse": ("url",)}
+_COMMON_REQUEST_KEYS = ("env", "timeout_seconds")
+
 # Use in-memory SQLite for tests
 TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
 
 # Create async engine for tests
-test_engine = create_async_engine(
-    TEST_DATABASE_URL,
-    echo=False,
-    poolclass=NullPool,  # Disable connection pooling for tests
-)
+if TEST_DATABASE_URL.startswith("sqlite"):
+    # INSERT construct with ON CONFLICT support for the test database
+    _dialect_insert = sqlite_insert
+
+    # Every session shares one long-lived connection, so an in-memory
+    # database survives across sessions and is only opened once
+    test_engine = create_async_engine(
+        TEST_DATABASE_URL,
+        echo=False,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+
+    # Test data is disposable, so skip SQLite's durability work
+    _SQLITE_PRAGMAS = (
+        "PRAGMA synchronous=OFF",
+        "PRAGMA journal_mode=MEMORY",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA locking_mode=EXCLUSIVE",
+    )
+
+    # pysqlite defers BEGIN and so breaks SAVEPOINT; emit BEGIN ourselves so
+    # db_session can roll back everything a test committed
+    @event.listens_for(test_engine.sync_engine, "connect")
+    def _configure_sqlite_connection(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(test_engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+else:
+    _dialect_insert = pg_insert
+
+    test_engine = create_async_engine(
+        TEST_DATABASE_URL,
+        echo=False,
+        poolclass=NullPool,  # Disable connection pooling for tests
+    )
 
 # Create async session factory for tests
 test_async_session_factory = async_sessionmaker(
@@ -52,14 +107,15 @@ test_async_session_factory = async_sessionmaker(
 )
 
 
-class MockAuthUser(TestBase):
-    """Mock auth.users table for testing"""
-
-    __tablename__ = "auth_users"
-
-    id = Column(String, primary_key=True)
-    email = Column(String)
-    name = Column(String)
+# Mock auth.users table for testing. Tests only need it as a foreign key
+# target, so it is a plain Core table with no ORM mapping
+mock_auth_users = Table(
+    "auth_users",
+    TestBase.metadata,
+    Column("id", String, primary_key=True),
+    Column("email", String),
+    Column("name", String),
+)
 
 
 class TestMCPConnection(TestBase):
@@ -67,49 +123,44 @@ class TestMCPConnection(TestBase):
 
     __tablename__ = "mcp_connections"
 
-    id = Column(UUID, primary_key=True, default=uuid.uuid4)
+    # SQLite stores UUIDs as text anyway; keeping the string form means
+    # to_dict and lookups never convert between str and uuid.UUID
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     qualified_name = Column(String, nullable=False)
     name = Column(String, nullable=False)
     config = Column(JSON)  # Store non-sensitive config
     enabled_tools = Column(JSON)
     account_id = Column(String, ForeignKey("auth_users.id"), nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
-        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    # Fetch the database-generated timestamps when the row is written
+    __mapper_args__ = {"eager_defaults": True}
+
     def __init__(self, **kwargs):
         """Initialize the MCP connection"""
         # Generate ID if not provided
         if "id" not in kwargs:
-            kwargs["id"] = uuid.uuid4()
-
-        # Set defaults for dates if not provided
-        if "created_at" not in kwargs:
-            kwargs["created_at"] = datetime.utcnow()
-        if "updated_at" not in kwargs:
-            kwargs["updated_at"] = datetime.utcnow()
+            kwargs["id"] = str(uuid.uuid4())
 
         super().__init__(**kwargs)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert the connection to a dictionary"""
         return {
-            "id": str(self.id),
+            "id": self.id,
             "qualified_name": self.qualified_name,
             "name": self.name,
             "config": self.config,
             "enabled_tools": self.enabled_tools,
             "account_id": self.account_id,
             "created_at": (
-                self.created_at.isoformat()
-                if hasattr(self.created_at, "isoformat")
-                else None
+                self.created_at.isoformat() if self.created_at is not None else None
             ),
             "updated_at": (
-                self.updated_at.isoformat()
-                if hasattr(self.updated_at, "isoformat")
-                else None
+                self.updated_at.isoformat() if self.updated_at is not None else None
             ),
         }
 
@@ -123,51 +174,81 @@ class TestMCPConnection(TestBase):
         await session.commit()
         return connection
 
+    @classmethod
+    async def create_many(
+        cls, session: AsyncSession, rows: List[Dict[str, Any]]
+    ) -> None:
+        """Insert several MCP connections in one statement and commit once"""
+        await session.execute(insert(cls.__table__), rows)
+        await session.commit()
+
     @classmethod
     async def get_by_id(
         cls, session: AsyncSession, connection_id: str
     ) -> Optional["TestMCPConnection"]:
         """Get an MCP connection by ID"""
-        result = await session.execute(select(cls).where(cls.id == connection_id))
+        result = await session.execute(
+            _GET_CONNECTION_BY_ID, {"connection_id": connection_id}
+        )
         return result.scalars().first()
 
     @classmethod
-    async def get_all(cls, session: AsyncSession) -> List["TestMCPConnection"]:
+    async def get_all(cls, session: AsyncSession) -> Sequence["TestMCPConnection"]:
         """Get all MCP connections"""
-        result = await session.execute(select(cls))
-        return list(result.scalars().all())
+        result = await session.execute(_GET_ALL_CONNECTIONS)
+        return result.scalars().all()
 
     @classmethod
     async def get_for_account(
         cls, session: AsyncSession, account_id: str
-    ) -> List["TestMCPConnection"]:
+    ) -> Sequence["TestMCPConnection"]:
         """Get all MCP connections for a specific account"""
-        result = await session.execute(select(cls).where(cls.account_id == account_id))
-        return list(result.scalars().all())
+        result = await session.execute(
+            _GET_CONNECTIONS_FOR_ACCOUNT, {"account_id": account_id}
+        )
+        return result.scalars().all()
+
+    @classmethod
+    async def get_all_core(cls, session: AsyncSession) -> Sequence[RowMapping]:
+        """Get all MCP connections as column mappings, skipping the ORM layer"""
+        result = await session.execute(select(cls.__table__))
+        return result.mappings().all()
+
+    @classmethod
+    async def get_for_account_core(
+        cls, session: AsyncSession, account_id: str
+    ) -> Sequence[RowMapping]:
+        """Get the MCP connections of an account as column mappings"""
+        table = cls.__table__
+        result = await session.execute(
+            select(table).where(table.c.account_id == account_id)
+        )
+        return result.mappings().all()
 
     @classmethod
     async def update(
         cls, session: AsyncSession, connection_id: str, connection_data: Dict[str, Any]
     ) -> Optional["TestMCPConnection"]:
-        """Update an MCP connection"""
-        connection = await cls.get_by_id(session, connection_id)
-        if connection:
-            for key, value in connection_data.items():
-                if hasattr(connection, key):
-                    setattr(connection, key, value)
-            connection.updated_at = datetime.utcnow()
-            await session.commit()
+        """Update an MCP connection in one UPDATE ... RETURNING statement"""
+        columns = cls.__table__.c
+        result = await session.execute(
+            sa_update(cls)
+            .where(cls.id == connection_id)
+            .values(
+                {key: value for key, value in connection_data.items() if key in columns}
+            )
+            .returning(cls)
+        )
+        connection = result.scalar_one_or_none()
+        await session.commit()
         return connection
 
     @classmethod
     async def delete(cls, session: AsyncSession, connection_id: str) -> bool:
-        """Delete an MCP connection"""
-        connection = await cls.get_by_id(session, connection_id)
-        if connection:
-            await session.delete(connection)
-            await session.commit()
-            return True
-        return False
+        """Delete an MCP connection without loading it first"""
+        result = await session.execute(sa_delete(cls).where(cls.id == connection_id))
+        await session.commit()
+        return result.rowcount > 0
 
     def to_metadata_request(self):
         """Convert to MCPServerMetadataRequest"""
@@ -179,20 +260,20 @@ class TestMCPConnection(TestBase):
             raise ValueError("Connection transport is missing")
 
         request_data = {"transport": transport}
+        for key in _TRANSPORT_KEYS.get(transport, ()) + _COMMON_REQUEST_KEYS:
+            request_data[key] = self.config.get(key)
 
-        if transport == "stdio":
-            request_data["command"] = self.config.get("command")
-            request_data["args"] = self.config.get("args")
-        elif transport == "sse":
-            request_data["url"] = self.config.get("url")
-
-        request_data["env"] = self.config.get("env")
-        request_data["timeout_seconds"] = self.config.get("timeout_seconds")
+        return MCPServerMetadataRequest(**request_data)
 
-        # Import here to avoid circular imports
-        from src.server.mcp_request import MCPServerMetadataRequest
 
-        return MCPServerMetadataRequest(**request_data)
+# Reused statements; bound parameters are supplied at execution time
+_GET_CONNECTION_BY_ID = select(TestMCPConnection).where(
+    TestMCPConnection.id == bindparam("connection_id")
+)
+_GET_ALL_CONNECTIONS = select(TestMCPConnection)
+_GET_CONNECTIONS_FOR_ACCOUNT = select(TestMCPConnection).where(
+    TestMCPConnection.account_id == bindparam("account_id")
+)
 
 
 class TestModelInfo(TestBase):
@@ -208,22 +289,19 @@ class TestModelInfo(TestBase):
     base_url = Column(String)
     verify_ssl = Column(Boolean, default=True)
     account_id = Column(String, ForeignKey("auth_users.id"), nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
-        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    # Fetch the database-generated timestamps when the row is written
+    __mapper_args__ = {"eager_defaults": True}
+
     def __init__(self, data: Optional[Dict[str, Any]] = None, **kwargs):
         """Initialize the model info"""
         if data is not None:
             kwargs.update(data)
 
-        # Set defaults for dates if not provided
-        if "created_at" not in kwargs:
-            kwargs["created_at"] = datetime.utcnow()
-        if "updated_at" not in kwargs:
-            kwargs["updated_at"] = datetime.utcnow()
-
         super().__init__(**kwargs)
 
     def to_dict(self) -> Dict[str, Any]:
@@ -238,14 +316,10 @@ class TestModelInfo(TestBase):
             "verify_ssl": self.verify_ssl,
             "account_id": self.account_id,
             "created_at": (
-                self.created_at.isoformat()
-                if hasattr(self.created_at, "isoformat")
-                else None
+                self.created_at.isoformat() if self.created_at is not None else None
             ),
             "updated_at": (
-                self.updated_at.isoformat()
-                if hasattr(self.updated_at, "isoformat")
-                else None
+                self.updated_at.isoformat() if self.updated_at is not None else None
             ),
         }
 
@@ -259,67 +333,131 @@ class TestModelInfo(TestBase):
         await session.commit()
         return model_info
 
+    @classmethod
+    async def create_many(
+        cls, session: AsyncSession, rows: List[Dict[str, Any]]
+    ) -> None:
+        """Insert several model infos in one statement and commit once"""
+        await session.execute(insert(cls.__table__), rows)
+        await session.commit()
+
     @classmethod
     async def get_by_id(
         cls, session: AsyncSession, model_id: str
     ) -> Optional["TestModelInfo"]:
         """Get a model info by ID"""
-        result = await session.execute(select(cls).where(cls.id == model_id))
+        result = await session.execute(_GET_MODEL_BY_ID, {"model_id": model_id})
         return result.scalars().first()
 
     @classmethod
-    async def get_all(cls, session: AsyncSession) -> List["TestModelInfo"]:
+    async def get_all(cls, session: AsyncSession) -> Sequence["TestModelInfo"]:
         """Get all model infos"""
-        result = await session.execute(select(cls))
-        return list(result.scalars().all())
+        result = await session.execute(_GET_ALL_MODELS)
+        return result.scalars().all()
 
     @classmethod
     async def get_for_account(
         cls, session: AsyncSession, account_id: str
-    ) -> List["TestModelInfo"]:
+    ) -> Sequence["TestModelInfo"]:
         """Get all model infos for a specific account"""
-        result = await session.execute(select(cls).where(cls.account_id == account_id))
-        return list(result.scalars().all())
+        result = await session.execute(
+            _GET_MODELS_FOR_ACCOUNT, {"account_id": account_id}
+        )
+        return result.scalars().all()
+
+    @classmethod
+    async def get_all_core(cls, session: AsyncSession) -> Sequence[RowMapping]:
+        """Get all model infos as column mappings, skipping the ORM layer"""
+        result = await session.execute(select(cls.__table__))
+        return result.mappings().all()
+
+    @classmethod
+    async def get_for_account_core(
+        cls, session: AsyncSession, account_id: str
+    ) -> Sequence[RowMapping]:
+        """Get the model infos of an account as column mappings"""
+        table = cls.__table__
+        result = await session.execute(
+            select(table).where(table.c.account_id == account_id)
+        )
+        return result.mappings().all()
 
     @classmethod
     async def update(
         cls, session: AsyncSession, model_id: str, model_data: Dict[str, Any]
     ) -> Optional["TestModelInfo"]:
-        """Update a model info"""
-        model_info = await cls.get_by_id(session, model_id)
-        if model_info:
-            for key, value in model_data.items():
-                if hasattr(model_info, key):
-                    setattr(model_info, key, value)
-            model_info.updated_at = datetime.utcnow()
-            await session.commit()
+        """Update a model info in one UPDATE ... RETURNING statement"""
+        columns = cls.__table__.c
+        result = await session.execute(
+            sa_update(cls)
+            .where(cls.id == model_id)
+            .values({key: value for key, value in model_data.items() if key in columns})
+            .returning(cls)
+        )
+        model_info = result.scalar_one_or_none()
+        await session.commit()
         return model_info
 
     @classmethod
     async def delete(cls, session: AsyncSession, model_id: str) -> bool:
-        """Delete a model info"""
-        model_info = await cls.get_by_id(session, model_id)
-        if model_info:
-            await session.delete(model_info)
-            await session.commit()
-            return True
-        return False
+        """Delete a model info without loading it first"""
+        result = await session.execute(sa_delete(cls).where(cls.id == model_id))
+        await session.commit()
+        return result.rowcount > 0
 
     @classmethod
     async def get_or_create(
         cls, session: AsyncSession, model_data: Dict[str, Any]
     ) -> "TestModelInfo":
-        """Get or create a model info"""
+        """Get or create a model info
+
+        Inserts with ON CONFLICT DO NOTHING RETURNING, so creating a model takes
+        one round-trip; the row is only selected when it already exists.
+        """
         model_id = model_data.get("id")
         if not model_id:
             raise ValueError("Model ID is required")
 
-        model_info = await cls.get_by_id(session, model_id)
-        if not model_info:
-            model_info = await cls.create(session, model_data)
+        columns = cls.__table__.columns.keys()
+        values = {key: value for key, value in model_data.items() if key in columns}
+        result = await session.execute(
+            _dialect_insert(cls)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[cls.id])
+            .returning(cls)
+        )
+        model_info = result.scalar_one_or_none()
+        if model_info is None:
+            model_info = await cls.get_by_id(session, model_id)
+        else:
+            await session.commit()
         return model_info
 
 
+_GET_MODEL_BY_ID = select(TestModelInfo).where(
+    TestModelInfo.id == bindparam("model_id")
+)
+_GET_ALL_MODELS = select(TestModelInfo)
+_GET_MODELS_FOR_ACCOUNT = select(TestModelInfo).where(
+    TestModelInfo.account_id == bindparam("account_id")
+)
+
+
+def mock_result(value: Any = None) -> MagicMock:
+    """Result whose scalar accessors return value; pass a list for scalars()"""
+    result = MagicMock()
+    result.scalar_one.return_value = value
+    result.scalar_one_or_none.return_value = value
+    result.scalars.return_value.all.return_value = value
+    return result
+
+
+def executed_sql(session: MagicMock, call: int = -1) -> str:
+    """Postgres SQL of the statement a mock session executed, latest by default"""
+    stmt = session.execute.await_args_list[call].args[0]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
 async def get_test_session() -> AsyncGenerator[AsyncSession, None]:
     """Get SQLAlchemy session for test database operations"""
     session = test_async_session_factory()
@@ -329,25 +467,33 @@ async def get_test_session() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
-@pytest.fixture
-def db_session():
-    """Fixture that provides a SQLAlchemy session for tests"""
-
-    async def _get_session():
-        # Create all tables including the mock auth table
-        async with test_engine.begin() as conn:
-            await conn.run_sync(TestBase.metadata.create_all)
-
-        # Get session
-        session = test_async_session_factory()
-
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def db_schema():
+    """Create all tables, including the mock auth table, once per test run"""
+    async with test_engine.begin() as conn:
+        await conn.run_sync(TestBase.metadata.create_all)
+    yield
+    # Close the pooled connection so its worker thread does not outlive the run
+    await test_engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db_session(db_schema):
+    """Fixture that provides a SQLAlchemy session for tests
+
+    The session runs inside a transaction that is rolled back after the
+    test; commits made by the test only release a savepoint.
+    """
+    async with test_engine.connect() as conn:
+        await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        )
         try:
             yield session
         finally:
             await session.close()
-
-            # Drop all tables after tests
-            async with test_engine.begin() as conn:
-                await conn.run_sync(TestBase.metadata.drop_all)
-
-    return _get_session
+            await conn.rollback()
@@ -5,10 +5,75 @@ Test script to verify our cleaned MCP server works without stderr output
 
 import subprocess
 import json
+import selectors
 import time
 import sys
 import os
 
+# How long the server may take to answer the initialize request
+STARTUP_TIMEOUT_SECONDS = 10
+# Stop collecting stderr once the server has been quiet this long ...
+STDERR_IDLE_SECONDS = 0.2
+# ... or this long after the handshake, whichever comes first
+STDERR_BUDGET_SECONDS = 0.5
+
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "test_clean_mcp", "version": "0.1.0"},
+    },
+}
+
+
+def wait_until_ready(process, timeout=STARTUP_TIMEOUT_SECONDS):
+    """Send an MCP initialize request and wait for the server's reply"""
+    process.stdin.write(json.dumps(INITIALIZE_REQUEST) + "\n")
+    process.stdin.flush()
+
+    deadline = time.monotonic() + timeout
+    with selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ)
+        while process.poll() is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not selector.select(remaining):
+                return False
+            line = process.stdout.readline()
+            if not line:
+                return False
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("id") == INITIALIZE_REQUEST["id"]:
+                return "result" in message
+    return False
+
+
+def read_stderr_until_idle(
+    process, idle=STDERR_IDLE_SECONDS, budget=STDERR_BUDGET_SECONDS
+):
+    """Collect what the server writes to stderr until it goes quiet"""
+    fd = process.stderr.fileno()
+    os.set_blocking(fd, False)
+
+    chunks = []
+    deadline = time.monotonic() + budget
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while True:
+            timeout = min(idle, deadline - time.monotonic())
+            if timeout <= 0 or not selector.select(timeout):
+                break
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b"".join(chunks).decode(errors="replace")
+
 
 def test_mcp_server_clean():
     """Test that our MCP server runs without stderr output"""
@@ -35,27 +100,18 @@ def test_mcp_server_clean():
         # Start the server process
         process = subprocess.Popen(
             [venv_python, server_path],
+            stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
         )
 
-        # Give it a moment to start and potentially output errors
-        time.sleep(3)
-
-        # Check if process is still running
-        if process.poll() is None:
+        # Wait for the handshake instead of sleeping a fixed time
+        if wait_until_ready(process):
             print("✅ MCP server started successfully!")
 
-            # Check stderr for any output
-            # Use communicate with timeout to avoid hanging
-            try:
-                stdout, stderr = process.communicate(timeout=2)
-            except subprocess.TimeoutExpired:
-                # This is expected - server should keep running
-                process.terminate()
-                process.wait()
-                stdout, stderr = "", ""
+            # Check stderr for any output, stopping once the server is quiet
+            stderr = read_stderr_until_idle(process)
 
             if stderr.strip():
                 print(f"⚠️ Server produced stderr output: {stderr}")
@@ -64,6 +120,7 @@ def test_mcp_server_clean():
                 print("✅ No stderr output detected!")
 
         else:
+            process.terminate()
             stdout, stderr = process.communicate()
             print(f"❌ MCP server failed to start!")
             print(f"STDOUT: {stdout}")
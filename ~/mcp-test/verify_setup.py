@@ -5,6 +5,7 @@ Simple verification script for our MCP server setup
 
 import os
 import sys
+import sysconfig
 
 
 def verify_setup():
@@ -35,9 +36,11 @@ def verify_setup():
 
     # Try importing MCP (this will only work if venv is activated)
     try:
-        sys.path.insert(
-            0, os.path.join(venv_path, "lib", "python3.13", "site-packages")
-        )
+        # Resolve site-packages for this interpreter's version and platform
+        site_packages = sysconfig.get_paths(
+            vars={"base": venv_path, "platbase": venv_path}
+        )["purelib"]
+        sys.path.insert(0, site_packages)
         import mcp
 
         print("✅ MCP package available")